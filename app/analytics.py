@@ -0,0 +1,179 @@
+import argparse
+from collections import Counter, defaultdict
+from datetime import datetime
+import json
+from typing import Iterable, Literal
+
+from sqlalchemy import case, delete, func, select, text
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal, dialect_insert
+from .models import QRPurpose, QRToken, ScanCounter, ScanLog
+
+Bucket = Literal["minute", "hour"]
+_SQLITE_FORMATS = {"minute": "%Y-%m-%dT%H:%M", "hour": "%Y-%m-%dT%H:00"}
+
+
+def _bucket_expr(db: Session, column, bucket: Bucket):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.to_char(func.date_trunc(bucket, column), 'YYYY-MM-DD"T"HH24:MI')
+    return func.strftime(_SQLITE_FORMATS[bucket], column)
+
+
+def counter_bucket(scanned_at: datetime) -> datetime:
+    return scanned_at.replace(second=0, microsecond=0)
+
+
+def record_scans(db: Session, scans: Iterable[tuple[int, QRPurpose, datetime, bool]]) -> None:
+    counts = Counter(
+        (hackathon_id, purpose, counter_bucket(scanned_at), success)
+        for hackathon_id, purpose, scanned_at, success in scans
+    )
+    _upsert_counts(db, counts)
+
+
+def _upsert_counts(db: Session, counts: dict[tuple[int, QRPurpose, datetime, bool], int]) -> None:
+    if not counts:
+        return
+    stmt = dialect_insert(db, ScanCounter)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["hackathon_id", "purpose", "bucket_start", "success"],
+        set_={"scans": ScanCounter.scans + stmt.excluded.scans},
+    )
+    db.execute(
+        stmt,
+        [
+            {
+                "hackathon_id": hackathon_id,
+                "purpose": purpose,
+                "bucket_start": bucket,
+                "success": success,
+                "scans": scans,
+            }
+            for (hackathon_id, purpose, bucket, success), scans in counts.items()
+        ],
+    )
+
+
+def rebuild_counters(db: Session, hackathon_id: int) -> int:
+    # Counter writes are shut out until this commits: a scan that committed earlier is in the recount, and
+    # one still in flight adds its counts on top afterwards, never both. Scans of every hackathon queue for
+    # the length of the rebuild. SQLite already admits one writer at a time.
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE scan_counters IN EXCLUSIVE MODE"))
+    db.execute(delete(ScanCounter).where(ScanCounter.hackathon_id == hackathon_id))
+    minute = _bucket_expr(db, ScanLog.scanned_at, "minute").label("minute")
+    rows = db.execute(
+        select(QRToken.purpose, minute, ScanLog.success, func.count().label("scans"))
+        .join(QRToken, QRToken.id == ScanLog.qr_token_id)
+        .where(QRToken.hackathon_id == hackathon_id)
+        .group_by(QRToken.purpose, minute, ScanLog.success)
+    ).all()
+    _upsert_counts(
+        db, {(hackathon_id, row.purpose, datetime.fromisoformat(row.minute), row.success): row.scans for row in rows}
+    )
+    return len(rows)
+
+
+def _tally() -> dict:
+    return {"total": 0, "success": 0, "failure": 0}
+
+
+def _add(tally: dict, success: bool, scans: int) -> None:
+    tally["total"] += scans
+    tally["success" if success else "failure"] += scans
+
+
+def _report(overall: dict, by_purpose: dict, timeline: dict, bucket: Bucket) -> dict:
+    return {
+        "total_scans": overall["total"],
+        "successful_scans": overall["success"],
+        "failed_scans": overall["failure"],
+        "by_purpose": dict(by_purpose),
+        "bucket": bucket,
+        "timeline": [{"bucket": key, **timeline[key]} for key in sorted(timeline)],
+    }
+
+
+def counter_summary(
+    db: Session,
+    hackathon_id: int,
+    bucket: Bucket = "hour",
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> dict:
+    # Reads only scan_counters, so a dashboard refresh costs one row per (purpose, minute, outcome).
+    bucket_expr = _bucket_expr(db, ScanCounter.bucket_start, bucket).label("bucket")
+    query = (
+        select(ScanCounter.purpose, bucket_expr, ScanCounter.success, func.sum(ScanCounter.scans).label("scans"))
+        .where(ScanCounter.hackathon_id == hackathon_id)
+        .group_by(ScanCounter.purpose, bucket_expr, ScanCounter.success)
+    )
+    if since is not None:
+        query = query.where(ScanCounter.bucket_start >= counter_bucket(since))
+    if until is not None:
+        query = query.where(ScanCounter.bucket_start < until)
+
+    overall = _tally()
+    by_purpose: dict[str, dict] = defaultdict(_tally)
+    timeline: dict[str, dict] = defaultdict(_tally)
+    for row in db.execute(query):
+        for tally in (overall, by_purpose[row.purpose.value], timeline[row.bucket]):
+            _add(tally, row.success, row.scans)
+    return _report(overall, by_purpose, timeline, bucket)
+
+
+def scan_summary(
+    db: Session,
+    hackathon_id: int,
+    bucket: Bucket = "hour",
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> dict:
+    # One grouped pass at (purpose, scanner, bucket, outcome, reason) grain; every breakdown below is a
+    # rollup of those few hundred rows rather than another scan over scan_logs.
+    bucket_expr = _bucket_expr(db, ScanLog.scanned_at, bucket).label("bucket")
+    reason = case((ScanLog.success.is_(False), ScanLog.message)).label("reason")
+    query = (
+        select(QRToken.purpose, ScanLog.scanner_id, bucket_expr, ScanLog.success, reason, func.count().label("scans"))
+        .join(QRToken, QRToken.id == ScanLog.qr_token_id)
+        .where(QRToken.hackathon_id == hackathon_id)
+        .group_by(QRToken.purpose, ScanLog.scanner_id, bucket_expr, ScanLog.success, reason)
+    )
+    if since is not None:
+        query = query.where(ScanLog.scanned_at >= since)
+    if until is not None:
+        query = query.where(ScanLog.scanned_at < until)
+
+    overall = _tally()
+    by_purpose: dict[str, dict] = defaultdict(_tally)
+    by_scanner: dict[int, dict] = defaultdict(_tally)
+    timeline: dict[str, dict] = defaultdict(_tally)
+    reasons: Counter = Counter()
+    for row in db.execute(query):
+        for tally in (overall, by_purpose[row.purpose.value], by_scanner[row.scanner_id], timeline[row.bucket]):
+            _add(tally, row.success, row.scans)
+        if not row.success:
+            reasons[row.reason] += row.scans
+
+    return {
+        **_report(overall, by_purpose, timeline, bucket),
+        "by_scanner": [{"scanner_id": scanner_id, **by_scanner[scanner_id]} for scanner_id in sorted(by_scanner)],
+        "failure_reasons": dict(reasons.most_common()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild pre-aggregated scan counters from scan_logs.")
+    parser.add_argument("hackathon_ids", type=int, nargs="+")
+    args = parser.parse_args()
+    with SessionLocal() as db:
+        report = {}
+        for hackathon_id in args.hackathon_ids:
+            report[hackathon_id] = rebuild_counters(db, hackathon_id)
+            db.commit()
+    print(json.dumps({"rebuilt_rows": report}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+import os
+import threading
+import time
+
+from .models import UserRole, VerificationStatus
+
+
+@dataclass(frozen=True)
+class AuthPrincipal:
+    id: int
+    role: UserRole
+    verification_status: VerificationStatus
+    expires_at: datetime
+
+
+class SessionCache:
+    # Per-process token -> principal cache. Entries live at most `ttl` seconds, so a change made
+    # through another worker or instance is picked up within that window; ttl=0 disables the cache.
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, AuthPrincipal]] = OrderedDict()
+        self._by_user: dict[int, set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, token: str) -> AuthPrincipal | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token: str, principal: AuthPrincipal) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._drop(token)
+            self._entries[token] = (time.monotonic() + self.ttl, principal)
+            self._by_user.setdefault(principal.id, set()).add(token)
+            while len(self._entries) > self.max_size:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_token(self, token: str) -> None:
+        with self._lock:
+            self._drop(token)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for token in list(self._by_user.get(user_id, ())):
+                self._drop(token)
+
+    def _drop(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._by_user.get(entry[1].id)
+        if tokens:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_user[entry[1].id]
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+def _default_ttl() -> str:
+    # Serverless instances cannot see each other's invalidations; stay on the DB path there by default.
+    return "0" if os.getenv("VERCEL") else "30"
+
+
+session_cache = SessionCache(
+    max_size=int(os.getenv("AUTH_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("AUTH_CACHE_TTL", _default_ttl())),
+)
@@ -1,39 +1,264 @@
+from importlib.util import find_spec
+import logging
 import os
+import threading
+from typing import Callable
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import NoSuchModuleError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import NullPool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_url(db_url: str) -> str:
+    if db_url.startswith("postgres://"):
+        return db_url.replace("postgres://", "postgresql+psycopg://", 1)
+    if db_url.startswith("postgresql://") and "+psycopg" not in db_url:
+        return db_url.replace("postgresql://", "postgresql+psycopg://", 1)
+    return db_url
 
 
 def _resolve_database_url() -> str:
     db_url = os.getenv("DATABASE_URL")
     if db_url:
-        if db_url.startswith("postgres://"):
-            return db_url.replace("postgres://", "postgresql+psycopg://", 1)
-        if db_url.startswith("postgresql://") and "+psycopg" not in db_url:
-            return db_url.replace("postgresql://", "postgresql+psycopg://", 1)
-        return db_url
+        return _normalize_url(db_url)
 
     if os.getenv("VERCEL"):
         return "sqlite:////tmp/hackathon.db"
     return "sqlite:///./hackathon.db"
 
 
-def _build_engine(db_url: str):
-    engine_kwargs: dict = {}
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _engine_profile(db_url: str) -> str:
+    profile = os.getenv("DB_ENGINE_PROFILE")
+    if profile:
+        return profile
     if db_url.startswith("sqlite"):
-        engine_kwargs["connect_args"] = {"check_same_thread": False}
+        return "sqlite"
+    return "serverless" if os.getenv("VERCEL") else "postgres"
+
+
+def _sqlite_in_memory(db_url: str) -> bool:
+    url = make_url(db_url)
+    return url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    )
+
+
+def _engine_kwargs(profile: str, db_url: str) -> dict:
+    if profile == "sqlite":
+        if _sqlite_in_memory(db_url):
+            # SQLAlchemy keeps one connection per thread (or one shared) for these; they take no pool sizing.
+            return {"connect_args": {"check_same_thread": False}}
+        return {
+            "connect_args": {"check_same_thread": False},
+            "pool_size": _env_int("DB_POOL_SIZE", 5),
+            "max_overflow": _env_int("DB_MAX_OVERFLOW", 10),
+            "pool_timeout": _env_int("DB_POOL_TIMEOUT", 30),
+        }
+    if profile == "serverless":
+        # Each invocation may be a fresh instance; hold no idle connections and leave pooling to an
+        # external pooler (PgBouncer / Neon / Supabase), which rejects server-side prepared statements.
+        return {"poolclass": NullPool, "connect_args": {"prepare_threshold": None}}
+    return {
+        "pool_size": _env_int("DB_POOL_SIZE", 10),
+        "max_overflow": _env_int("DB_MAX_OVERFLOW", 20),
+        "pool_timeout": _env_int("DB_POOL_TIMEOUT", 10),
+        "pool_recycle": _env_int("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": True,
+        "pool_use_lifo": True,
+    }
+
+
+def _install_sqlite_pragmas(engine) -> None:
+    busy_timeout = _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+    mmap_size = _env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # WAL lets readers proceed during a write; busy_timeout makes writers queue instead of failing
+        # with "database is locked".
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={busy_timeout}")
+        cursor.execute(f"PRAGMA mmap_size={mmap_size}")
+        cursor.close()
+
+
+def _create_engine(db_url: str, profile: str):
+    engine = create_engine(db_url, **_engine_kwargs(profile, db_url))
+    if profile == "sqlite":
+        _install_sqlite_pragmas(engine)
+    return engine
 
+
+def _build_engine(db_url: str):
+    profile = _engine_profile(db_url)
     try:
-        return create_engine(db_url, **engine_kwargs), db_url
-    except Exception:
+        return _create_engine(db_url, profile), db_url, profile
+    except ModuleNotFoundError as exc:
+        # Only a missing database driver falls back to SQLite; a bad URL or pool setting is raised.
         fallback_url = "sqlite:////tmp/hackathon.db" if os.getenv("VERCEL") else "sqlite:///./hackathon.db"
-        fallback_kwargs = {"connect_args": {"check_same_thread": False}}
-        return create_engine(fallback_url, **fallback_kwargs), fallback_url
+        logger.warning("Database driver unavailable (%s); falling back to %s", exc, fallback_url)
+        return _create_engine(fallback_url, "sqlite"), fallback_url, "sqlite"
+
+
+def _build_read_engine(read_url: str | None, primary):
+    # Without a replica reads simply go to the primary.
+    if not read_url:
+        return primary
+    read_url = _normalize_url(read_url)
+    return _create_engine(read_url, _engine_profile(read_url))
+
+
+def _async_url(db_url: str) -> str:
+    # psycopg 3 serves both the sync and async engines; SQLite needs the aiosqlite driver.
+    if db_url.startswith("sqlite:"):
+        return db_url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    return db_url
+
+
+def _async_supported(db_url: str) -> bool:
+    # Resolves the async dialect and imports its driver without connecting. The router is chosen from this
+    # at import and the engine is built from it later, so the two always agree; a URL naming a sync-only
+    # driver (postgresql+psycopg2) or a missing aiosqlite/greenlet keeps every route on the sync engine.
+    if os.getenv("DB_ASYNC", "1") == "0" or find_spec("greenlet") is None:
+        return False
+    try:
+        dialect = make_url(_async_url(db_url)).get_dialect(_is_async=True)
+        if not dialect.is_async:
+            return False
+        dialect.import_dbapi()
+    except (ImportError, NoSuchModuleError):
+        return False
+    return True
+
+
+def _build_async_engine(db_url: str, profile: str):
+    if not _async_supported(db_url):
+        return None
+    async_engine = create_async_engine(_async_url(db_url), **_engine_kwargs(profile, db_url))
+    if profile == "sqlite":
+        _install_sqlite_pragmas(async_engine.sync_engine)
+    return async_engine
+
+
+def startup_mode() -> str:
+    # eager: build engines and create_all at startup. lazy (default on Vercel): nothing touches the
+    # database until the first request that needs it, and the schema check is a single marker lookup.
+    return os.getenv("DB_STARTUP", "lazy" if os.getenv("VERCEL") else "eager")
+
+
+def _build_engines() -> dict:
+    engine, effective_url, profile = _build_engine(DATABASE_URL)
+    read_engine = _build_read_engine(os.getenv("DATABASE_READ_URL"), engine)
+    async_engine = _build_async_engine(effective_url, profile) if AsyncSessionLocal is not None else None
+    async_read_engine = async_engine
+    if async_engine is not None and read_engine is not engine:
+        async_read_engine = _build_async_engine(
+            read_engine.url.render_as_string(hide_password=False), _engine_profile(str(read_engine.url))
+        ) or async_engine
+    return {
+        "engine": engine,
+        "EFFECTIVE_DATABASE_URL": effective_url,
+        "ENGINE_PROFILE": profile,
+        "read_engine": read_engine,
+        "async_engine": async_engine,
+        "async_read_engine": async_read_engine,
+    }
 
 
+def _engines() -> dict:
+    global _built
+    if _built is None:
+        with _build_lock:
+            if _built is None:
+                built = _build_engines()
+                for hook in _connect_hooks:
+                    hook(built["engine"])
+                _built = built
+    return _built
+
+
+def on_connect(hook: Callable) -> None:
+    # Hooks run once, with the primary engine, while the engines are first being built.
+    if hook not in _connect_hooks:
+        _connect_hooks.append(hook)
+
+
+def connected() -> bool:
+    return _built is not None
+
+
+def __getattr__(name: str):
+    # engine, read_engine, async_engine, async_read_engine, EFFECTIVE_DATABASE_URL and ENGINE_PROFILE
+    # are built on first access rather than at import.
+    if name in _DEFERRED:
+        return _engines()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class _DeferredSessionmaker(sessionmaker):
+    def __init__(self, engine_name: str, **kw):
+        super().__init__(**kw)
+        self.engine_name = engine_name
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=_engines()[self.engine_name])
+        return super().__call__(**local_kw)
+
+
+class _DeferredAsyncSessionmaker(async_sessionmaker):
+    def __init__(self, engine_name: str, **kw):
+        super().__init__(**kw)
+        self.engine_name = engine_name
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            bind = _engines()[self.engine_name]
+            if bind is None:
+                raise RuntimeError("Async database engine could not be created; set DB_ASYNC=0")
+            self.configure(bind=bind)
+        return super().__call__(**local_kw)
+
+
+def pool_stats() -> dict:
+    if _built is None:
+        return {"profile": _engine_profile(DATABASE_URL), "connected": False}
+    engine = _built["engine"]
+    pool = engine.pool
+    stats = {"profile": _built["ENGINE_PROFILE"], "connected": True, "pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(), checked_out=pool.checkedout(), checked_in=pool.checkedin(), overflow=pool.overflow()
+        )
+    stats["read_replica"] = _built["read_engine"] is not engine
+    stats["async"] = _built["async_engine"] is not None
+    return stats
+
+
+_DEFERRED = {"engine", "EFFECTIVE_DATABASE_URL", "ENGINE_PROFILE", "read_engine", "async_engine", "async_read_engine"}
+_built: dict | None = None
+_build_lock = threading.Lock()
+_connect_hooks: list[Callable] = []
 DATABASE_URL = _resolve_database_url()
-engine, EFFECTIVE_DATABASE_URL = _build_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = _DeferredSessionmaker("engine", autocommit=False, autoflush=False)
+ReadSessionLocal = _DeferredSessionmaker("read_engine", autocommit=False, autoflush=False)
+AsyncSessionLocal = (
+    _DeferredAsyncSessionmaker("async_engine", expire_on_commit=False) if _async_supported(DATABASE_URL) else None
+)
+AsyncReadSessionLocal = (
+    _DeferredAsyncSessionmaker("async_read_engine", expire_on_commit=False) if AsyncSessionLocal else None
+)
 Base = declarative_base()
 
 
@@ -43,3 +268,29 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    # For read-only endpoints that can tolerate replica lag; anything that writes or must read its
+    # own writes stays on get_db.
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+def dialect_insert(db: Session, model):
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
@@ -0,0 +1,165 @@
+import csv
+from datetime import datetime
+from enum import Enum
+import io
+from itertools import groupby, islice
+import json
+from typing import Callable, Iterable, Iterator
+import zlib
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
+
+from . import leaderboard as leaderboard_store
+from . import metadata_cache
+from .database import ReadSessionLocal
+from .models import (
+    QRPurpose,
+    QRToken,
+    ScanLog,
+    Score,
+    SubmissionRound,
+    Team,
+    User,
+    UserRole,
+    VerificationStatus,
+)
+
+CHUNK_SIZE = 1000
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+Export = tuple[list[str], Iterator[dict]]
+
+
+def _fetch(db: Session, query) -> Iterator[dict]:
+    # yield_per streams through a server-side cursor on Postgres (and SQLite's lazy cursor), so memory
+    # stays at one partition however large the table is.
+    for partition in db.execute(query.execution_options(yield_per=CHUNK_SIZE)).mappings().partitions():
+        yield from partition
+
+
+def leaderboard(db: Session, hackathon_id: int, round_name: SubmissionRound) -> Export:
+    fields = ["rank", "team_id", "team_name", "total_score"]
+    return fields, _fetch(db, leaderboard_store.board_page(hackathon_id, round_name))
+
+
+def score_matrix(db: Session, hackathon_id: int, round_name: SubmissionRound, judge_id: int | None = None) -> Export:
+    criteria = metadata_cache.round_criteria(db, hackathon_id, round_name)
+    names = [criterion.name for criterion in criteria]
+    labels = {
+        criterion.id: criterion.name if names.count(criterion.name) == 1 else f"{criterion.name} #{criterion.id}"
+        for criterion in criteria
+    }
+    weights = {criterion.id: criterion.weight for criterion in criteria}
+    fields = ["judge_id", "judge_name", "team_id", "team_name", *labels.values(), "weighted_total"]
+
+    judge = aliased(User)
+    query = (
+        select(
+            Score.judge_id,
+            judge.name.label("judge_name"),
+            Score.team_id,
+            Team.name.label("team_name"),
+            Score.criterion_id,
+            Score.score,
+        )
+        .join(judge, judge.id == Score.judge_id)
+        .join(Team, Team.id == Score.team_id)
+        .where(Score.round == round_name, Score.criterion_id.in_(list(labels)))
+        .order_by(Score.judge_id, Score.team_id, Score.criterion_id)
+    )
+    if judge_id is not None:
+        query = query.where(Score.judge_id == judge_id)
+
+    def rows() -> Iterator[dict]:
+        # Ordered by (judge, team), so each matrix row is one consecutive run of scores.
+        for _, cells in groupby(_fetch(db, query), key=lambda cell: (cell["judge_id"], cell["team_id"])):
+            cells = list(cells)
+            row = {key: cells[0][key] for key in ("judge_id", "judge_name", "team_id", "team_name")}
+            row.update({label: None for label in labels.values()})
+            row.update({labels[cell["criterion_id"]]: cell["score"] for cell in cells})
+            row["weighted_total"] = sum(cell["score"] * weights[cell["criterion_id"]] for cell in cells)
+            yield row
+
+    return fields, rows()
+
+
+def attendance(db: Session, hackathon_id: int, purpose: QRPurpose | None = None) -> Export:
+    fields = ["scan_id", "scanned_at", "purpose", "success", "message", "user_id", "user_name", "scanner_id"]
+    query = (
+        select(
+            ScanLog.id.label("scan_id"),
+            ScanLog.scanned_at,
+            QRToken.purpose,
+            ScanLog.success,
+            ScanLog.message,
+            QRToken.user_id,
+            User.name.label("user_name"),
+            ScanLog.scanner_id,
+        )
+        .join(QRToken, QRToken.id == ScanLog.qr_token_id)
+        .join(User, User.id == QRToken.user_id)
+        .where(QRToken.hackathon_id == hackathon_id)
+        .order_by(ScanLog.id)
+    )
+    if purpose is not None:
+        query = query.where(QRToken.purpose == purpose)
+    return fields, _fetch(db, query)
+
+
+def roster(db: Session, status: VerificationStatus | None = None) -> Export:
+    fields = ["id", "name", "email", "phone", "verification_status", "otp_verified", "created_at"]
+    query = select(*(getattr(User, field) for field in fields)).where(User.role == UserRole.STUDENT).order_by(User.id)
+    if status is not None:
+        query = query.where(User.verification_status == status)
+    return fields, _fetch(db, query)
+
+
+def _plain(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_ndjson(fields: list[str], rows: Iterable[dict]) -> Iterator[str]:
+    rows = iter(rows)
+    while chunk := list(islice(rows, CHUNK_SIZE)):
+        yield "".join(json.dumps({field: _plain(row[field]) for field in fields}) + "\n" for row in chunk)
+
+
+def encode_csv(fields: list[str], rows: Iterable[dict]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    rows = iter(rows)
+    while chunk := list(islice(rows, CHUNK_SIZE)):
+        writer.writerows([_plain(row[field]) for field in fields] for row in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks: Iterable[str]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        # Sync-flush per chunk so the client sees bytes as soon as rows are read, not when the export ends.
+        yield compressor.compress(chunk.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def stream(
+    export: Callable[..., Export],
+    fmt: str,
+    compress: bool = False,
+    session_factory=ReadSessionLocal,
+    **params,
+) -> Iterator[str | bytes]:
+    # The export owns its session so the cursor lives exactly as long as the response body.
+    with session_factory() as db:
+        fields, rows = export(db, **params)
+        chunks = encode_csv(fields, rows) if fmt == "csv" else encode_ndjson(fields, rows)
+        yield from gzip_chunks(chunks) if compress else chunks
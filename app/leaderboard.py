@@ -0,0 +1,134 @@
+from sqlalchemy import and_, func, insert, literal, select, true
+from sqlalchemy.orm import Session
+
+from .database import dialect_insert
+from .models import EvaluationCriterion, LeaderboardEntry, Score, SubmissionRound, Team
+
+DRIFT_TOLERANCE = 1e-6
+
+
+def _board_filter(hackathon_id: int, round_name: SubmissionRound):
+    return (LeaderboardEntry.hackathon_id == hackathon_id, LeaderboardEntry.round == round_name)
+
+
+def weighted_totals(hackathon_id: int, round_name: SubmissionRound):
+    return (
+        select(Score.team_id, func.sum(Score.score * EvaluationCriterion.weight).label("total_score"))
+        .join(EvaluationCriterion, EvaluationCriterion.id == Score.criterion_id)
+        .where(
+            EvaluationCriterion.hackathon_id == hackathon_id,
+            EvaluationCriterion.round == round_name,
+            Score.round == round_name,
+        )
+        .group_by(Score.team_id)
+    )
+
+
+def lock_teams(db: Session, hackathon_id: int, round_name: SubmissionRound, team_ids: set[int]) -> None:
+    # Creates any missing rows and row-locks all of them with a no-op update, in team order so overlapping
+    # sheets queue rather than deadlock. Held until commit, this makes refresh_teams see every score that
+    # committed before it.
+    stmt = dialect_insert(db, LeaderboardEntry)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["hackathon_id", "round", "team_id"], set_={"total_score": LeaderboardEntry.total_score}
+    )
+    db.execute(
+        stmt,
+        [
+            {"hackathon_id": hackathon_id, "round": round_name, "team_id": team_id, "total_score": 0.0}
+            for team_id in sorted(team_ids)
+        ],
+    )
+
+
+def refresh_teams(db: Session, hackathon_id: int, round_name: SubmissionRound, team_ids: set[int]) -> None:
+    # Recomputes the totals from the scores and criterion weights as stored, for the given teams only.
+    totals = weighted_totals(hackathon_id, round_name).where(Score.team_id.in_(team_ids)).subquery()
+    source = select(
+        literal(hackathon_id),
+        literal(round_name, LeaderboardEntry.__table__.c.round.type),
+        totals.c.team_id,
+        totals.c.total_score,
+    ).where(true())  # SQLite needs a WHERE before ON CONFLICT in INSERT ... SELECT to parse the upsert.
+    stmt = dialect_insert(db, LeaderboardEntry).from_select(
+        ["hackathon_id", "round", "team_id", "total_score"], source
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["hackathon_id", "round", "team_id"], set_={"total_score": stmt.excluded.total_score}
+        )
+    )
+
+
+def rebuild(db: Session, hackathon_id: int, round_name: SubmissionRound) -> int:
+    db.query(LeaderboardEntry).filter(*_board_filter(hackathon_id, round_name)).delete(synchronize_session=False)
+    totals = weighted_totals(hackathon_id, round_name).subquery()
+    source = select(
+        literal(hackathon_id),
+        literal(round_name, LeaderboardEntry.__table__.c.round.type),
+        totals.c.team_id,
+        totals.c.total_score,
+    )
+    result = db.execute(
+        insert(LeaderboardEntry).from_select(["hackathon_id", "round", "team_id", "total_score"], source)
+    )
+    return result.rowcount
+
+
+def backfill(db: Session) -> int:
+    # Builds every board that has scores; for databases that had scores before the table existed.
+    boards = db.execute(
+        select(EvaluationCriterion.hackathon_id, EvaluationCriterion.round)
+        .join(Score, Score.criterion_id == EvaluationCriterion.id)
+        .distinct()
+    ).all()
+    for hackathon_id, round_name in boards:
+        rebuild(db, hackathon_id, round_name)
+    return len(boards)
+
+
+def find_drift(db: Session, hackathon_id: int, round_name: SubmissionRound) -> list[dict]:
+    expected = dict(db.execute(weighted_totals(hackathon_id, round_name)).all())
+    actual = dict(
+        db.query(LeaderboardEntry.team_id, LeaderboardEntry.total_score)
+        .filter(*_board_filter(hackathon_id, round_name))
+        .all()
+    )
+    drift = []
+    for team_id in sorted(expected.keys() | actual.keys()):
+        want, have = expected.get(team_id, 0.0), actual.get(team_id, 0.0)
+        if abs(want - have) > DRIFT_TOLERANCE:
+            drift.append({"team_id": team_id, "expected": want, "actual": have})
+    return drift
+
+
+def ranked_board(hackathon_id: int, round_name: SubmissionRound):
+    total = func.coalesce(LeaderboardEntry.total_score, 0.0)
+    return (
+        select(
+            Team.id.label("team_id"),
+            Team.name.label("team_name"),
+            total.label("total_score"),
+            func.rank().over(order_by=total.desc()).label("rank"),
+        )
+        .outerjoin(
+            LeaderboardEntry,
+            and_(LeaderboardEntry.team_id == Team.id, *_board_filter(hackathon_id, round_name)),
+        )
+        .where(Team.hackathon_id == hackathon_id)
+        .subquery()
+    )
+
+
+def board_page(
+    hackathon_id: int,
+    round_name: SubmissionRound,
+    limit: int | None = None,
+    offset: int = 0,
+    team_id: int | None = None,
+):
+    ranked = ranked_board(hackathon_id, round_name)
+    query = select(ranked).order_by(ranked.c.rank, ranked.c.team_id)
+    if team_id is not None:
+        query = query.where(ranked.c.team_id == team_id)
+    return query.offset(offset).limit(limit)
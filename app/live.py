@@ -0,0 +1,128 @@
+import asyncio
+from dataclasses import dataclass, field
+import logging
+import os
+from typing import Callable
+
+from .database import SessionLocal
+from .leaderboard import board_page
+from .models import SubmissionRound
+
+logger = logging.getLogger(__name__)
+
+BoardKey = tuple[int, SubmissionRound]
+SUBSCRIBER_QUEUE_SIZE = 32
+
+
+def load_board(hackathon_id: int, round_name: SubmissionRound) -> list[dict]:
+    with SessionLocal() as db:
+        rows = db.execute(board_page(hackathon_id, round_name)).all()
+    return [
+        {"team_id": r.team_id, "team_name": r.team_name, "total_score": round(r.total_score, 2), "rank": r.rank}
+        for r in rows
+    ]
+
+
+@dataclass
+class _Board:
+    dirty: asyncio.Event = field(default_factory=asyncio.Event)
+    subscribers: set[asyncio.Queue] = field(default_factory=set)
+    snapshot: dict[int, dict] | None = None
+    task: asyncio.Task | None = None
+
+    def diff(self, rows: list[dict]) -> list[dict]:
+        previous = self.snapshot or {}
+        self.snapshot = {row["team_id"]: row for row in rows}
+        deltas = []
+        for row in rows:
+            before = previous.get(row["team_id"])
+            if before is None or before["rank"] != row["rank"] or before["total_score"] != row["total_score"]:
+                deltas.append({**row, "previous_rank": before["rank"] if before else None})
+        return deltas
+
+
+class LeaderboardBroadcaster:
+    def __init__(
+        self,
+        loader: Callable[[int, SubmissionRound], list[dict]],
+        max_rate: float,
+        keepalive: float = 15.0,
+    ):
+        self._loader = loader
+        self._interval = 1.0 / max_rate
+        self._keepalive = keepalive
+        self._boards: dict[BoardKey, _Board] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def subscriber_count(self, hackathon_id: int, round_name: SubmissionRound) -> int:
+        board = self._boards.get((hackathon_id, round_name))
+        return len(board.subscribers) if board else 0
+
+    def notify(self, hackathon_id: int, round_name: SubmissionRound) -> None:
+        # Called after a score commit, from threadpool (sync) or event-loop (async) handlers alike.
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._mark_dirty, (hackathon_id, round_name))
+
+    def _mark_dirty(self, key: BoardKey) -> None:
+        board = self._boards.get(key)
+        if board:
+            board.dirty.set()
+
+    async def subscribe(self, hackathon_id: int, round_name: SubmissionRound):
+        self._loop = asyncio.get_running_loop()
+        key = (hackathon_id, round_name)
+        board = self._boards.get(key)
+        if board is None:
+            board = self._boards[key] = _Board()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        board.subscribers.add(queue)
+        try:
+            if board.snapshot is None:
+                board.diff(await asyncio.to_thread(self._loader, hackathon_id, round_name))
+            if board.task is None:
+                board.task = asyncio.create_task(self._pump(key, board))
+            yield {"type": "snapshot", "rows": list(board.snapshot.values())}
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=self._keepalive)
+                except asyncio.TimeoutError:
+                    yield {"type": "ping"}
+        finally:
+            board.subscribers.discard(queue)
+            if not board.subscribers and self._boards.get(key) is board:
+                del self._boards[key]
+                if board.task:
+                    board.task.cancel()
+
+    async def _pump(self, key: BoardKey, board: _Board) -> None:
+        # One loader call per tick, however many dashboards are listening; bursts of
+        # score submissions inside a tick collapse into a single delta event.
+        while True:
+            await board.dirty.wait()
+            board.dirty.clear()
+            try:
+                rows = await asyncio.to_thread(self._loader, *key)
+            except Exception:
+                # Keep the pump alive for the subscribers it serves; the board is retried next tick.
+                logger.exception("Leaderboard load failed for %s", key)
+                board.dirty.set()
+            else:
+                deltas = board.diff(rows)
+                if deltas:
+                    self._publish(board, {"type": "delta", "rows": deltas})
+            await asyncio.sleep(self._interval)
+
+    def _publish(self, board: _Board, event: dict) -> None:
+        for queue in board.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A slow consumer gets a fresh snapshot instead of an unbounded backlog.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "snapshot", "rows": list(board.snapshot.values())})
+
+
+broadcaster = LeaderboardBroadcaster(load_board, max_rate=float(os.getenv("LEADERBOARD_STREAM_MAX_RATE", "2")))
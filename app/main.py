@@ -1,51 +1,70 @@
-from collections import defaultdict
 from datetime import datetime, timedelta
+from typing import Literal
 import hashlib
+import asyncio
+import json
 import logging
 import secrets
 
-from fastapi import Depends, FastAPI, Header, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException, Query, UploadFile
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from datetime import datetime
-import logging
-import secrets
-
-from fastapi import Depends, FastAPI, HTTPException
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
-
-import secrets
-
-from fastapi import Depends, FastAPI, HTTPException
-from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from .database import Base, EFFECTIVE_DATABASE_URL, engine, get_db
+from . import analytics
+from . import database
+from . import exports
+from . import leaderboard as leaderboard_store
+from . import metadata_cache
+from .profiling import ProfilingMiddleware, instrument, profiler
+from .auth_cache import AuthPrincipal, session_cache
+from . import qr_issuance
+from . import qr_tokens
+from . import ranking
+from . import roster
+from . import scanning
+from . import schema
+from . import scoring
+from . import sweeper
+from . import teams
+from . import verification
+from .live import broadcaster
+from .database import (
+    AsyncSessionLocal,
+    get_async_db,
+    get_async_read_db,
+    get_db,
+    get_read_db,
+    pool_stats,
+)
 from .models import (
     AuthSession,
-
-from .models import (
     EvaluationCriterion,
     Hackathon,
     ProblemStatement,
-    QRStatus,
-    QRToken,
     QRPurpose,
-    ScanLog,
+    QRToken,
     Score,
     Submission,
     SubmissionRound,
     SubmissionStatus,
     Team,
-    TeamMember,
     User,
     UserRole,
     VerificationStatus,
 )
 from .schemas import (
     AuthResponse,
+    BatchScanRequest,
+    BatchScanResult,
+    BulkVerificationAction,
+    BulkVerificationResult,
+    BulkQRGenerate,
     CriterionCreate,
+    CriterionUpdate,
     DocumentUpload,
     HackathonCreate,
     LeaderboardRow,
@@ -53,10 +72,19 @@ from .schemas import (
     OTPVerify,
     ProblemStatementCreate,
     QRGenerate,
+    RankingRow,
+    ReviewQueuePage,
     ScanRequest,
     ScoreCreate,
+    ScoreSheet,
+    ScoreSheetEntry,
+    ScoreSheetResult,
     SubmissionCreate,
     TeamCreate,
+    TeamImport,
+    TeamImportResult,
+    UserCreate,
+    UserImportReport,
     UserOut,
     UserSignup,
     VerificationAction,
@@ -64,60 +92,116 @@ from .schemas import (
 
 app = FastAPI(title="College Hackathon Management API", version="0.2.0")
 app.mount("/assets", StaticFiles(directory="frontend"), name="assets")
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+# Listeners are a no-op outside a profiled request, so they stay installed and PROFILING only toggles the middleware.
+# They go on the Engine class so engines built lazily on the first request are covered too.
+instrument(Engine)
 logger = logging.getLogger(__name__)
+# The request hot paths (login, scan, single score, leaderboard) exist in both flavours. Exactly one
+# router is mounted at the bottom of this module: async when an async engine is available, else sync.
+sync_routes = APIRouter()
+async_routes = APIRouter()
 
 
 def _hash_password(password: str) -> str:
     return hashlib.sha256(password.encode()).hexdigest()
 
 
+def _new_session(user_id: int) -> AuthSession:
+    return AuthSession(user_id=user_id, token=secrets.token_urlsafe(32), expires_at=datetime.utcnow() + timedelta(days=7))
+
+
 def _issue_token(db: Session, user_id: int) -> str:
-    token = secrets.token_urlsafe(32)
-    session = AuthSession(user_id=user_id, token=token, expires_at=datetime.utcnow() + timedelta(days=7))
+    session = _new_session(user_id)
     db.add(session)
     db.commit()
-    return token
+    return session.token
 
 
-def get_current_user(
-    authorization: str | None = Header(default=None),
-    db: Session = Depends(get_db),
-) -> User:
+def _bearer_token(authorization: str | None) -> str:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing bearer token")
-    token = authorization.replace("Bearer ", "", 1)
-    session = db.query(AuthSession).filter(AuthSession.token == token).first()
-    if not session or session.expires_at < datetime.utcnow():
+    return authorization.replace("Bearer ", "", 1)
+
+
+def _session_lookup(token: str):
+    return (
+        select(AuthSession.user_id, AuthSession.expires_at, User.role, User.verification_status)
+        .join(User, User.id == AuthSession.user_id)
+        .where(AuthSession.token == token)
+    )
+
+
+def _cache_principal(token: str, row) -> AuthPrincipal:
+    if not row:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
-    user = db.get(User, session.user_id)
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
-    return user
+    principal = AuthPrincipal(
+        id=row.user_id, role=row.role, verification_status=row.verification_status, expires_at=row.expires_at
+    )
+    session_cache.put(token, principal)
+    return principal
+
+
+def _check_expiry(token: str, principal: AuthPrincipal) -> AuthPrincipal:
+    if principal.expires_at < datetime.utcnow():
+        session_cache.invalidate_token(token)
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return principal
+
+
+def get_current_user(
+    authorization: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+) -> AuthPrincipal:
+    token = _bearer_token(authorization)
+    principal = session_cache.get(token)
+    if principal is None:
+        principal = _cache_principal(token, db.execute(_session_lookup(token)).first())
+        # The route body runs on another threadpool worker; holding this connection across that hop
+        # deadlocks once every worker is parked waiting for the pool.
+        db.rollback()
+    return _check_expiry(token, principal)
+
+
+async def get_current_user_async(
+    authorization: str | None = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+) -> AuthPrincipal:
+    token = _bearer_token(authorization)
+    principal = session_cache.get(token)
+    if principal is None:
+        principal = _cache_principal(token, (await db.execute(_session_lookup(token))).first())
+        # Routes that open a second session (the read replica one) would otherwise hold two pooled
+        # connections each and starve the pool under a cold-cache burst.
+        await db.rollback()
+    return _check_expiry(token, principal)
 
 
 def require_roles(*roles: UserRole):
-    def checker(user: User = Depends(get_current_user)):
+    def checker(user: AuthPrincipal = Depends(get_current_user)):
         if user.role not in roles:
             raise HTTPException(status_code=403, detail="Insufficient permission")
         return user
 
     return checker
-    UserCreate,
-    UserOut,
-    VerificationAction,
-)
 
-app = FastAPI(title="College Hackathon Management API", version="0.1.0")
-app.mount("/assets", StaticFiles(directory="frontend"), name="assets")
 
+def require_roles_async(*roles: UserRole):
+    # An async checker keeps async routes off the threadpool; FastAPI runs sync dependencies in it.
+    async def checker(user: AuthPrincipal = Depends(get_current_user_async)):
+        if user.role not in roles:
+            raise HTTPException(status_code=403, detail="Insufficient permission")
+        return user
 
-logger = logging.getLogger(__name__)
+    return checker
 
 
-@app.on_event("startup")
-def init_db():
+def _prepare_schema(bind) -> None:
     try:
-        Base.metadata.create_all(bind=engine)
+        if database.startup_mode() == "lazy":
+            schema.ensure_schema(bind)
+        else:
+            schema.create_schema(bind)
         app.state.db_ready = True
         app.state.startup_error = None
     except Exception as exc:
@@ -126,28 +210,70 @@ def init_db():
         logger.exception("Database initialization failed during startup")
 
 
+if database.startup_mode() == "lazy":
+    # Nothing touches the database at startup; the first request that opens a session runs the schema
+    # check. Until then db_ready is None ("not checked yet").
+    app.state.db_ready = None
+    database.on_connect(_prepare_schema)
+
+
+@app.on_event("startup")
+def require_qr_signing_key():
+    if qr_tokens.SIGNING_KEY is None:
+        raise qr_tokens.MissingSigningKey("QR_SIGNING_KEY must be set before the server starts")
+
+
+@app.on_event("startup")
+def init_db():
+    if database.startup_mode() != "lazy":
+        _prepare_schema(database.engine)
+
+
+@app.on_event("startup")
+async def start_sweeper():
+    interval = sweeper.sweep_interval()
+    app.state.sweeper_task = asyncio.create_task(sweeper.sweep_periodically(interval)) if interval > 0 else None
+
+
+@app.on_event("shutdown")
+async def stop_sweeper():
+    task = getattr(app.state, "sweeper_task", None)
+    if task:
+        task.cancel()
+    if database.connected() and database.async_engine is not None:
+        await database.async_engine.dispose()
+
+
 @app.get("/", include_in_schema=False)
 def root():
     return FileResponse("frontend/index.html")
 
-@app.get("/")
-def root():
-    return {
-        "message": "College Hackathon Management API",
-        "health": "/health",
-        "docs": "/docs",
-    }
 
 @app.get("/health")
 def health_check():
+    # Answers without opening a connection, so a cold instance can report before its engine exists.
+    db_ready = getattr(app.state, "db_ready", False)
+    database_url = database.EFFECTIVE_DATABASE_URL if database.connected() else database.DATABASE_URL
     return {
-        "status": "ok" if getattr(app.state, "db_ready", False) else "degraded",
-        "db_ready": getattr(app.state, "db_ready", False),
-        "database_backend": EFFECTIVE_DATABASE_URL.split(":", 1)[0],
+        "status": "degraded" if db_ready is False else "ok",
+        "db_ready": db_ready,
+        "startup_mode": database.startup_mode(),
+        "database_backend": database_url.split(":", 1)[0],
         "startup_error": getattr(app.state, "startup_error", None),
+        "auth_cache": session_cache.stats(),
+        "metadata_cache": metadata_cache.cache.stats(),
+        "db_pool": pool_stats(),
+        "profiling": profiler.enabled,
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    if not profiler.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled; set PROFILING=1")
+    return PlainTextResponse(profiler.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.post("/auth/signup", response_model=UserOut)
 def signup(payload: UserSignup, db: Session = Depends(get_db)):
     if db.query(User).filter((User.email == payload.email) | (User.phone == payload.phone)).first():
@@ -159,6 +285,12 @@ def signup(payload: UserSignup, db: Session = Depends(get_db)):
         role=payload.role,
         password_hash=_hash_password(payload.password),
     )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
 @app.post("/auth/register", response_model=UserOut)
 def register(payload: UserCreate, db: Session = Depends(get_db)):
     if db.query(User).filter((User.email == payload.email) | (User.phone == payload.phone)).first():
@@ -170,7 +302,21 @@ def register(payload: UserCreate, db: Session = Depends(get_db)):
     return user
 
 
-@app.post("/auth/login", response_model=AuthResponse)
+@app.post("/admin/users/import", response_model=UserImportReport)
+def import_students(
+    file: UploadFile,
+    format: Literal["csv", "ndjson"] = "csv",
+    db: Session = Depends(get_db),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
+):
+    reader = roster.read_ndjson if format == "ndjson" else roster.read_csv
+    try:
+        return roster.import_students(db, reader(file.file))
+    except roster.RosterFormatError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+
+@sync_routes.post("/auth/login", response_model=AuthResponse)
 def login(payload: LoginRequest, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == payload.email).first()
     if not user or user.password_hash != _hash_password(payload.password):
@@ -179,15 +325,37 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
     return {"access_token": token, "token_type": "bearer", "user": user}
 
 
+@async_routes.post("/auth/login", response_model=AuthResponse)
+async def login_async(payload: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    user = (await db.execute(select(User).where(User.email == payload.email))).scalars().first()
+    if not user or user.password_hash != _hash_password(payload.password):
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    session = _new_session(user.id)
+    db.add(session)
+    await db.commit()
+    return {"access_token": session.token, "token_type": "bearer", "user": user}
+
+
+@app.post("/auth/logout")
+def logout(
+    authorization: str = Header(),
+    db: Session = Depends(get_db),
+    _: AuthPrincipal = Depends(get_current_user),
+):
+    token = authorization.replace("Bearer ", "", 1)
+    db.query(AuthSession).filter(AuthSession.token == token).delete(synchronize_session=False)
+    db.commit()
+    session_cache.invalidate_token(token)
+    return {"revoked": True}
+
+
 @app.get("/auth/me", response_model=UserOut)
-def me(user: User = Depends(get_current_user)):
-    return user
+def me(db: Session = Depends(get_db), user: AuthPrincipal = Depends(get_current_user)):
+    return db.get(User, user.id)
 
 
 @app.post("/auth/verify-otp", response_model=UserOut)
-def verify_otp(payload: OTPVerify, db: Session = Depends(get_db), _: User = Depends(get_current_user)):
-@app.post("/auth/verify-otp", response_model=UserOut)
-def verify_otp(payload: OTPVerify, db: Session = Depends(get_db)):
+def verify_otp(payload: OTPVerify, db: Session = Depends(get_db), _: AuthPrincipal = Depends(get_current_user)):
     user = db.get(User, payload.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -200,11 +368,8 @@ def verify_otp(payload: OTPVerify, db: Session = Depends(get_db)):
 
 
 @app.post("/verification/upload-documents", response_model=UserOut)
-def upload_documents(payload: DocumentUpload, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
-def upload_documents(user_id: int, payload: DocumentUpload, db: Session = Depends(get_db)):
-    user = db.get(User, user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+def upload_documents(payload: DocumentUpload, db: Session = Depends(get_db), user: AuthPrincipal = Depends(get_current_user)):
+    user = db.get(User, user.id)
     user.college_id_path = payload.college_id_path
     user.aadhaar_masked = payload.aadhaar_masked
     user.selfie_path = payload.selfie_path
@@ -214,36 +379,55 @@ def upload_documents(user_id: int, payload: DocumentUpload, db: Session = Depend
 
 
 @app.post("/verification/face-match")
-def face_match(db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def face_match(db: Session = Depends(get_db), user: AuthPrincipal = Depends(get_current_user)):
     user = db.get(User, user.id)
     if not user.college_id_path or not user.selfie_path:
         raise HTTPException(status_code=400, detail="Upload documents first")
     return {"user_id": user.id, "face_match": True, "score": 0.93}
 
 
+@app.get("/admin/verification/queue", response_model=ReviewQueuePage)
+def verification_queue(
+    status: VerificationStatus = VerificationStatus.PENDING,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
+):
+    try:
+        users, next_cursor = verification.review_page(db, status, limit, cursor)
+    except verification.InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return {"items": users, "next_cursor": next_cursor}
+
+
+@app.post("/admin/verification/bulk", response_model=BulkVerificationResult)
+def admin_verify_bulk(
+    payload: BulkVerificationAction,
+    db: Session = Depends(get_db),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
+):
+    updated = verification.set_status(db, payload.user_ids, payload.status)
+    db.commit()
+    for user_id in updated:
+        session_cache.invalidate_user(user_id)
+    found = set(updated)
+    return {"updated": sorted(found), "not_found": sorted(set(payload.user_ids) - found)}
+
+
 @app.patch("/admin/verification/{user_id}", response_model=UserOut)
 def admin_verify(
     user_id: int,
     payload: VerificationAction,
     db: Session = Depends(get_db),
-    _: User = Depends(require_roles(UserRole.ADMIN)),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
 ):
-def face_match(user_id: int, db: Session = Depends(get_db)):
-    user = db.get(User, user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    if not user.college_id_path or not user.selfie_path:
-        raise HTTPException(status_code=400, detail="Upload documents first")
-    return {"user_id": user_id, "face_match": True, "score": 0.93}
-
-
-@app.patch("/admin/verification/{user_id}", response_model=UserOut)
-def admin_verify(user_id: int, payload: VerificationAction, db: Session = Depends(get_db)):
     user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     user.verification_status = payload.status
     db.commit()
+    session_cache.invalidate_user(user_id)
     db.refresh(user)
     return user
 
@@ -252,9 +436,8 @@ def admin_verify(user_id: int, payload: VerificationAction, db: Session = Depend
 def create_hackathon(
     payload: HackathonCreate,
     db: Session = Depends(get_db),
-    _: User = Depends(require_roles(UserRole.ADMIN)),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
 ):
-def create_hackathon(payload: HackathonCreate, db: Session = Depends(get_db)):
     hackathon = Hackathon(**payload.model_dump())
     db.add(hackathon)
     db.commit()
@@ -267,10 +450,9 @@ def add_problem_statement(
     hackathon_id: int,
     payload: ProblemStatementCreate,
     db: Session = Depends(get_db),
-    _: User = Depends(require_roles(UserRole.ADMIN)),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
 ):
-def add_problem_statement(hackathon_id: int, payload: ProblemStatementCreate, db: Session = Depends(get_db)):
-    if not db.get(Hackathon, hackathon_id):
+    if not metadata_cache.hackathon(db, hackathon_id):
         raise HTTPException(status_code=404, detail="Hackathon not found")
     ps = ProblemStatement(hackathon_id=hackathon_id, **payload.model_dump())
     db.add(ps)
@@ -280,71 +462,63 @@ def add_problem_statement(hackathon_id: int, payload: ProblemStatementCreate, db
 
 
 @app.post("/teams")
-def create_team(payload: TeamCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def create_team(payload: TeamCreate, db: Session = Depends(get_db), user: AuthPrincipal = Depends(get_current_user)):
     if user.id != payload.captain_id and user.role != UserRole.ADMIN:
         raise HTTPException(status_code=403, detail="Can create only your own team")
-def create_team(payload: TeamCreate, db: Session = Depends(get_db)):
-    if not db.get(Hackathon, payload.hackathon_id):
-        raise HTTPException(status_code=404, detail="Hackathon not found")
-    captain = db.get(User, payload.captain_id)
-    if not captain or captain.verification_status != VerificationStatus.APPROVED:
-        raise HTTPException(status_code=400, detail="Captain must be verified")
-
-    team = Team(
-        hackathon_id=payload.hackathon_id,
-        name=payload.name,
-        captain_id=payload.captain_id,
-        problem_statement_id=payload.problem_statement_id,
-    )
-    db.add(team)
-    db.flush()
-
-    all_members = set(payload.member_ids + [payload.captain_id])
-    for member_id in all_members:
-        member = db.get(User, member_id)
-        if not member or member.verification_status != VerificationStatus.APPROVED:
-            db.rollback()
-            raise HTTPException(status_code=400, detail=f"Member {member_id} not verified")
-        db.add(TeamMember(team_id=team.id, user_id=member_id))
-    for user_id in all_members:
-        user = db.get(User, user_id)
-        if not user or user.verification_status != VerificationStatus.APPROVED:
-            db.rollback()
-            raise HTTPException(status_code=400, detail=f"Member {user_id} not verified")
-        db.add(TeamMember(team_id=team.id, user_id=user_id))
-
+    problems = teams.find_problems(db, [payload])
+    if problems:
+        _, status_code, detail = problems[0]
+        raise HTTPException(status_code=status_code, detail=detail)
+    (team,) = teams.create_teams(db, [payload])
     db.commit()
     db.refresh(team)
     return team
 
 
+def _import_teams(db: Session, payloads: list[TeamCreate]) -> dict:
+    problems = teams.find_problems(db, payloads)
+    if problems:
+        raise HTTPException(
+            status_code=400, detail=[{"row": index, "name": payloads[index].name, "error": error} for index, _, error in problems]
+        )
+    created = teams.create_teams(db, payloads)
+    db.commit()
+    return {"created": len(created), "team_ids": [team.id for team in created]}
+
+
+@app.post("/admin/teams/import", response_model=TeamImportResult)
+def import_teams(payload: TeamImport, db: Session = Depends(get_db), _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN))):
+    return _import_teams(db, payload.teams)
+
+
+@app.post("/admin/teams/import/csv", response_model=TeamImportResult)
+def import_teams_csv(file: UploadFile, db: Session = Depends(get_db), _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN))):
+    try:
+        payloads = teams.parse_csv(file.file)
+    except teams.TeamImportError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    if not payloads:
+        raise HTTPException(status_code=400, detail="No teams in file")
+    return _import_teams(db, payloads)
+
+
 def _ensure_submission_allowed(db: Session, team_id: int, round_name: SubmissionRound):
     team = db.get(Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
-    hackathon = db.get(Hackathon, team.hackathon_id)
-    now = datetime.utcnow()
-    deadline = hackathon.round1_deadline if round_name == SubmissionRound.ROUND1 else hackathon.final_deadline
-    if now > deadline:
+    hackathon = metadata_cache.hackathon(db, team.hackathon_id)
+    if datetime.utcnow() > hackathon.deadline(round_name):
         raise HTTPException(status_code=400, detail="Submission deadline passed")
 
 
 @app.post("/submissions")
-def create_submission(payload: SubmissionCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def create_submission(payload: SubmissionCreate, db: Session = Depends(get_db), user: AuthPrincipal = Depends(get_current_user)):
     _ensure_submission_allowed(db, payload.team_id, payload.round)
     team = db.get(Team, payload.team_id)
     if user.role != UserRole.ADMIN and user.id != team.captain_id:
         raise HTTPException(status_code=403, detail="Only captain can submit")
 
     existing = db.query(Submission).filter(Submission.team_id == payload.team_id, Submission.round == payload.round).first()
-def create_submission(payload: SubmissionCreate, db: Session = Depends(get_db)):
-    _ensure_submission_allowed(db, payload.team_id, payload.round)
-
-    existing = (
-        db.query(Submission)
-        .filter(Submission.team_id == payload.team_id, Submission.round == payload.round)
-        .first()
-    )
     if existing and existing.status == SubmissionStatus.LOCKED:
         raise HTTPException(status_code=400, detail="Submission is locked")
 
@@ -368,15 +542,10 @@ def create_submission(payload: SubmissionCreate, db: Session = Depends(get_db)):
 def lock_submissions(
     round_name: SubmissionRound,
     db: Session = Depends(get_db),
-    _: User = Depends(require_roles(UserRole.ADMIN)),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
 ):
     updated = db.query(Submission).filter(Submission.round == round_name).update(
         {Submission.status: SubmissionStatus.LOCKED}, synchronize_session=False
-def lock_submissions(round_name: SubmissionRound, db: Session = Depends(get_db)):
-    updated = (
-        db.query(Submission)
-        .filter(Submission.round == round_name)
-        .update({Submission.status: SubmissionStatus.LOCKED}, synchronize_session=False)
     )
     db.commit()
     return {"locked_count": updated}
@@ -386,148 +555,381 @@ def lock_submissions(round_name: SubmissionRound, db: Session = Depends(get_db))
 def add_criterion(
     payload: CriterionCreate,
     db: Session = Depends(get_db),
-    _: User = Depends(require_roles(UserRole.ADMIN)),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
 ):
-def add_criterion(payload: CriterionCreate, db: Session = Depends(get_db)):
     criterion = EvaluationCriterion(**payload.model_dump())
     db.add(criterion)
     db.commit()
     db.refresh(criterion)
+    metadata_cache.invalidate_criterion(criterion.id, criterion.hackathon_id, criterion.round)
+    return criterion
+
+
+@app.patch("/admin/evaluation-criteria/{criterion_id}")
+def update_criterion(
+    criterion_id: int,
+    payload: CriterionUpdate,
+    db: Session = Depends(get_db),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
+):
+    criterion = db.get(EvaluationCriterion, criterion_id)
+    if not criterion:
+        raise HTTPException(status_code=404, detail="Criterion not found")
+    for field, value in payload.model_dump(exclude_unset=True).items():
+        setattr(criterion, field, value)
+    db.flush()
+    leaderboard_store.rebuild(db, criterion.hackathon_id, criterion.round)
+    db.commit()
+    metadata_cache.invalidate_criterion(criterion.id, criterion.hackathon_id, criterion.round)
+    broadcaster.notify(criterion.hackathon_id, criterion.round)
+    db.refresh(criterion)
     return criterion
 
 
-@app.post("/judge/scores")
-def submit_score(payload: ScoreCreate, db: Session = Depends(get_db), user: User = Depends(get_current_user)):
+def _record_scores(db: Session, judge_id: int, round_name: SubmissionRound, entries: list[ScoreSheetEntry]) -> int:
+    try:
+        hackathon_id = scoring.record_scores(db, judge_id, round_name, entries)
+    except scoring.ScoreSheetError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    db.commit()
+    broadcaster.notify(hackathon_id, round_name)
+    return hackathon_id
+
+
+def _score_lookup(payload: ScoreCreate):
+    return select(Score).where(
+        Score.team_id == payload.team_id,
+        Score.round == payload.round,
+        Score.judge_id == payload.judge_id,
+        Score.criterion_id == payload.criterion_id,
+    )
+
+
+@sync_routes.post("/judge/scores")
+def submit_score(payload: ScoreCreate, db: Session = Depends(get_db), user: AuthPrincipal = Depends(get_current_user)):
     if user.role not in (UserRole.JUDGE, UserRole.ADMIN):
         raise HTTPException(status_code=403, detail="Judge role required")
-def submit_score(payload: ScoreCreate, db: Session = Depends(get_db)):
-    judge = db.get(User, payload.judge_id)
-    if not judge or judge.role != UserRole.JUDGE:
-        raise HTTPException(status_code=400, detail="Judge role required")
-    criterion = db.get(EvaluationCriterion, payload.criterion_id)
-    if not criterion or criterion.round != payload.round:
-        raise HTTPException(status_code=400, detail="Invalid criterion for round")
-    record = Score(**payload.model_dump())
-    db.add(record)
-    db.commit()
-    db.refresh(record)
-    return record
+    entry = ScoreSheetEntry(team_id=payload.team_id, criterion_id=payload.criterion_id, score=payload.score)
+    _record_scores(db, payload.judge_id, payload.round, [entry])
+    return db.execute(_score_lookup(payload)).scalar_one()
 
 
-@app.get("/admin/leaderboard", response_model=list[LeaderboardRow])
+@async_routes.post("/judge/scores")
+async def submit_score_async(
+    payload: ScoreCreate, db: AsyncSession = Depends(get_async_db), user: AuthPrincipal = Depends(get_current_user_async)
+):
+    if user.role not in (UserRole.JUDGE, UserRole.ADMIN):
+        raise HTTPException(status_code=403, detail="Judge role required")
+    entry = ScoreSheetEntry(team_id=payload.team_id, criterion_id=payload.criterion_id, score=payload.score)
+    try:
+        hackathon_id = await db.run_sync(scoring.record_scores, payload.judge_id, payload.round, [entry])
+    except scoring.ScoreSheetError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    await db.commit()
+    broadcaster.notify(hackathon_id, payload.round)
+    return (await db.execute(_score_lookup(payload))).scalar_one()
+
+
+@app.post("/judge/score-sheets", response_model=ScoreSheetResult)
+def submit_score_sheet(payload: ScoreSheet, db: Session = Depends(get_db), user: AuthPrincipal = Depends(get_current_user)):
+    if user.role not in (UserRole.JUDGE, UserRole.ADMIN):
+        raise HTTPException(status_code=403, detail="Judge role required")
+    hackathon_id = _record_scores(db, payload.judge_id, payload.round, payload.scores)
+    return {
+        "hackathon_id": hackathon_id,
+        "round": payload.round,
+        "written": len(payload.scores),
+        "teams": len({entry.team_id for entry in payload.scores}),
+    }
+
+
+def _leaderboard_rows(rows) -> list[LeaderboardRow]:
+    return [
+        LeaderboardRow(team_id=r.team_id, team_name=r.team_name, total_score=round(r.total_score, 2), rank=r.rank)
+        for r in rows
+    ]
+
+
+@sync_routes.get("/admin/leaderboard", response_model=list[LeaderboardRow])
 def leaderboard(
+    hackathon_id: int,
+    round_name: SubmissionRound,
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    offset: int = Query(default=0, ge=0),
+    team_id: int | None = None,
+    db: Session = Depends(get_read_db),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN, UserRole.JUDGE)),
+):
+    page = leaderboard_store.board_page(hackathon_id, round_name, limit, offset, team_id)
+    return _leaderboard_rows(db.execute(page).all())
+
+
+@async_routes.get("/admin/leaderboard", response_model=list[LeaderboardRow])
+async def leaderboard_async(
+    hackathon_id: int,
+    round_name: SubmissionRound,
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    offset: int = Query(default=0, ge=0),
+    team_id: int | None = None,
+    db: AsyncSession = Depends(get_async_read_db),
+    _: AuthPrincipal = Depends(require_roles_async(UserRole.ADMIN, UserRole.JUDGE)),
+):
+    page = leaderboard_store.board_page(hackathon_id, round_name, limit, offset, team_id)
+    return _leaderboard_rows((await db.execute(page)).all())
+
+
+@app.get("/admin/leaderboard/ranking", response_model=list[RankingRow])
+def final_ranking(
+    hackathon_id: int,
+    round_name: SubmissionRound,
+    tie_break: list[str] = Query(default=list(ranking.DEFAULT_TIE_BREAK)),
+    db: Session = Depends(get_read_db),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN, UserRole.JUDGE)),
+):
+    matrix = ranking.load_matrix(db, hackathon_id, round_name)
+    return ranking.rank(matrix, tuple(tie_break))
+
+
+@app.get("/admin/leaderboard/stream")
+def leaderboard_stream(
+    hackathon_id: int,
+    round_name: SubmissionRound,
+    db: Session = Depends(get_db),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN, UserRole.JUDGE)),
+):
+    # Release the auth lookup's connection; the stream itself never touches this session.
+    db.close()
+
+    async def events():
+        async for event in broadcaster.subscribe(hackathon_id, round_name):
+            if event["type"] == "ping":
+                yield ": ping\n\n"
+            else:
+                yield f"event: {event['type']}\ndata: {json.dumps(event['rows'])}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/admin/leaderboard/consistency")
+def leaderboard_consistency(
     hackathon_id: int,
     round_name: SubmissionRound,
     db: Session = Depends(get_db),
-    _: User = Depends(require_roles(UserRole.ADMIN, UserRole.JUDGE)),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
 ):
-    teams = db.query(Team).filter(Team.hackathon_id == hackathon_id).all()
-    criteria = db.query(EvaluationCriterion).filter(
-        EvaluationCriterion.hackathon_id == hackathon_id, EvaluationCriterion.round == round_name
-    ).all()
-def leaderboard(hackathon_id: int, round_name: SubmissionRound, db: Session = Depends(get_db)):
-    teams = db.query(Team).filter(Team.hackathon_id == hackathon_id).all()
-    criteria = (
-        db.query(EvaluationCriterion)
-        .filter(EvaluationCriterion.hackathon_id == hackathon_id, EvaluationCriterion.round == round_name)
-        .all()
+    drift = leaderboard_store.find_drift(db, hackathon_id, round_name)
+    return {"consistent": not drift, "drift": drift}
+
+
+@app.post("/admin/leaderboard/rebuild")
+def rebuild_leaderboard(
+    hackathon_id: int,
+    round_name: SubmissionRound,
+    db: Session = Depends(get_db),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
+):
+    drift = leaderboard_store.find_drift(db, hackathon_id, round_name)
+    rebuilt = leaderboard_store.rebuild(db, hackathon_id, round_name)
+    db.commit()
+    broadcaster.notify(hackathon_id, round_name)
+    return {"rebuilt_rows": rebuilt, "drift_repaired": len(drift)}
+
+
+def _export_response(name: str, fmt: str, compress: bool, export, **params) -> StreamingResponse:
+    filename = f"{name}.{fmt}" + (".gz" if compress else "")
+    return StreamingResponse(
+        exports.stream(export, fmt, compress, **params),
+        media_type="application/gzip" if compress else exports.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
-    weights = {c.id: c.weight for c in criteria}
-    totals = defaultdict(float)
 
-    scores = db.query(Score).filter(Score.round == round_name).all()
-    for score in scores:
-        totals[score.team_id] += score.score * weights.get(score.criterion_id, 0.0)
 
-    rows = [LeaderboardRow(team_id=t.id, team_name=t.name, total_score=round(totals[t.id], 2)) for t in teams]
-    return sorted(rows, key=lambda row: row.total_score, reverse=True)
+def _require_hackathon(db: Session, hackathon_id: int) -> None:
+    if not metadata_cache.hackathon(db, hackathon_id):
+        raise HTTPException(status_code=404, detail="Hackathon not found")
+    # The export streams from its own session; do not hold this one for the whole download.
+    db.close()
 
 
-@app.post("/qr/generate")
-def generate_qr(payload: QRGenerate, db: Session = Depends(get_db), _: User = Depends(require_roles(UserRole.ADMIN))):
-    for s in scores:
-        totals[s.team_id] += s.score * weights.get(s.criterion_id, 0.0)
+@app.get("/admin/exports/leaderboard")
+def export_leaderboard(
+    hackathon_id: int,
+    round_name: SubmissionRound,
+    format: Literal["csv", "ndjson"] = "csv",
+    gzip: bool = False,
+    db: Session = Depends(get_read_db),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
+):
+    _require_hackathon(db, hackathon_id)
+    return _export_response(
+        f"leaderboard-{hackathon_id}-{round_name.value.lower()}",
+        format,
+        gzip,
+        exports.leaderboard,
+        hackathon_id=hackathon_id,
+        round_name=round_name,
+    )
 
-    rows = [LeaderboardRow(team_id=t.id, team_name=t.name, total_score=round(totals[t.id], 2)) for t in teams]
-    return sorted(rows, key=lambda r: r.total_score, reverse=True)
+
+@app.get("/admin/exports/scores")
+def export_score_matrix(
+    hackathon_id: int,
+    round_name: SubmissionRound,
+    judge_id: int | None = None,
+    format: Literal["csv", "ndjson"] = "csv",
+    gzip: bool = False,
+    db: Session = Depends(get_read_db),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
+):
+    _require_hackathon(db, hackathon_id)
+    return _export_response(
+        f"scores-{hackathon_id}-{round_name.value.lower()}",
+        format,
+        gzip,
+        exports.score_matrix,
+        hackathon_id=hackathon_id,
+        round_name=round_name,
+        judge_id=judge_id,
+    )
+
+
+@app.get("/admin/exports/attendance")
+def export_attendance(
+    hackathon_id: int,
+    purpose: QRPurpose | None = None,
+    format: Literal["csv", "ndjson"] = "csv",
+    gzip: bool = False,
+    db: Session = Depends(get_read_db),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
+):
+    _require_hackathon(db, hackathon_id)
+    return _export_response(
+        f"attendance-{hackathon_id}", format, gzip, exports.attendance, hackathon_id=hackathon_id, purpose=purpose
+    )
+
+
+@app.get("/admin/exports/roster")
+def export_roster(
+    status: VerificationStatus | None = None,
+    format: Literal["csv", "ndjson"] = "csv",
+    gzip: bool = False,
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
+):
+    return _export_response("roster", format, gzip, exports.roster, status=status)
 
 
 @app.post("/qr/generate")
-def generate_qr(payload: QRGenerate, db: Session = Depends(get_db)):
+def generate_qr(payload: QRGenerate, db: Session = Depends(get_db), _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN))):
     user = db.get(User, payload.user_id)
     if not user or user.verification_status != VerificationStatus.APPROVED:
         raise HTTPException(status_code=400, detail="Only verified users can receive QR")
-    token = f"{payload.purpose.value}-{secrets.token_urlsafe(16)}"
-    qr = QRToken(token=token, **payload.model_dump())
+    valid_from, valid_to = qr_tokens.naive_utc(payload.valid_from), qr_tokens.naive_utc(payload.valid_to)
+    token = qr_tokens.issue(payload.user_id, payload.hackathon_id, payload.purpose, valid_from, valid_to)
+    qr = QRToken(token=token, **{**payload.model_dump(), "valid_from": valid_from, "valid_to": valid_to})
     db.add(qr)
     db.commit()
     db.refresh(qr)
     return qr
 
 
-@app.post("/scan")
-def scan_qr(payload: ScanRequest, db: Session = Depends(get_db), _: User = Depends(get_current_user)):
-def scan_qr(payload: ScanRequest, db: Session = Depends(get_db)):
-    scanner = db.get(User, payload.scanner_id)
-    if not scanner or scanner.role != UserRole.SCANNER:
-        raise HTTPException(status_code=400, detail="Scanner role required")
-
-    qr = db.query(QRToken).filter(QRToken.token == payload.token).first()
-    if not qr:
-        raise HTTPException(status_code=404, detail="QR token not found")
-
-    now = datetime.utcnow()
-    success = False
-    message = "invalid"
-
-    if qr.status != QRStatus.ACTIVE:
-        message = f"Token already {qr.status.value.lower()}"
-    elif now < qr.valid_from or now > qr.valid_to:
-        qr.status = QRStatus.EXPIRED
-        message = "Token expired or not yet active"
-    else:
-        success = True
-        message = "Scan successful"
-        qr.status = QRStatus.CONSUMED
-        if qr.purpose in (QRPurpose.BREAKFAST, QRPurpose.LUNCH, QRPurpose.DINNER, QRPurpose.ENTRY):
-            qr.status = QRStatus.CONSUMED
-
-    log = ScanLog(qr_token_id=qr.id, scanner_id=scanner.id, success=success, message=message)
-    db.add(log)
+@app.post("/qr/generate/bulk")
+def generate_qr_bulk(
+    payload: BulkQRGenerate,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: Session = Depends(get_db),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
+):
+    if not metadata_cache.hackathon(db, payload.hackathon_id):
+        raise HTTPException(status_code=404, detail="Hackathon not found")
+    manifest = qr_issuance.issue_for_hackathon(db, payload.hackathon_id, payload.windows)
     db.commit()
-    return {"success": success, "message": message, "purpose": qr.purpose}
+    if format == "csv":
+        return StreamingResponse(
+            qr_issuance.manifest_csv(manifest),
+            media_type="text/csv",
+            headers={"Content-Disposition": f"attachment; filename=qr-manifest-{payload.hackathon_id}.csv"},
+        )
+    return StreamingResponse(qr_issuance.manifest_ndjson(manifest), media_type="application/x-ndjson")
+
+
+def _precheck_scan(payload: ScanRequest) -> dict | None:
+    # Signature, scope and validity window are checked without touching the database.
+    try:
+        claims = qr_tokens.verify(payload.token)
+    except qr_tokens.InvalidQRToken as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    if payload.hackathon_id is not None and claims.hackathon_id != payload.hackathon_id:
+        return {"success": False, "message": "Token is for another hackathon", "purpose": claims.purpose}
+    if payload.purpose is not None and claims.purpose != payload.purpose:
+        return {"success": False, "message": f"Token is for {claims.purpose.value.lower()}", "purpose": claims.purpose}
+    if not claims.is_active(datetime.utcnow()):
+        return {"success": False, "message": "Token expired or not yet active", "purpose": claims.purpose}
+    return None
+
+
+@sync_routes.post("/scan")
+def scan_qr(payload: ScanRequest, db: Session = Depends(get_db), _: AuthPrincipal = Depends(get_current_user)):
+    rejected = _precheck_scan(payload)
+    if rejected:
+        return rejected
+    try:
+        outcome = scanning.consume(db, payload.token, payload.scanner_id, datetime.utcnow())
+    except scanning.ScanError as exc:
+        db.rollback()
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    db.commit()
+    return {"success": outcome.success, "message": outcome.message, "purpose": outcome.purpose}
+
+
+@async_routes.post("/scan")
+async def scan_qr_async(
+    payload: ScanRequest, db: AsyncSession = Depends(get_async_db), _: AuthPrincipal = Depends(get_current_user_async)
+):
+    rejected = _precheck_scan(payload)
+    if rejected:
+        return rejected
+    try:
+        # run_sync drives the same conditional UPDATE on the async connection, without a threadpool hop.
+        outcome = await db.run_sync(scanning.consume, payload.token, payload.scanner_id, datetime.utcnow())
+    except scanning.ScanError as exc:
+        await db.rollback()
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    await db.commit()
+    return {"success": outcome.success, "message": outcome.message, "purpose": outcome.purpose}
+
+
+@app.post("/scan/batch", response_model=list[BatchScanResult])
+def scan_batch(payload: BatchScanRequest, db: Session = Depends(get_db), _: AuthPrincipal = Depends(get_current_user)):
+    results = scanning.ingest_batch(db, payload.records)
+    db.commit()
+    return results
 
 
 @app.get("/admin/scan-analytics")
 def scan_analytics(
+    hackathon_id: int,
+    bucket: Literal["minute", "hour"] = "hour",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    detail: bool = False,
+    db: Session = Depends(get_read_db),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
+):
+    # Counters answer the dashboard; per-scanner and failure-reason breakdowns need the raw log.
+    if detail:
+        return analytics.scan_summary(db, hackathon_id, bucket, since, until)
+    return analytics.counter_summary(db, hackathon_id, bucket, since, until)
+
+
+@app.post("/admin/scan-analytics/rebuild")
+def rebuild_scan_counters(
     hackathon_id: int,
     db: Session = Depends(get_db),
-    _: User = Depends(require_roles(UserRole.ADMIN)),
+    _: AuthPrincipal = Depends(require_roles(UserRole.ADMIN)),
 ):
-def scan_analytics(hackathon_id: int, db: Session = Depends(get_db)):
-    total_scans = (
-        db.query(func.count(ScanLog.id))
-        .join(QRToken, QRToken.id == ScanLog.qr_token_id)
-        .filter(QRToken.hackathon_id == hackathon_id)
-        .scalar()
-    )
-    successful = (
-        db.query(func.count(ScanLog.id))
-        .join(QRToken, QRToken.id == ScanLog.qr_token_id)
-        .filter(QRToken.hackathon_id == hackathon_id, ScanLog.success.is_(True))
-        .scalar()
-    )
+    rebuilt = analytics.rebuild_counters(db, hackathon_id)
+    db.commit()
+    return {"rebuilt_rows": rebuilt}
 
-    by_purpose = (
-        db.query(QRToken.purpose, func.count(ScanLog.id))
-        .join(ScanLog, ScanLog.qr_token_id == QRToken.id)
-        .filter(QRToken.hackathon_id == hackathon_id, ScanLog.success.is_(True))
-        .group_by(QRToken.purpose)
-        .all()
-    )
-    return {
-        "total_scans": total_scans or 0,
-        "successful_scans": successful or 0,
-        "by_purpose": {purpose.value: count for purpose, count in by_purpose},
-        "by_purpose": {p.value: c for p, c in by_purpose},
-    }
+
+app.include_router(async_routes if AsyncSessionLocal is not None else sync_routes)
@@ -0,0 +1,234 @@
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+import os
+import threading
+import time
+from typing import Callable, Hashable, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .models import EvaluationCriterion, Hackathon, SubmissionRound
+
+
+@dataclass(frozen=True)
+class HackathonMeta:
+    id: int
+    registration_deadline: datetime
+    round1_deadline: datetime
+    final_deadline: datetime
+
+    def deadline(self, round_name: SubmissionRound) -> datetime:
+        return self.round1_deadline if round_name == SubmissionRound.ROUND1 else self.final_deadline
+
+
+@dataclass(frozen=True)
+class CriterionMeta:
+    id: int
+    hackathon_id: int
+    round: SubmissionRound
+    name: str
+    weight: float
+
+
+class SharedGeneration:
+    # An invalidation counter in a local file. Every worker that points at the same file drops its
+    # entries when the counter moves, so an admin write through one worker reaches the others on
+    # their next lookup.
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    def read(self) -> int:
+        raw = os.pread(self._fd, 8, 0)
+        return int.from_bytes(raw, "little") if len(raw) == 8 else 0
+
+    def bump(self) -> None:
+        import fcntl
+
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            os.pwrite(self._fd, (self.read() + 1).to_bytes(8, "little"), 0)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+class MetadataCache:
+    # Bounded per-process read-through cache for rows that barely change during an event. Keys are
+    # tuples whose first element names the kind ("hackathon", "criterion", "round_criteria"); hit
+    # and miss counters are kept per kind. ttl=0 disables the cache.
+
+    def __init__(self, max_size: int, ttl: float, shared: SharedGeneration | None = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.shared = shared
+        self._entries: OrderedDict[tuple, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._shared_seen = shared.read() if shared else 0
+        self.hits: defaultdict[str, int] = defaultdict(int)
+        self.misses: defaultdict[str, int] = defaultdict(int)
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def _sync_shared(self) -> None:
+        # Caller holds the lock.
+        if self.shared is None:
+            return
+        seen = self.shared.read()
+        if seen != self._shared_seen:
+            self._shared_seen = seen
+            self._entries.clear()
+            self._generation += 1
+
+    def load(self, keys: Iterable[tuple], loader: Callable[[list[tuple]], dict]) -> dict:
+        # Returns {key: value} for every key that exists; the loader gets the misses in one call.
+        keys = list(dict.fromkeys(keys))
+        found, missing = {}, []
+        with self._lock:
+            if self.enabled:
+                self._sync_shared()
+            now = time.monotonic()
+            for key in keys:
+                entry = self._entries.get(key) if self.enabled else None
+                if entry is None or entry[0] < now:
+                    if entry is not None:
+                        del self._entries[key]
+                    self.misses[key[0]] += 1
+                    missing.append(key)
+                    continue
+                self._entries.move_to_end(key)
+                self.hits[key[0]] += 1
+                found[key] = entry[1]
+            generation = self._generation
+        if missing:
+            loaded = loader(missing)
+            found.update(loaded)
+            self._put(loaded, generation)
+        return found
+
+    def _put(self, values: dict, generation: int) -> None:
+        if not self.enabled or not values:
+            return
+        with self._lock:
+            # An invalidation while the loader ran means the values may predate it.
+            if generation != self._generation:
+                return
+            expires = time.monotonic() + self.ttl
+            for key, value in values.items():
+                self._entries[key] = (expires, value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, *keys: Hashable) -> None:
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+            self._generation += 1
+        if self.shared is not None:
+            # This worker sees the bump too and clears itself on its next lookup.
+            self.shared.bump()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self) -> dict:
+        kinds = sorted(set(self.hits) | set(self.misses))
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        return {
+            "enabled": self.enabled,
+            "shared": self.shared.path if self.shared else None,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "evictions": self.evictions,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else None,
+            "by_kind": {
+                kind: {
+                    "hits": self.hits[kind],
+                    "misses": self.misses[kind],
+                    "hit_rate": round(self.hits[kind] / (self.hits[kind] + self.misses[kind]), 4),
+                }
+                for kind in kinds
+            },
+        }
+
+
+def hackathons(db: Session, hackathon_ids: Iterable[int]) -> dict[int, HackathonMeta]:
+    def fetch(keys: list[tuple]) -> dict:
+        rows = db.execute(
+            select(
+                Hackathon.id, Hackathon.registration_deadline, Hackathon.round1_deadline, Hackathon.final_deadline
+            ).where(Hackathon.id.in_([key[1] for key in keys]))
+        )
+        return {("hackathon", row.id): HackathonMeta(*row) for row in rows}
+
+    found = cache.load([("hackathon", hackathon_id) for hackathon_id in hackathon_ids], fetch)
+    return {key[1]: value for key, value in found.items()}
+
+
+def hackathon(db: Session, hackathon_id: int) -> HackathonMeta | None:
+    return hackathons(db, [hackathon_id]).get(hackathon_id)
+
+
+def _criterion_meta(row) -> CriterionMeta:
+    return CriterionMeta(row.id, row.hackathon_id, row.round, row.name, row.weight)
+
+
+_CRITERION_COLUMNS = (
+    EvaluationCriterion.id,
+    EvaluationCriterion.hackathon_id,
+    EvaluationCriterion.round,
+    EvaluationCriterion.name,
+    EvaluationCriterion.weight,
+)
+
+
+def criteria(db: Session, criterion_ids: Iterable[int]) -> dict[int, CriterionMeta]:
+    def fetch(keys: list[tuple]) -> dict:
+        rows = db.execute(select(*_CRITERION_COLUMNS).where(EvaluationCriterion.id.in_([key[1] for key in keys])))
+        return {("criterion", row.id): _criterion_meta(row) for row in rows}
+
+    found = cache.load([("criterion", criterion_id) for criterion_id in criterion_ids], fetch)
+    return {key[1]: value for key, value in found.items()}
+
+
+def round_criteria(db: Session, hackathon_id: int, round_name: SubmissionRound) -> list[CriterionMeta]:
+    def fetch(keys: list[tuple]) -> dict:
+        rows = db.execute(
+            select(*_CRITERION_COLUMNS)
+            .where(EvaluationCriterion.hackathon_id == hackathon_id, EvaluationCriterion.round == round_name)
+            .order_by(EvaluationCriterion.id)
+        )
+        return {keys[0]: tuple(_criterion_meta(row) for row in rows)}
+
+    key = ("round_criteria", hackathon_id, round_name)
+    return list(cache.load([key], fetch)[key])
+
+
+def invalidate_criterion(criterion_id: int, hackathon_id: int, round_name: SubmissionRound) -> None:
+    cache.invalidate(("criterion", criterion_id), ("round_criteria", hackathon_id, round_name))
+
+
+def _default_ttl() -> str:
+    # Serverless instances cannot see each other's invalidations; stay on the DB path there by default.
+    return "0" if os.getenv("VERCEL") else "60"
+
+
+_shared_path = os.getenv("METADATA_CACHE_SHARED_PATH")
+cache = MetadataCache(
+    max_size=int(os.getenv("METADATA_CACHE_SIZE", "4096")),
+    ttl=float(os.getenv("METADATA_CACHE_TTL", _default_ttl())),
+    shared=SharedGeneration(_shared_path) if _shared_path else None,
+)
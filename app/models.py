@@ -1,9 +1,8 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Boolean, DateTime, Enum as SqlEnum, Float, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Boolean, DateTime, Enum as SqlEnum, Float, ForeignKey, Index, Integer, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from .database import Base
 
@@ -46,6 +45,7 @@ class QRStatus(str, Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_review_queue", "verification_status", "created_at", "id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(120))
@@ -69,7 +69,7 @@ class AuthSession(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     token: Mapped[str] = mapped_column(String(255), unique=True, index=True)
-    expires_at: Mapped[datetime] = mapped_column(DateTime)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, index=True)
 
 
 class Hackathon(Base):
@@ -137,6 +137,9 @@ class EvaluationCriterion(Base):
 
 class Score(Base):
     __tablename__ = "scores"
+    __table_args__ = (
+        UniqueConstraint("team_id", "round", "judge_id", "criterion_id", name="uq_score_judge_criterion"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     team_id: Mapped[int] = mapped_column(ForeignKey("teams.id"), index=True)
@@ -146,8 +149,26 @@ class Score(Base):
     score: Mapped[float] = mapped_column(Float)
 
 
+class LeaderboardEntry(Base):
+    __tablename__ = "leaderboard_entries"
+    __table_args__ = (
+        UniqueConstraint("hackathon_id", "round", "team_id", name="uq_leaderboard_team"),
+        Index("ix_leaderboard_board", "hackathon_id", "round", "total_score"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    hackathon_id: Mapped[int] = mapped_column(ForeignKey("hackathons.id"))
+    round: Mapped[SubmissionRound] = mapped_column(SqlEnum(SubmissionRound))
+    team_id: Mapped[int] = mapped_column(ForeignKey("teams.id"), index=True)
+    total_score: Mapped[float] = mapped_column(Float, default=0.0)
+
+
 class QRToken(Base):
     __tablename__ = "qr_tokens"
+    __table_args__ = (
+        Index("ix_qr_tokens_status_valid_to", "status", "valid_to"),
+        Index("ix_qr_tokens_hackathon_purpose", "hackathon_id", "purpose", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     token: Mapped[str] = mapped_column(String(128), unique=True, index=True)
@@ -157,14 +178,42 @@ class QRToken(Base):
     valid_from: Mapped[datetime] = mapped_column(DateTime)
     valid_to: Mapped[datetime] = mapped_column(DateTime)
     status: Mapped[QRStatus] = mapped_column(SqlEnum(QRStatus), default=QRStatus.ACTIVE)
+    # Set by bulk issuance only: one token per (participant, purpose, window start) per hackathon.
+    issue_key: Mapped[str | None] = mapped_column(String(96), unique=True, nullable=True)
 
 
 class ScanLog(Base):
     __tablename__ = "scan_logs"
+    __table_args__ = (
+        Index("ix_scan_logs_analytics", "qr_token_id", "scanned_at", "scanner_id", "success"),
+        UniqueConstraint("scanner_id", "idempotency_key", name="uq_scan_log_scanner_key"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    qr_token_id: Mapped[int] = mapped_column(ForeignKey("qr_tokens.id"), index=True)
+    qr_token_id: Mapped[int] = mapped_column(ForeignKey("qr_tokens.id"))
     scanner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     scanned_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     success: Mapped[bool] = mapped_column(Boolean)
     message: Mapped[str] = mapped_column(String(255))
+    idempotency_key: Mapped[str | None] = mapped_column(String(64), nullable=True)
+
+
+class ScanCounter(Base):
+    __tablename__ = "scan_counters"
+    __table_args__ = (
+        UniqueConstraint("hackathon_id", "purpose", "bucket_start", "success", name="uq_scan_counter_bucket"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    hackathon_id: Mapped[int] = mapped_column(ForeignKey("hackathons.id"))
+    purpose: Mapped[QRPurpose] = mapped_column(SqlEnum(QRPurpose))
+    bucket_start: Mapped[datetime] = mapped_column(DateTime)
+    success: Mapped[bool] = mapped_column(Boolean)
+    scans: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_versions"
+
+    version: Mapped[str] = mapped_column(String(64), primary_key=True)
+    applied_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
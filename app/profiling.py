@@ -0,0 +1,158 @@
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+QUANTILES = (0.5, 0.95, 0.99)
+MAX_LOGGED_STATEMENTS = 50
+METRICS = [
+    ("http_request_duration_seconds", "Wall time per request.", "wall"),
+    ("http_request_sql_statements", "SQL statements executed per request.", "sql"),
+    ("http_request_db_seconds", "Time spent in SQL statements per request.", "db"),
+]
+
+
+@dataclass
+class RequestTrace:
+    statements: list[tuple[str, float]] = field(default_factory=list)
+    db_seconds: float = 0.0
+
+
+_current: ContextVar[RequestTrace | None] = ContextVar("request_trace", default=None)
+
+
+class RouteStats:
+    def __init__(self, window: int):
+        self.count = 0
+        self.samples = {attr: deque(maxlen=window) for _, _, attr in METRICS}
+        self.sums = {attr: 0.0 for _, _, attr in METRICS}
+
+    def add(self, values: dict[str, float]) -> None:
+        self.count += 1
+        for attr, value in values.items():
+            self.samples[attr].append(value)
+            self.sums[attr] += value
+
+
+def _quantile(ordered: list, q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class RequestProfiler:
+    # Per-process route timings. Quantiles cover the last `window` requests per route; counts and sums
+    # are cumulative so Prometheus can still derive rates.
+
+    def __init__(self, enabled: bool, slow_ms: float, window: int):
+        self.enabled = enabled
+        self.slow_ms = slow_ms
+        self.window = window
+        self._routes: dict[tuple[str, str], RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, method: str, route: str, wall: float, trace: RequestTrace) -> None:
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = RouteStats(self.window)
+            stats.add({"wall": wall, "sql": len(trace.statements), "db": trace.db_seconds})
+        if wall * 1000 >= self.slow_ms:
+            logger.warning(
+                "Slow request %s %s: %.1f ms, %d statements, %.1f ms in database\n%s",
+                method,
+                route,
+                wall * 1000,
+                len(trace.statements),
+                trace.db_seconds * 1000,
+                "\n".join(
+                    f"  {seconds * 1000:8.2f} ms  {statement}"
+                    for statement, seconds in trace.statements[:MAX_LOGGED_STATEMENTS]
+                ),
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def snapshot(self) -> list[dict]:
+        with self._lock:
+            return [
+                {
+                    "method": method,
+                    "route": route,
+                    "count": stats.count,
+                    "series": {attr: (sorted(stats.samples[attr]), stats.sums[attr]) for attr in stats.sums},
+                }
+                for (method, route), stats in sorted(self._routes.items())
+            ]
+
+    def render(self) -> str:
+        snapshot = self.snapshot()
+        lines = []
+        for name, help_text, attr in METRICS:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+            for entry in snapshot:
+                samples, total = entry["series"][attr]
+                labels = f'method="{entry["method"]}",route="{entry["route"]}"'
+                for q in QUANTILES:
+                    lines.append(f'{name}{{{labels},quantile="{q}"}} {_quantile(samples, q):g}')
+                lines.append(f"{name}_sum{{{labels}}} {total:g}")
+                lines.append(f"{name}_count{{{labels}}} {entry['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("profiling_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    trace = _current.get()
+    started = conn.info.get("profiling_started")
+    if trace is None or not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    trace.statements.append((statement, elapsed))
+    trace.db_seconds += elapsed
+
+
+def instrument(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class ProfilingMiddleware:
+    # Plain ASGI rather than BaseHTTPMiddleware so streamed bodies are timed to their last chunk.
+
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.profiler.enabled:
+            await self.app(scope, receive, send)
+            return
+        trace = RequestTrace()
+        token = _current.set(trace)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            # Route templates, not raw paths, keep label cardinality bounded.
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            self.profiler.observe(scope["method"], route, time.perf_counter() - started, trace)
+            _current.reset(token)
+
+
+profiler = RequestProfiler(
+    enabled=os.getenv("PROFILING", "0") == "1",
+    slow_ms=float(os.getenv("PROFILING_SLOW_MS", "500")),
+    window=int(os.getenv("PROFILING_WINDOW", "1024")),
+)
@@ -0,0 +1,111 @@
+import csv
+import io
+import json
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import qr_tokens
+from .database import dialect_insert
+from .models import QRStatus, QRToken, Team, TeamMember, User, VerificationStatus
+from .schemas import QRWindow
+
+CHUNK_SIZE = 1000
+MANIFEST_FIELDS = ["user_id", "name", "email", "purpose", "valid_from", "valid_to", "token", "issued"]
+
+
+def _issue_key(hackathon_id: int, user_id: int, window: QRWindow) -> str:
+    return f"{hackathon_id}:{user_id}:{window.purpose.value}:{window.valid_from.isoformat()}"
+
+
+def _held_tokens(db: Session, keys: list[str]) -> dict[str, str]:
+    held = {}
+    for start in range(0, len(keys), CHUNK_SIZE):
+        held.update(
+            db.execute(
+                select(QRToken.issue_key, QRToken.token).where(QRToken.issue_key.in_(keys[start : start + CHUNK_SIZE]))
+            ).all()
+        )
+    return held
+
+
+def issue_for_hackathon(db: Session, hackathon_id: int, windows: list[QRWindow]) -> list[dict]:
+    participants = db.execute(
+        select(User.id, User.name, User.email)
+        .join(TeamMember, TeamMember.user_id == User.id)
+        .join(Team, Team.id == TeamMember.team_id)
+        .where(Team.hackathon_id == hackathon_id, User.verification_status == VerificationStatus.APPROVED)
+        .distinct()
+        .order_by(User.id)
+    ).all()
+    # Stored timestamps are naive UTC, so "+05:30" and "Z" spellings of one instant are the same window.
+    windows = [
+        QRWindow(
+            purpose=window.purpose,
+            valid_from=qr_tokens.naive_utc(window.valid_from),
+            valid_to=qr_tokens.naive_utc(window.valid_to),
+        )
+        for window in windows
+    ]
+    wanted = [
+        (person, window, _issue_key(hackathon_id, person.id, window)) for person in participants for window in windows
+    ]
+
+    # Re-running is a no-op for (participant, purpose, window start) pairs that already hold a token. The
+    # unique issue_key decides, so two concurrent runs cannot both issue one.
+    held = _held_tokens(db, [key for _, _, key in wanted])
+    new_rows = [
+        {
+            "token": qr_tokens.issue(person.id, hackathon_id, window.purpose, window.valid_from, window.valid_to),
+            "user_id": person.id,
+            "hackathon_id": hackathon_id,
+            "purpose": window.purpose,
+            "valid_from": window.valid_from,
+            "valid_to": window.valid_to,
+            "status": QRStatus.ACTIVE,
+            "issue_key": key,
+        }
+        for person, window, key in wanted
+        if key not in held
+    ]
+    issued = {}
+    for start in range(0, len(new_rows), CHUNK_SIZE):
+        stmt = dialect_insert(db, QRToken).on_conflict_do_nothing(index_elements=["issue_key"])
+        issued.update(
+            db.execute(stmt.returning(QRToken.issue_key, QRToken.token), new_rows[start : start + CHUNK_SIZE]).all()
+        )
+    if len(issued) < len(new_rows):
+        # Another run inserted some of these first; report its tokens.
+        held.update(_held_tokens(db, [row["issue_key"] for row in new_rows if row["issue_key"] not in issued]))
+
+    return [
+        {
+            "user_id": person.id,
+            "name": person.name,
+            "email": person.email,
+            "purpose": window.purpose.value,
+            "valid_from": window.valid_from.isoformat(),
+            "valid_to": window.valid_to.isoformat(),
+            "token": issued.get(key) or held[key],
+            "issued": key in issued,
+        }
+        for person, window, key in wanted
+    ]
+
+
+def manifest_ndjson(manifest: list[dict]):
+    for start in range(0, len(manifest), CHUNK_SIZE):
+        yield "".join(json.dumps(row) + "\n" for row in manifest[start : start + CHUNK_SIZE])
+
+
+def manifest_csv(manifest: list[dict]):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=MANIFEST_FIELDS)
+    writer.writeheader()
+    for start in range(0, len(manifest), CHUNK_SIZE):
+        writer.writerows(manifest[start : start + CHUNK_SIZE])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,124 @@
+import base64
+import binascii
+import calendar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import hashlib
+import hmac
+import os
+import struct
+import uuid
+
+from .models import QRPurpose
+
+TOKEN_VERSION = 1
+SIGNATURE_BYTES = 16
+_PURPOSES = list(QRPurpose)
+# version, token_id, user_id, hackathon_id, purpose, valid_from, valid_to (epoch seconds, UTC)
+_PAYLOAD = struct.Struct(">B16sIIBII")
+
+
+def _load_key() -> bytes | None:
+    key = os.getenv("QR_SIGNING_KEY")
+    return key.encode() if key else None
+
+
+SIGNING_KEY = _load_key()
+
+
+class InvalidQRToken(ValueError):
+    pass
+
+
+class MissingSigningKey(RuntimeError):
+    pass
+
+
+def _signing_key(key: bytes | None) -> bytes:
+    # Fail closed: a made-up key would sign tokens that no other process, or this one after a restart, accepts.
+    key = key or SIGNING_KEY
+    if not key:
+        raise MissingSigningKey("QR_SIGNING_KEY is not set; refusing to sign or verify QR tokens")
+    return key
+
+
+@dataclass(frozen=True)
+class QRClaims:
+    token_id: uuid.UUID
+    user_id: int
+    hackathon_id: int
+    purpose: QRPurpose
+    valid_from: datetime
+    valid_to: datetime
+
+    def is_active(self, now: datetime) -> bool:
+        return self.valid_from <= now <= self.valid_to
+
+
+def naive_utc(value: datetime) -> datetime:
+    # Timestamps are stored as naive UTC; aware inputs are converted, naive ones are taken as UTC.
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _epoch(value: datetime) -> int:
+    return calendar.timegm(naive_utc(value).timetuple())
+
+
+def _from_epoch(value: int) -> datetime:
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload: bytes, key: bytes) -> bytes:
+    return hmac.new(key, payload, hashlib.sha256).digest()[:SIGNATURE_BYTES]
+
+
+def issue(
+    user_id: int,
+    hackathon_id: int,
+    purpose: QRPurpose,
+    valid_from: datetime,
+    valid_to: datetime,
+    key: bytes | None = None,
+) -> str:
+    payload = _PAYLOAD.pack(
+        TOKEN_VERSION,
+        uuid.uuid4().bytes,
+        user_id,
+        hackathon_id,
+        _PURPOSES.index(purpose),
+        _epoch(valid_from),
+        _epoch(valid_to),
+    )
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload, _signing_key(key)))}"
+
+
+def verify(token: str, key: bytes | None = None) -> QRClaims:
+    encoded_payload, _, encoded_signature = token.partition(".")
+    try:
+        payload = _b64decode(encoded_payload)
+        signature = _b64decode(encoded_signature)
+    except (binascii.Error, ValueError):
+        raise InvalidQRToken("Malformed QR token") from None
+    if len(payload) != _PAYLOAD.size or not hmac.compare_digest(signature, _sign(payload, _signing_key(key))):
+        raise InvalidQRToken("Invalid QR signature")
+    version, token_id, user_id, hackathon_id, purpose, valid_from, valid_to = _PAYLOAD.unpack(payload)
+    if version != TOKEN_VERSION or purpose >= len(_PURPOSES):
+        raise InvalidQRToken("Unsupported QR token")
+    return QRClaims(
+        token_id=uuid.UUID(bytes=token_id),
+        user_id=user_id,
+        hackathon_id=hackathon_id,
+        purpose=_PURPOSES[purpose],
+        valid_from=_from_epoch(valid_from),
+        valid_to=_from_epoch(valid_to),
+    )
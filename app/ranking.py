@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+import math
+from operator import itemgetter
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Float, Integer, and_, cast, select
+from sqlalchemy.orm import Session
+
+from .models import EvaluationCriterion, Score, Submission, SubmissionRound, Team
+
+if TYPE_CHECKING:
+    # numpy is imported where it is used: it is a sizeable share of a cold start and only ranking needs it.
+    import numpy as np
+
+# README "Evaluation Engine" tie resolution: these criteria first, then judge consensus, then submission time.
+DEFAULT_TIE_BREAK = ("Technical depth", "Feasibility")
+TOTAL_PRECISION = 6
+
+
+@dataclass
+class ScoreMatrix:
+    team_ids: np.ndarray
+    team_names: list[str]
+    submitted_at: np.ndarray
+    judge_ids: np.ndarray
+    criterion_ids: np.ndarray
+    criterion_names: list[str]
+    weights: np.ndarray
+    team_idx: np.ndarray
+    judge_idx: np.ndarray
+    criterion_idx: np.ndarray
+    scores: np.ndarray
+
+
+def _timestamp(value: datetime | None) -> float:
+    return value.timestamp() if value is not None else math.inf
+
+
+def _datetime(timestamp: float) -> datetime | None:
+    return datetime.fromtimestamp(timestamp) if timestamp != math.inf else None
+
+
+# Score columns as they arrive from the database: team_id, judge_id, criterion_id, score.
+ScoreColumns = tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]
+
+# Binary COPY tuple of (int4 team_id, int4 judge_id, int4 criterion_id, float8 score): a field count,
+# then a length word before each value. No NULLs, so every tuple has this fixed width.
+_COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+SCORE_COPY_TUPLE = [
+    ("fields", ">i2"),
+    ("team_len", ">i4"),
+    ("team_id", ">i4"),
+    ("judge_len", ">i4"),
+    ("judge_id", ">i4"),
+    ("criterion_len", ">i4"),
+    ("criterion_id", ">i4"),
+    ("score_len", ">i4"),
+    ("score", ">f8"),
+]
+
+
+def _table_size(values: np.ndarray, *more: np.ndarray) -> int | None:
+    # Primary keys are dense, so a lookup table over 0..max beats sorting unless the ids are far apart.
+    arrays = [array for array in (values, *more) if len(array)]
+    if not arrays:
+        return 0
+    low, high = min(int(array.min()) for array in arrays), max(int(array.max()) for array in arrays)
+    if low < 0 or high > 4 * sum(len(array) for array in arrays) + 1024:
+        return None
+    return high + 1
+
+
+def _distinct(values: np.ndarray) -> np.ndarray:
+    import numpy as np
+
+    size = _table_size(values)
+    if size is None:
+        return np.unique(values)
+    seen = np.zeros(size, dtype=bool)
+    seen[values] = True
+    return np.flatnonzero(seen)
+
+
+def _positions(ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+    # Index of each value in the sorted ids, -1 where it is not there.
+    import numpy as np
+
+    size = _table_size(ids, values)
+    if size is None:
+        at = np.searchsorted(ids, values)
+        found = at < len(ids)
+        found[found] = ids[at[found]] == values[found]
+        return np.where(found, at, -1)
+    lookup = np.full(size, -1, dtype=np.int64)
+    lookup[ids] = np.arange(len(ids))
+    return lookup[values]
+
+
+def build_matrix(teams, criteria, scores: ScoreColumns) -> ScoreMatrix:
+    # teams: (team_id, team_name, submitted_at) rows, one per team; criteria: (criterion_id, name, weight)
+    # rows for the round. Only these two short lists are walked in Python; the score columns stay arrays.
+    import numpy as np
+
+    teams = sorted(teams, key=itemgetter(0))
+    criteria = sorted(criteria, key=itemgetter(0))
+    team_ids = np.array([team[0] for team in teams], dtype=np.int64)
+    criterion_ids = np.array([criterion[0] for criterion in criteria], dtype=np.int64)
+    team_col, judge_col, criterion_col, score_col = (np.asarray(column) for column in scores)
+    team_idx = _positions(team_ids, team_col.astype(np.int64, copy=False))
+    criterion_idx = _positions(criterion_ids, criterion_col.astype(np.int64, copy=False))
+    known = (team_idx >= 0) & (criterion_idx >= 0)
+    if not known.all():
+        team_idx, criterion_idx = team_idx[known], criterion_idx[known]
+        judge_col, score_col = judge_col[known], score_col[known]
+    judge_ids = _distinct(judge_col.astype(np.int64, copy=False))
+    return ScoreMatrix(
+        team_ids=team_ids,
+        team_names=[team[1] for team in teams],
+        submitted_at=np.array([_timestamp(team[2]) for team in teams], dtype=np.float64),
+        judge_ids=judge_ids,
+        criterion_ids=criterion_ids,
+        criterion_names=[criterion[1] for criterion in criteria],
+        weights=np.array([criterion[2] for criterion in criteria], dtype=np.float64),
+        team_idx=team_idx,
+        judge_idx=_positions(judge_ids, judge_col.astype(np.int64, copy=False)),
+        criterion_idx=criterion_idx,
+        scores=score_col.astype(np.float64, copy=False),
+    )
+
+
+def decode_copy(payload: bytes) -> ScoreColumns:
+    # Parses COPY ... TO STDOUT (FORMAT BINARY) output of the score query without a per-row Python step.
+    import numpy as np
+
+    if payload[:11] != _COPY_SIGNATURE:
+        raise ValueError("Not a binary COPY stream")
+    extension = int.from_bytes(payload[15:19], "big")
+    body = memoryview(payload)[19 + extension : len(payload) - 2]
+    layout = np.dtype(SCORE_COPY_TUPLE)
+    if len(body) % layout.itemsize:
+        raise ValueError("Unexpected COPY tuple layout")
+    records = np.frombuffer(body, dtype=layout)
+    # A NULL or a wider type would shift every later tuple, which the field counts and the last
+    # length word of each tuple catch.
+    if (records["fields"] != 4).any() or (records["score_len"] != 8).any():
+        raise ValueError("Unexpected COPY tuple layout")
+    return (
+        records["team_id"].astype(np.int64),
+        records["judge_id"].astype(np.int64),
+        records["criterion_id"].astype(np.int64),
+        records["score"].astype(np.float64),
+    )
+
+
+def _fetch_scores(db: Session, stmt) -> ScoreColumns:
+    import numpy as np
+
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql":
+        sql = stmt.compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True})
+        cursor = db.connection().connection.driver_connection.cursor()
+        with cursor, cursor.copy(f"COPY ({sql}) TO STDOUT (FORMAT BINARY)") as copy:
+            return decode_copy(b"".join(copy))
+    # sqlite3 only hands out row tuples; convert each column in one pass.
+    rows = db.execute(stmt).all()
+    return (
+        np.fromiter(map(itemgetter(0), rows), dtype=np.int64, count=len(rows)),
+        np.fromiter(map(itemgetter(1), rows), dtype=np.int64, count=len(rows)),
+        np.fromiter(map(itemgetter(2), rows), dtype=np.int64, count=len(rows)),
+        np.fromiter(map(itemgetter(3), rows), dtype=np.float64, count=len(rows)),
+    )
+
+
+def load_matrix(db: Session, hackathon_id: int, round_name: SubmissionRound) -> ScoreMatrix:
+    teams = db.execute(
+        select(Team.id, Team.name, Submission.submitted_at)
+        .outerjoin(Submission, and_(Submission.team_id == Team.id, Submission.round == round_name))
+        .where(Team.hackathon_id == hackathon_id)
+    ).all()
+    criteria = db.execute(
+        select(EvaluationCriterion.id, EvaluationCriterion.name, EvaluationCriterion.weight).where(
+            EvaluationCriterion.hackathon_id == hackathon_id, EvaluationCriterion.round == round_name
+        )
+    ).all()
+    scores = _fetch_scores(
+        db,
+        select(
+            cast(Score.team_id, Integer),
+            cast(Score.judge_id, Integer),
+            cast(Score.criterion_id, Integer),
+            cast(Score.score, Float(53)),
+        )
+        .join(EvaluationCriterion, EvaluationCriterion.id == Score.criterion_id)
+        .where(
+            EvaluationCriterion.hackathon_id == hackathon_id,
+            EvaluationCriterion.round == round_name,
+            Score.round == round_name,
+        ),
+    )
+    return build_matrix(teams, criteria, scores)
+
+
+def _masked_mean(values: np.ndarray, present: np.ndarray, axis: int) -> tuple[np.ndarray, np.ndarray]:
+    # values must already be zero wherever present is False.
+    import numpy as np
+
+    counts = present.sum(axis=axis)
+    sums = values.sum(axis=axis)
+    return np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0), counts
+
+
+def rank(matrix: ScoreMatrix, tie_break: tuple[str, ...] = DEFAULT_TIE_BREAK) -> list[dict]:
+    import numpy as np
+
+    m = matrix
+    n_teams, n_judges, n_criteria = len(m.team_ids), len(m.judge_ids), len(m.criterion_ids)
+    if n_teams == 0:
+        return []
+
+    # Dense team x judge x criterion cube. scores is unique per (team, judge, criterion), so each
+    # row fills one cell; every statistic below is a reduction over it.
+    flat = (m.team_idx * n_judges + m.judge_idx) * n_criteria + m.criterion_idx
+    shape = (n_teams, n_judges, n_criteria)
+    cube = np.zeros(shape)
+    cube.reshape(-1)[flat] = m.scores
+    present = np.zeros(shape)
+    present.reshape(-1)[flat] = 1.0
+
+    # einsum reduces across the middle axis several times faster than ndarray.sum.
+    criterion_sum = np.einsum("tjc->tc", cube)
+    criterion_count = np.einsum("tjc->tc", present)
+    scored = criterion_count > 0
+    criterion_mean = np.divide(criterion_sum, criterion_count, out=np.zeros_like(criterion_sum), where=scored)
+    # Same formula as the leaderboard: every score contributes score x weight.
+    total = criterion_sum @ m.weights
+
+    # Per-judge z-score so harsh and lenient judges contribute on the same scale.
+    judge_n = np.maximum(np.einsum("tjc->j", present), 1)
+    judge_mean = np.einsum("tjc->j", cube) / judge_n
+    judge_sq = np.einsum("tjc,tjc->j", cube, cube) / judge_n
+    judge_std = np.sqrt(np.clip(judge_sq - judge_mean**2, 0.0, None))
+    inverse_std = np.divide(1.0, judge_std, out=np.zeros_like(judge_std), where=judge_std > 0)
+    z = cube - judge_mean[None, :, None]
+    z *= inverse_std[None, :, None]
+    z *= present
+    z_mean = np.divide(np.einsum("tjc->tc", z), criterion_count, out=np.zeros_like(criterion_sum), where=scored)
+    normalized = z_mean @ m.weights
+
+    # Consensus: spread of each judge's weighted total for the team.
+    judged = np.einsum("tjc->tj", present) > 0
+    judge_totals = cube @ m.weights
+    consensus_mean, judge_count = _masked_mean(judge_totals, judged, axis=1)
+    spread = (((judge_totals - consensus_mean[:, None]) ** 2) * judged).sum(axis=1)
+    consensus_std = np.sqrt(np.divide(spread, judge_count, out=np.zeros(n_teams), where=judge_count > 0))
+
+    names = [name.casefold() for name in m.criterion_names]
+    keys = [-np.round(total, TOTAL_PRECISION)]
+    for criterion_name in tie_break:
+        if criterion_name.casefold() in names:
+            c = names.index(criterion_name.casefold())
+            keys.append(-np.where(scored[:, c], criterion_mean[:, c], -np.inf))
+    keys += [np.round(consensus_std, TOTAL_PRECISION), m.submitted_at, m.team_ids]
+    order = np.lexsort(keys[::-1])
+
+    # Convert once per column; per-team Python work is limited to assembling the row dicts.
+    totals = np.round(total[order], 2).tolist()
+    normalized_scores = np.round(normalized[order], 4).tolist()
+    stds = np.round(consensus_std[order], 4).tolist()
+    judge_counts = judge_count[order].tolist()
+    criterion_scores = np.round(criterion_mean[order], 2).tolist()
+    criterion_scored = scored[order].tolist()
+    submitted = m.submitted_at[order].tolist()
+    team_ids = m.team_ids[order].tolist()
+    return [
+        {
+            "rank": position + 1,
+            "team_id": team_ids[position],
+            "team_name": m.team_names[t],
+            "total_score": totals[position],
+            "normalized_score": normalized_scores[position],
+            "judge_std": stds[position],
+            "judge_count": judge_counts[position],
+            "criterion_scores": {
+                name: value
+                for name, value, scored in zip(m.criterion_names, criterion_scores[position], criterion_scored[position])
+                if scored
+            },
+            "submitted_at": _datetime(submitted[position]),
+        }
+        for position, t in enumerate(order.tolist())
+    ]
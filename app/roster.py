@@ -0,0 +1,170 @@
+import argparse
+import csv
+from dataclasses import dataclass, field
+import io
+import json
+from itertools import islice
+from typing import IO, Iterable, Iterator
+
+from pydantic import ValidationError
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal, dialect_insert
+from .models import User, UserRole
+from .schemas import UserCreate
+
+CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+CSV_FIELDS = ["name", "email", "phone"]
+
+
+class RosterFormatError(ValueError):
+    pass
+
+
+def read_csv(stream: IO[bytes]) -> Iterator[tuple[int, dict | None, str | None]]:
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    missing = set(CSV_FIELDS) - set(reader.fieldnames or [])
+    if missing:
+        raise RosterFormatError(f"Missing CSV columns: {', '.join(sorted(missing))}")
+    for line, row in enumerate(reader, start=2):
+        yield line, row, None
+
+
+def read_ndjson(stream: IO[bytes]) -> Iterator[tuple[int, dict | None, str | None]]:
+    for line, raw in enumerate(io.TextIOWrapper(stream, encoding="utf-8-sig"), start=1):
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except json.JSONDecodeError:
+            yield line, None, "Invalid JSON"
+            continue
+        if not isinstance(row, dict):
+            yield line, None, "Expected a JSON object"
+            continue
+        yield line, row, None
+
+
+def _parse(row: dict) -> UserCreate:
+    student = UserCreate(
+        name=(row.get("name") or "").strip(),
+        email=(row.get("email") or "").strip(),
+        phone=(row.get("phone") or "").strip(),
+    )
+    if not student.name or not student.phone:
+        raise ValueError("name and phone are required")
+    return student
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    created: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+    def fail(self, line: int, error: str, duplicate: bool = False) -> None:
+        if duplicate:
+            self.duplicates += 1
+        else:
+            self.failed += 1
+        # Only the first MAX_REPORTED_ERRORS are kept so a bad file cannot grow the report without bound.
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": error})
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.duplicates + self.failed > len(self.errors),
+        }
+
+
+def _import_chunk(db: Session, chunk: list[tuple[int, dict | None, str | None]], report: ImportReport) -> None:
+    parsed: list[tuple[int, UserCreate]] = []
+    for line, row, error in chunk:
+        report.rows += 1
+        if error:
+            report.fail(line, error)
+            continue
+        try:
+            parsed.append((line, _parse(row)))
+        except ValueError as exc:
+            message = exc.errors(include_url=False)[0]["msg"] if isinstance(exc, ValidationError) else str(exc)
+            report.fail(line, message)
+    if not parsed:
+        return
+
+    # Earlier chunks are already committed, so this one lookup also catches repeats across the file.
+    existing = db.execute(
+        select(User.email, User.phone).where(
+            or_(
+                User.email.in_({student.email for _, student in parsed}),
+                User.phone.in_({student.phone for _, student in parsed}),
+            )
+        )
+    ).all()
+    taken_emails = {row.email for row in existing}
+    taken_phones = {row.phone for row in existing}
+
+    pending = []
+    for line, student in parsed:
+        if student.email in taken_emails:
+            report.fail(line, f"Email {student.email} already registered", duplicate=True)
+        elif student.phone in taken_phones:
+            report.fail(line, f"Phone {student.phone} already registered", duplicate=True)
+        else:
+            taken_emails.add(student.email)
+            taken_phones.add(student.phone)
+            pending.append((line, student))
+    if not pending:
+        return
+
+    # ON CONFLICT DO NOTHING covers a signup that lands between the lookup and this insert.
+    inserted = set(
+        db.scalars(
+            dialect_insert(db, User).on_conflict_do_nothing().returning(User.email),
+            [
+                {"name": student.name, "email": student.email, "phone": student.phone, "role": UserRole.STUDENT}
+                for _, student in pending
+            ],
+        )
+    )
+    for line, student in pending:
+        if student.email in inserted:
+            report.created += 1
+        else:
+            report.fail(line, f"Email {student.email} or phone {student.phone} already registered", duplicate=True)
+
+
+def import_students(
+    db: Session, records: Iterable[tuple[int, dict | None, str | None]], chunk_size: int = CHUNK_SIZE
+) -> dict:
+    report = ImportReport()
+    records = iter(records)
+    while chunk := list(islice(records, chunk_size)):
+        _import_chunk(db, chunk, report)
+        db.commit()
+    return report.as_dict()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import a student roster from CSV or NDJSON.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["csv", "ndjson"])
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+    reader = read_ndjson if fmt == "ndjson" else read_csv
+    with open(args.path, "rb") as stream, SessionLocal() as db:
+        print(json.dumps(import_students(db, reader(stream), args.chunk_size)))
+
+
+if __name__ == "__main__":
+    main()
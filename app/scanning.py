@@ -0,0 +1,196 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import exists, insert, select, tuple_, update
+from sqlalchemy.orm import Session
+
+from . import analytics
+from . import qr_tokens
+from .models import QRPurpose, QRStatus, QRToken, ScanLog, User, UserRole
+from .schemas import BatchScanRecord
+
+CHUNK_SIZE = 500
+
+
+class ScanError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+@dataclass
+class ScanOutcome:
+    success: bool
+    message: str
+    purpose: QRPurpose
+
+
+def consume(db: Session, token: str, scanner_id: int, now: datetime) -> ScanOutcome:
+    # Exactly-once redemption: the status check and the transition are one conditional UPDATE,
+    # so concurrent counters scanning the same QR cannot both win.
+    consumed = db.execute(
+        update(QRToken)
+        .where(
+            QRToken.token == token,
+            QRToken.status == QRStatus.ACTIVE,
+            QRToken.valid_from <= now,
+            QRToken.valid_to >= now,
+            exists().where(User.id == scanner_id, User.role == UserRole.SCANNER),
+        )
+        .values(status=QRStatus.CONSUMED)
+        .returning(QRToken.id, QRToken.hackathon_id, QRToken.purpose)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if consumed:
+        outcome = ScanOutcome(success=True, message="Scan successful", purpose=consumed.purpose)
+        db.add(
+            ScanLog(
+                qr_token_id=consumed.id, scanner_id=scanner_id, scanned_at=now, success=True, message=outcome.message
+            )
+        )
+        analytics.record_scans(db, [(consumed.hackathon_id, consumed.purpose, now, True)])
+        return outcome
+
+    # Failure path only: one lookup to explain why the UPDATE matched nothing.
+    found = db.execute(
+        select(User.role, QRToken.id, QRToken.hackathon_id, QRToken.status, QRToken.purpose)
+        .select_from(User)
+        .outerjoin(QRToken, QRToken.token == token)
+        .where(User.id == scanner_id)
+    ).first()
+    if not found or found.role != UserRole.SCANNER:
+        raise ScanError(400, "Scanner role required")
+    if found.id is None:
+        raise ScanError(404, "QR token not found")
+    if found.status != QRStatus.ACTIVE:
+        message = f"Token already {found.status.value.lower()}"
+    else:
+        message = "Token expired or not yet active"
+    db.add(ScanLog(qr_token_id=found.id, scanner_id=scanner_id, scanned_at=now, success=False, message=message))
+    analytics.record_scans(db, [(found.hackathon_id, found.purpose, now, False)])
+    return ScanOutcome(success=False, message=message, purpose=found.purpose)
+
+
+def _chunks(items: list, size: int = CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _result(record: BatchScanRecord, success: bool, message: str, purpose=None, duplicate=False) -> dict:
+    return {
+        "idempotency_key": record.idempotency_key,
+        "success": success,
+        "message": message,
+        "purpose": purpose,
+        "duplicate": duplicate,
+    }
+
+
+def ingest_batch(db: Session, records: list[BatchScanRecord]) -> list[dict]:
+    results: list[dict | None] = [None] * len(records)
+
+    # Idempotency keys are scoped to the scanner that generated them.
+    previous = {}
+    for chunk in _chunks(list({(record.scanner_id, record.idempotency_key) for record in records})):
+        rows = db.execute(
+            select(ScanLog.scanner_id, ScanLog.idempotency_key, ScanLog.success, ScanLog.message, QRToken.purpose)
+            .join(QRToken, QRToken.id == ScanLog.qr_token_id)
+            .where(tuple_(ScanLog.scanner_id, ScanLog.idempotency_key).in_(chunk))
+        )
+        previous.update({(row.scanner_id, row.idempotency_key): row for row in rows})
+
+    pending = []
+    seen = set()
+    for index, record in enumerate(records):
+        replay = previous.get((record.scanner_id, record.idempotency_key))
+        if replay:
+            results[index] = _result(record, replay.success, replay.message, replay.purpose, duplicate=True)
+            continue
+        if (record.scanner_id, record.idempotency_key) in seen:
+            results[index] = _result(record, False, "Duplicate idempotency key in batch", duplicate=True)
+            continue
+        seen.add((record.scanner_id, record.idempotency_key))
+        try:
+            claims = qr_tokens.verify(record.token)
+        except qr_tokens.InvalidQRToken as exc:
+            results[index] = _result(record, False, str(exc))
+            continue
+        pending.append((index, record, claims))
+
+    scanners = set()
+    for chunk in _chunks(list({record.scanner_id for _, record, _ in pending})):
+        scanners.update(
+            db.execute(select(User.id).where(User.id.in_(chunk), User.role == UserRole.SCANNER)).scalars()
+        )
+    tokens = {}
+    for chunk in _chunks(list({record.token for _, record, _ in pending})):
+        rows = db.execute(
+            select(QRToken.token, QRToken.id, QRToken.hackathon_id, QRToken.purpose, QRToken.status).where(
+                QRToken.token.in_(chunk)
+            )
+        )
+        tokens.update({row.token: row for row in rows})
+
+    # First scan wins: walk each token's records in client-timestamp order.
+    pending.sort(key=lambda item: (qr_tokens.naive_utc(item[1].client_scanned_at), item[0]))
+    winners: dict[int, int] = {}
+    logged = []
+    for index, record, claims in pending:
+        qr = tokens.get(record.token)
+        if record.scanner_id not in scanners:
+            results[index] = _result(record, False, "Scanner role required", claims.purpose)
+            continue
+        if not qr:
+            results[index] = _result(record, False, "QR token not found", claims.purpose)
+            continue
+        if not claims.is_active(qr_tokens.naive_utc(record.client_scanned_at)):
+            results[index] = _result(record, False, "Token expired or not yet active", claims.purpose)
+        elif qr.status != QRStatus.ACTIVE:
+            results[index] = _result(record, False, f"Token already {qr.status.value.lower()}", claims.purpose)
+        elif qr.id in winners:
+            results[index] = _result(record, False, "Token already consumed", claims.purpose)
+        else:
+            winners[qr.id] = index
+            results[index] = _result(record, True, "Scan successful", claims.purpose)
+        logged.append((index, record, qr))
+
+    consumed = set()
+    for chunk in _chunks(list(winners)):
+        consumed.update(
+            db.execute(
+                update(QRToken)
+                .where(QRToken.id.in_(chunk), QRToken.status == QRStatus.ACTIVE)
+                .values(status=QRStatus.CONSUMED)
+                .returning(QRToken.id)
+                .execution_options(synchronize_session=False)
+            ).scalars()
+        )
+    for token_id, index in winners.items():
+        if token_id not in consumed:
+            # Redeemed online while this gate was offline.
+            results[index].update(success=False, message="Token already consumed")
+
+    if logged:
+        db.execute(
+            insert(ScanLog),
+            [
+                {
+                    "qr_token_id": qr.id,
+                    "scanner_id": record.scanner_id,
+                    "scanned_at": qr_tokens.naive_utc(record.client_scanned_at),
+                    "success": results[index]["success"],
+                    "message": results[index]["message"],
+                    "idempotency_key": record.idempotency_key,
+                }
+                for index, record, qr in logged
+            ],
+        )
+        analytics.record_scans(
+            db,
+            [
+                (qr.hackathon_id, qr.purpose, qr_tokens.naive_utc(record.client_scanned_at), results[index]["success"])
+                for index, record, qr in logged
+            ],
+        )
+    return results
@@ -0,0 +1,59 @@
+import hashlib
+import logging
+
+from sqlalchemy import inspect, select
+from sqlalchemy.engine import Dialect, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from . import leaderboard as leaderboard_store
+from .database import Base, dialect_insert
+from .models import LeaderboardEntry, SchemaVersion
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(dialect: Dialect) -> str:
+    # Hash of the DDL create_all would emit, so any model change (column, index, constraint) moves it.
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return digest.hexdigest()
+
+
+def schema_is_current(engine: Engine, version: str) -> bool:
+    try:
+        with engine.connect() as conn:
+            return conn.scalar(select(SchemaVersion.version).where(SchemaVersion.version == version)) is not None
+    except DBAPIError:
+        # No marker table yet: a fresh database or one created before markers existed.
+        return False
+
+
+def create_schema(engine: Engine) -> None:
+    # create_all leaves a newly added leaderboard_entries table empty; fill it from existing scores.
+    board_missing = not inspect(engine).has_table(LeaderboardEntry.__tablename__)
+    Base.metadata.create_all(bind=engine)
+    if board_missing:
+        with Session(engine) as db:
+            boards = leaderboard_store.backfill(db)
+            db.commit()
+        if boards:
+            logger.info("Backfilled %d leaderboards from existing scores", boards)
+
+
+def ensure_schema(engine: Engine) -> bool:
+    # One marker lookup on a warm database; create_all (a round-trip per table) only when the models
+    # changed. create_all never drops anything, so any previously recorded version is still satisfied.
+    version = fingerprint(engine.dialect)
+    if schema_is_current(engine, version):
+        return False
+    create_schema(engine)
+    with Session(engine) as db:
+        db.execute(dialect_insert(db, SchemaVersion).values(version=version).on_conflict_do_nothing())
+        db.commit()
+    logger.info("Schema created or updated to version %s", version[:12])
+    return True
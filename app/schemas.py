@@ -1,6 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel, Field
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, Field, field_validator
 
 from .models import QRPurpose, SubmissionRound, UserRole, VerificationStatus
 
@@ -27,11 +26,24 @@ class AuthResponse(BaseModel):
 class UserCreate(BaseModel):
     name: str
     email: str = Field(min_length=5, max_length=255)
-    email: EmailStr
     phone: str
     role: UserRole = UserRole.STUDENT
 
 
+class RosterError(BaseModel):
+    line: int
+    error: str
+
+
+class UserImportReport(BaseModel):
+    rows: int
+    created: int
+    duplicates: int
+    failed: int
+    errors: list[RosterError]
+    errors_truncated: bool
+
+
 class OTPVerify(BaseModel):
     user_id: int
     otp: str = Field(min_length=6, max_length=6)
@@ -60,6 +72,28 @@ class UserOut(BaseModel):
         from_attributes = True
 
 
+class ReviewQueueUser(UserOut):
+    college_id_path: str | None
+    aadhaar_masked: str | None
+    selfie_path: str | None
+    created_at: datetime
+
+
+class ReviewQueuePage(BaseModel):
+    items: list[ReviewQueueUser]
+    next_cursor: str | None
+
+
+class BulkVerificationAction(BaseModel):
+    user_ids: list[int] = Field(min_length=1, max_length=5000)
+    status: VerificationStatus
+
+
+class BulkVerificationResult(BaseModel):
+    updated: list[int]
+    not_found: list[int]
+
+
 class HackathonCreate(BaseModel):
     title: str
     description: str
@@ -81,6 +115,15 @@ class TeamCreate(BaseModel):
     problem_statement_id: int
 
 
+class TeamImport(BaseModel):
+    teams: list[TeamCreate] = Field(min_length=1, max_length=5000)
+
+
+class TeamImportResult(BaseModel):
+    created: int
+    team_ids: list[int]
+
+
 class SubmissionCreate(BaseModel):
     team_id: int
     round: SubmissionRound
@@ -96,6 +139,19 @@ class CriterionCreate(BaseModel):
     weight: float
 
 
+class CriterionUpdate(BaseModel):
+    name: str | None = None
+    weight: float | None = None
+
+    @field_validator("name", "weight")
+    @classmethod
+    def not_null(cls, value):
+        # Omit a field to leave it unchanged; an explicit null would be written to a NOT NULL column.
+        if value is None:
+            raise ValueError("must not be null")
+        return value
+
+
 class ScoreCreate(BaseModel):
     team_id: int
     round: SubmissionRound
@@ -104,6 +160,25 @@ class ScoreCreate(BaseModel):
     score: float
 
 
+class ScoreSheetEntry(BaseModel):
+    team_id: int
+    criterion_id: int
+    score: float
+
+
+class ScoreSheet(BaseModel):
+    judge_id: int
+    round: SubmissionRound
+    scores: list[ScoreSheetEntry] = Field(min_length=1, max_length=5000)
+
+
+class ScoreSheetResult(BaseModel):
+    hackathon_id: int
+    round: SubmissionRound
+    written: int
+    teams: int
+
+
 class QRGenerate(BaseModel):
     user_id: int
     hackathon_id: int
@@ -112,12 +187,57 @@ class QRGenerate(BaseModel):
     valid_to: datetime
 
 
+class QRWindow(BaseModel):
+    purpose: QRPurpose
+    valid_from: datetime
+    valid_to: datetime
+
+
+class BulkQRGenerate(BaseModel):
+    hackathon_id: int
+    windows: list[QRWindow] = Field(min_length=1, max_length=50)
+
+
 class ScanRequest(BaseModel):
     token: str
     scanner_id: int
+    hackathon_id: int | None = None
+    purpose: QRPurpose | None = None
+
+
+class BatchScanRecord(BaseModel):
+    token: str
+    scanner_id: int
+    client_scanned_at: datetime
+    idempotency_key: str = Field(min_length=1, max_length=64)
+
+
+class BatchScanRequest(BaseModel):
+    records: list[BatchScanRecord] = Field(max_length=10000)
+
+
+class BatchScanResult(BaseModel):
+    idempotency_key: str
+    success: bool
+    message: str
+    purpose: QRPurpose | None = None
+    duplicate: bool = False
 
 
 class LeaderboardRow(BaseModel):
     team_id: int
     team_name: str
     total_score: float
+    rank: int
+
+
+class RankingRow(BaseModel):
+    rank: int
+    team_id: int
+    team_name: str
+    total_score: float
+    normalized_score: float
+    judge_std: float
+    judge_count: int
+    criterion_scores: dict[str, float]
+    submitted_at: datetime | None
@@ -0,0 +1,64 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import leaderboard as leaderboard_store
+from . import metadata_cache
+from .database import dialect_insert
+from .models import Score, SubmissionRound, Team, User, UserRole
+from .schemas import ScoreSheetEntry
+
+
+class ScoreSheetError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def record_scores(db: Session, judge_id: int, round_name: SubmissionRound, entries: list[ScoreSheetEntry]) -> int:
+    keys = [(entry.team_id, entry.criterion_id) for entry in entries]
+    if len(set(keys)) != len(keys):
+        raise ScoreSheetError(400, "Each team and criterion may appear once per sheet")
+    if db.scalar(select(User.role).where(User.id == judge_id)) != UserRole.JUDGE:
+        raise ScoreSheetError(400, "Judge role required")
+
+    criterion_ids = {entry.criterion_id for entry in entries}
+    criteria = {
+        criterion.id: criterion
+        for criterion in metadata_cache.criteria(db, criterion_ids).values()
+        if criterion.round == round_name
+    }
+    if criteria.keys() != criterion_ids:
+        raise ScoreSheetError(400, "Invalid criterion for round")
+    hackathons = {row.hackathon_id for row in criteria.values()}
+    if len(hackathons) != 1:
+        raise ScoreSheetError(400, "Score sheet spans more than one hackathon")
+    (hackathon_id,) = hackathons
+
+    team_ids = {entry.team_id for entry in entries}
+    known = set(db.scalars(select(Team.id).where(Team.id.in_(team_ids), Team.hackathon_id == hackathon_id)))
+    if known != team_ids:
+        raise ScoreSheetError(404, f"Team {min(team_ids - known)} not found in this hackathon")
+
+    # Totals are recomputed in SQL rather than adjusted by read-then-write deltas, which lose updates when two
+    # judges score one team at once and would apply whatever weight this process has cached.
+    leaderboard_store.lock_teams(db, hackathon_id, round_name, team_ids)
+    stmt = dialect_insert(db, Score)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["team_id", "round", "judge_id", "criterion_id"], set_={"score": stmt.excluded.score}
+    )
+    db.execute(
+        stmt,
+        [
+            {
+                "team_id": entry.team_id,
+                "round": round_name,
+                "judge_id": judge_id,
+                "criterion_id": entry.criterion_id,
+                "score": entry.score,
+            }
+            for entry in entries
+        ],
+    )
+    leaderboard_store.refresh_teams(db, hackathon_id, round_name, team_ids)
+    return hackathon_id
@@ -0,0 +1,97 @@
+import argparse
+import asyncio
+from datetime import datetime
+import json
+import logging
+import os
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from .database import SessionLocal
+from .models import AuthSession, QRStatus, QRToken
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def delete_expired_sessions(db: Session, now: datetime, batch_size: int) -> int:
+    expired = select(AuthSession.id).where(AuthSession.expires_at < now).limit(batch_size)
+    result = db.execute(
+        delete(AuthSession).where(AuthSession.id.in_(expired.scalar_subquery())).execution_options(
+            synchronize_session=False
+        )
+    )
+    return result.rowcount
+
+
+def expire_qr_tokens(db: Session, now: datetime, batch_size: int) -> int:
+    stale = (
+        select(QRToken.id).where(QRToken.status == QRStatus.ACTIVE, QRToken.valid_to < now).limit(batch_size)
+    )
+    result = db.execute(
+        update(QRToken)
+        .where(QRToken.id.in_(stale.scalar_subquery()))
+        .values(status=QRStatus.EXPIRED)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def _drain(session_factory: sessionmaker, step, now: datetime, batch_size: int) -> tuple[int, int]:
+    # Each batch commits on its own so locks stay short and a crash loses at most one batch.
+    touched = batches = 0
+    while True:
+        with session_factory() as db:
+            count = step(db, now, batch_size)
+            db.commit()
+        touched += count
+        batches += 1
+        if count < batch_size:
+            return touched, batches
+
+
+def run_sweep(
+    session_factory: sessionmaker = SessionLocal,
+    now: datetime | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> dict:
+    now = now or datetime.utcnow()
+    sessions, session_batches = _drain(session_factory, delete_expired_sessions, now, batch_size)
+    tokens, token_batches = _drain(session_factory, expire_qr_tokens, now, batch_size)
+    report = {
+        "swept_at": now.isoformat(),
+        "sessions_deleted": sessions,
+        "qr_tokens_expired": tokens,
+        "batches": session_batches + token_batches,
+    }
+    logger.info("Sweep finished: %s", report)
+    return report
+
+
+async def sweep_periodically(interval: float, batch_size: int = DEFAULT_BATCH_SIZE) -> None:
+    while True:
+        try:
+            await asyncio.to_thread(run_sweep, batch_size=batch_size)
+        except Exception:
+            logger.exception("Sweep failed")
+        await asyncio.sleep(interval)
+
+
+def sweep_interval() -> float:
+    # Serverless functions do not keep background tasks alive; schedule the CLI from cron there instead.
+    default = "0" if os.getenv("VERCEL") else "300"
+    return float(os.getenv("SWEEP_INTERVAL_SECONDS", default))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Delete expired sessions and expire past-window QR tokens.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(run_sweep(batch_size=args.batch_size)))
+
+
+if __name__ == "__main__":
+    main()
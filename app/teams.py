@@ -0,0 +1,133 @@
+import csv
+import io
+from typing import IO
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from . import metadata_cache
+from .models import Team, TeamMember, User, VerificationStatus
+from .schemas import TeamCreate
+
+CHUNK_SIZE = 500
+CSV_FIELDS = ["hackathon_id", "name", "captain_id", "member_ids", "problem_statement_id"]
+
+
+class TeamImportError(Exception):
+    def __init__(self, status_code: int, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _chunks(items: list, size: int = CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def find_problems(db: Session, payloads: list[TeamCreate]) -> list[tuple[int, int, str]]:
+    # One IN query per table for the whole batch, however many teams and members it holds.
+    hackathons = metadata_cache.hackathons(db, {payload.hackathon_id for payload in payloads})
+    user_ids = list({uid for payload in payloads for uid in (payload.captain_id, *payload.member_ids)})
+    approved = set()
+    for chunk in _chunks(user_ids):
+        approved.update(
+            db.scalars(
+                select(User.id).where(User.id.in_(chunk), User.verification_status == VerificationStatus.APPROVED)
+            )
+        )
+
+    hackathon_ids = list({payload.hackathon_id for payload in payloads})
+    # Members already on a team in the same hackathon, and names already used (names are unique overall).
+    on_team: set[tuple[int, int]] = set()
+    for chunk in _chunks(user_ids):
+        on_team.update(
+            db.execute(
+                select(Team.hackathon_id, TeamMember.user_id)
+                .join(TeamMember, TeamMember.team_id == Team.id)
+                .where(TeamMember.user_id.in_(chunk), Team.hackathon_id.in_(hackathon_ids))
+            ).all()
+        )
+    taken = set()
+    for chunk in _chunks(list({payload.name for payload in payloads})):
+        taken.update(db.scalars(select(Team.name).where(Team.name.in_(chunk))))
+
+    problems = []
+    named: dict[str, int] = {}
+    placed: dict[tuple[int, int], int] = {}
+    for index, payload in enumerate(payloads):
+        if payload.hackathon_id not in hackathons:
+            problems.append((index, 404, "Hackathon not found"))
+            continue
+        if payload.name in taken:
+            problems.append((index, 400, f"Team name {payload.name} already taken"))
+            continue
+        other = named.setdefault(payload.name, index)
+        if other != index:
+            problems.append((index, 400, f"Team name {payload.name} already taken by row {other}"))
+            continue
+        if payload.captain_id not in approved:
+            problems.append((index, 400, "Captain must be verified"))
+            continue
+        for member_id in sorted(set(payload.member_ids) - {payload.captain_id}):
+            if member_id not in approved:
+                problems.append((index, 400, f"Member {member_id} not verified"))
+                break
+        for member_id in sorted({payload.captain_id, *payload.member_ids}):
+            if (payload.hackathon_id, member_id) in on_team:
+                problems.append((index, 400, f"Member {member_id} is already on a team in this hackathon"))
+                break
+            other = placed.setdefault((payload.hackathon_id, member_id), index)
+            if other != index:
+                problems.append((index, 400, f"Member {member_id} is also in row {other}"))
+                break
+    return problems
+
+
+def create_teams(db: Session, payloads: list[TeamCreate]) -> list[Team]:
+    # Callers run find_problems first; nothing is committed here, so one failure rolls back the batch.
+    teams = [
+        Team(
+            hackathon_id=payload.hackathon_id,
+            name=payload.name,
+            captain_id=payload.captain_id,
+            problem_statement_id=payload.problem_statement_id,
+        )
+        for payload in payloads
+    ]
+    db.add_all(teams)
+    db.flush()
+    db.execute(
+        insert(TeamMember),
+        [
+            {"team_id": team.id, "user_id": member_id}
+            for team, payload in zip(teams, payloads)
+            for member_id in sorted({payload.captain_id, *payload.member_ids})
+        ],
+    )
+    return teams
+
+
+def parse_csv(stream: IO[bytes]) -> list[TeamCreate]:
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    missing = set(CSV_FIELDS) - set(reader.fieldnames or [])
+    if missing:
+        raise TeamImportError(422, f"Missing CSV columns: {', '.join(sorted(missing))}")
+    payloads, errors = [], []
+    for index, row in enumerate(reader):
+        try:
+            payloads.append(
+                TeamCreate(
+                    hackathon_id=row["hackathon_id"],
+                    name=row["name"],
+                    captain_id=row["captain_id"],
+                    member_ids=row["member_ids"].replace(";", " ").split(),
+                    problem_statement_id=row["problem_statement_id"],
+                )
+            )
+        except ValidationError as exc:
+            errors.append({"row": index, "error": exc.errors(include_url=False)[0]["msg"]})
+    if errors:
+        raise TeamImportError(422, errors)
+    return payloads
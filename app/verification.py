@@ -0,0 +1,50 @@
+import base64
+import binascii
+from datetime import datetime
+
+from sqlalchemy import select, tuple_, update
+from sqlalchemy.orm import Session
+
+from .models import User, VerificationStatus
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(created_at: datetime, user_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{user_id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, user_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(user_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+
+
+def review_page(
+    db: Session, status: VerificationStatus, limit: int, cursor: str | None = None
+) -> tuple[list[User], str | None]:
+    # Keyset on (created_at, id) within one status walks ix_users_review_queue; page N costs the same as page 1.
+    query = select(User).where(User.verification_status == status)
+    if cursor:
+        query = query.where(tuple_(User.created_at, User.id) > tuple_(*decode_cursor(cursor)))
+    users = list(db.scalars(query.order_by(User.created_at, User.id).limit(limit + 1)))
+    if len(users) <= limit:
+        return users, None
+    users = users[:limit]
+    return users, encode_cursor(users[-1].created_at, users[-1].id)
+
+
+def set_status(db: Session, user_ids: list[int], status: VerificationStatus) -> list[int]:
+    return list(
+        db.scalars(
+            update(User)
+            .where(User.id.in_(set(user_ids)))
+            .values(verification_status=status)
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+    )
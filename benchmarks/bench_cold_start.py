@@ -0,0 +1,115 @@
+"""Cold-start benchmark, eager vs lazy startup: python -m benchmarks.bench_cold_start [--runs N] [--database-url URL].
+
+For each DB_STARTUP mode, every run starts a fresh interpreter, the way a new serverless instance does:
+- import_ms: time to `import app.main` in a bare `python -c`.
+- ttfb_ms: time from spawning uvicorn until the first /health response arrives.
+- first_db_ms: the latency of the first request that needs the database (a rejected login). In lazy
+  mode, that request pays for building the engine and the schema-marker check.
+The database is warmed once first, so lazy runs hit a matching schema marker. Pass --database-url to
+measure against Postgres instead of a temporary SQLite file.
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+MODES = ["eager", "lazy"]
+IMPORT_PROBE = "import time; started = time.perf_counter(); import app.main; print(time.perf_counter() - started)"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _env(mode: str) -> dict:
+    return {**os.environ, "DB_STARTUP": mode, "SWEEP_INTERVAL_SECONDS": "0"}
+
+
+def measure_import(mode: str) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], env=_env(mode), capture_output=True, text=True, check=True
+    ).stdout
+    return float(output.split()[-1]) * 1000
+
+
+def measure_ttfb(mode: str) -> tuple[float, float]:
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=_env(mode),
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    response = client.get("/health")
+                    break
+                except httpx.ConnectError:
+                    if time.monotonic() > deadline:
+                        raise SystemExit(f"{mode} server did not start")
+                    time.sleep(0.002)
+            ttfb = time.perf_counter() - started
+            if response.status_code != 200:
+                raise SystemExit(f"/health returned {response.status_code}: {response.text}")
+            requested = time.perf_counter()
+            login = client.post("/auth/login", json={"email": "nobody@bench.test", "password": "x"})
+            first_db = time.perf_counter() - requested
+            if login.status_code != 401:
+                raise SystemExit(f"first database request returned {login.status_code}: {login.text}")
+    finally:
+        server.terminate()
+        server.wait()
+    return ttfb * 1000, first_db * 1000
+
+
+def _summary(samples: list[float]) -> dict:
+    return {"median": round(statistics.median(samples), 1), "min": round(min(samples), 1)}
+
+
+def run_mode(mode: str, runs: int) -> dict:
+    imports = [measure_import(mode) for _ in range(runs)]
+    ttfb, first_db = zip(*(measure_ttfb(mode) for _ in range(runs)))
+    return {
+        "mode": mode,
+        "import_ms": _summary(imports),
+        "ttfb_ms": _summary(list(ttfb)),
+        "first_db_ms": _summary(list(first_db)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-cold-")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{workdir}/bench.db"
+    os.environ.setdefault("QR_SIGNING_KEY", "bench-cold-start")
+    # One untimed lazy start creates the schema and records its marker.
+    measure_ttfb("lazy")
+
+    report = {
+        "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "results": [run_mode(mode, args.runs) for mode in args.modes],
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Ranking engine benchmark: python -m benchmarks.bench_ranking [--teams N --judges N --criteria N].
+
+The budget covers the in-process work of one ranking request on Postgres: decoding the binary COPY
+stream of scores, build_matrix and rank(). The query itself is not included.
+"""
+
+import argparse
+from datetime import datetime, timedelta
+import json
+import statistics
+import time
+
+import numpy as np
+
+from app.ranking import SCORE_COPY_TUPLE, build_matrix, decode_copy, rank
+
+BUDGET_MS = 100.0
+
+
+def synthetic_data(teams: int, judges: int, criteria: int, seed: int = 7) -> tuple[list, list, bytes]:
+    # Returns team rows, criterion rows and the scores as the binary COPY payload Postgres would send.
+    rng = np.random.default_rng(seed)
+    start = datetime(2026, 1, 1)
+    names = ["Technical depth", "Feasibility"] + [f"Criterion {c}" for c in range(2, criteria)]
+    weights = rng.uniform(0.5, 2.0, size=criteria).tolist()
+    criterion_rows = [(c + 1, names[c], weight) for c, weight in enumerate(weights)]
+    team_rows = [
+        (t + 1, f"Team {t + 1}", start + timedelta(seconds=offset))
+        for t, offset in enumerate(rng.integers(0, 86400, size=teams).tolist())
+    ]
+    bias = rng.normal(0, 1.5, size=judges)
+    values = np.clip(rng.integers(0, 11, size=(teams, judges, criteria)) + bias[None, :, None], 0, 10).round()
+    team, judge, criterion = np.meshgrid(
+        np.arange(1, teams + 1), np.arange(1, judges + 1), np.arange(1, criteria + 1), indexing="ij"
+    )
+    records = np.zeros(values.size, dtype=np.dtype(SCORE_COPY_TUPLE))
+    records["fields"] = 4
+    records["team_len"] = records["judge_len"] = records["criterion_len"] = 4
+    records["score_len"] = 8
+    records["team_id"], records["judge_id"] = team.reshape(-1), judge.reshape(-1)
+    records["criterion_id"], records["score"] = criterion.reshape(-1), values.reshape(-1)
+    header = b"PGCOPY\n\xff\r\n\x00" + (0).to_bytes(4, "big") + (0).to_bytes(4, "big")
+    return team_rows, criterion_rows, header + records.tobytes() + (-1).to_bytes(2, "big", signed=True)
+
+
+def _time_ms(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=3000)
+    parser.add_argument("--judges", type=int, default=40)
+    parser.add_argument("--criteria", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    teams, criteria, payload = synthetic_data(args.teams, args.judges, args.criteria)
+    scores = decode_copy(payload)
+    matrix = build_matrix(teams, criteria, scores)
+    decode = _time_ms(lambda: decode_copy(payload), args.repeat)
+    build = _time_ms(lambda: build_matrix(teams, criteria, scores), args.repeat)
+    ranking = _time_ms(lambda: rank(matrix), args.repeat)
+    total = _time_ms(lambda: rank(build_matrix(teams, criteria, decode_copy(payload))), args.repeat)
+
+    report = {
+        "teams": args.teams,
+        "judges": args.judges,
+        "criteria": args.criteria,
+        "score_rows": len(scores[0]),
+        "decode_ms_median": round(statistics.median(decode), 2),
+        "build_matrix_ms_median": round(statistics.median(build), 2),
+        "rank_ms_median": round(statistics.median(ranking), 2),
+        "total_ms_median": round(statistics.median(total), 2),
+        "total_ms_max": round(max(total), 2),
+        "budget_ms": BUDGET_MS,
+    }
+    print(json.dumps(report, indent=2))
+    if report["total_ms_median"] >= BUDGET_MS:
+        raise SystemExit(f"ranking median {report['total_ms_median']} ms exceeds the {BUDGET_MS} ms budget")
+
+
+if __name__ == "__main__":
+    main()
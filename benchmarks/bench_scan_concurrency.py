@@ -0,0 +1,177 @@
+"""Gate-rush benchmark, sync vs async hot paths: python -m benchmarks.bench_scan_concurrency [--scanners N --waves N].
+
+Seeds a throwaway database, then for each mode boots uvicorn in a subprocess (DB_ASYNC=0 / 1) and fires
+waves of N concurrent POST /scan requests, one per scanner, each redeeming a distinct QR token.
+Pass --database-url to run against Postgres instead of a temporary SQLite file.
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+import json
+import os
+import secrets
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+SIGNING_KEY = "bench-" + secrets.token_hex(16)
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def seed(scanners: int, tokens_per_mode: int, modes: list[str]) -> dict:
+    # Imported here so DATABASE_URL / QR_SIGNING_KEY from main() are in place first.
+    from sqlalchemy import insert
+
+    from app import qr_tokens
+    from app.database import Base, SessionLocal, engine
+    from app.models import AuthSession, Hackathon, QRPurpose, QRToken, User, UserRole
+
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    window = (now - timedelta(minutes=5), now + timedelta(hours=2))
+    with SessionLocal() as db:
+        hackathon = Hackathon(
+            title="Gate Rush", description="", registration_deadline=now, round1_deadline=now, final_deadline=now
+        )
+        student = User(name="Attendee", email="attendee@bench.test", phone="8000000000")
+        db.add_all([hackathon, student])
+        db.flush()
+        scanner_ids = db.scalars(
+            insert(User).returning(User.id),
+            [
+                {"name": f"Gate {i}", "email": f"gate{i}@bench.test", "phone": f"81{i:08d}", "role": UserRole.SCANNER}
+                for i in range(scanners)
+            ],
+        ).all()
+        sessions = [(scanner_id, secrets.token_urlsafe(24)) for scanner_id in scanner_ids]
+        db.execute(
+            insert(AuthSession),
+            [{"user_id": uid, "token": token, "expires_at": now + timedelta(days=1)} for uid, token in sessions],
+        )
+        plan = {}
+        for mode in modes:
+            tokens = [
+                qr_tokens.issue(student.id, hackathon.id, QRPurpose.ENTRY, *window) for _ in range(tokens_per_mode)
+            ]
+            db.execute(
+                insert(QRToken),
+                [
+                    {
+                        "token": token,
+                        "user_id": student.id,
+                        "hackathon_id": hackathon.id,
+                        "purpose": QRPurpose.ENTRY,
+                        "valid_from": window[0],
+                        "valid_to": window[1],
+                    }
+                    for token in tokens
+                ],
+            )
+            plan[mode] = tokens
+        db.commit()
+    return {"sessions": sessions, "tokens": plan}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(mode: str, port: int) -> subprocess.Popen:
+    env = {**os.environ, "DB_ASYNC": "1" if mode == "async" else "0", "SWEEP_INTERVAL_SECONDS": "0"}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    server.kill()
+    raise SystemExit(f"{mode} server did not start")
+
+
+async def _drive(port: int, sessions: list[tuple[int, str]], tokens: list[str], waves: int) -> tuple[list[float], int]:
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=len(sessions), max_keepalive_connections=len(sessions))
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+
+        async def scan(scanner_id: int, auth: str, token: str) -> None:
+            nonlocal errors
+            started = time.perf_counter()
+            response = await client.post(
+                "/scan", json={"token": token, "scanner_id": scanner_id}, headers={"Authorization": f"Bearer {auth}"}
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200 or not response.json()["success"]:
+                errors += 1
+
+        for wave in range(waves):
+            batch = tokens[wave * len(sessions) : (wave + 1) * len(sessions)]
+            await asyncio.gather(*(scan(uid, auth, token) for (uid, auth), token in zip(sessions, batch)))
+    return latencies, errors
+
+
+def run_mode(mode: str, sessions, tokens, waves: int) -> dict:
+    port = _free_port()
+    server = _start_server(mode, port)
+    try:
+        started = time.perf_counter()
+        latencies, errors = asyncio.run(_drive(port, sessions, tokens, waves))
+        elapsed = time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(statistics.median(latencies), 1),
+        "p95_ms": round(_percentile(latencies, 95), 1),
+        "p99_ms": round(_percentile(latencies, 99), 1),
+        "max_ms": round(max(latencies), 1),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scanners", type=int, default=500)
+    parser.add_argument("--waves", type=int, default=4)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-scan-")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{workdir}/bench.db"
+    os.environ["QR_SIGNING_KEY"] = SIGNING_KEY
+    modes = ["sync", "async"]
+    plan = seed(args.scanners, args.scanners * args.waves, modes)
+
+    results = [run_mode(mode, plan["sessions"], plan["tokens"][mode], args.waves) for mode in modes]
+    sync, async_ = results
+    report = {
+        "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+        "concurrent_scanners": args.scanners,
+        "waves": args.waves,
+        "results": results,
+        "p99_speedup": round(sync["p99_ms"] / async_["p99_ms"], 2) if async_["p99_ms"] else None,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
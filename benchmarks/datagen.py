@@ -0,0 +1,257 @@
+"""Seed a benchmark dataset: python -m benchmarks.datagen --database-url URL [--users N --teams N ...].
+
+Creates one hackathon with N approved students, teams, judges, criteria, scores, QR tokens and past
+scan logs, plus bearer sessions for the staff accounts. Everything is bulk-inserted, and the
+materialized leaderboard and scan counters are rebuilt so the app starts from a consistent state.
+Run it against an empty database; the plan it returns (JSON on the CLI) tells the load driver which
+credentials and tokens it may use.
+"""
+
+import argparse
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+import json
+import os
+import secrets
+
+import numpy as np
+
+PASSWORD = "bench-password"
+
+
+@dataclass
+class DatasetSize:
+    users: int = 2000
+    teams: int = 400
+    judges: int = 10
+    criteria: int = 4
+    scanners: int = 20
+    meal_tokens: int = 5000
+    scan_logs: int = 20000
+
+
+def _bulk(db, model, rows: list[dict]) -> list[int]:
+    from sqlalchemy import insert
+
+    ids = []
+    for start in range(0, len(rows), 1000):
+        ids += db.scalars(insert(model).returning(model.id), rows[start : start + 1000]).all()
+    return ids
+
+
+def seed(size: DatasetSize, rng_seed: int = 7) -> dict:
+    # Imported here so callers can point DATABASE_URL / QR_SIGNING_KEY somewhere first.
+    from sqlalchemy import insert
+
+    from app import analytics, qr_tokens
+    from app import leaderboard as leaderboard_store
+    from app.database import Base, SessionLocal, engine
+    from app.main import _hash_password
+    from app.models import (
+        AuthSession,
+        EvaluationCriterion,
+        Hackathon,
+        ProblemStatement,
+        QRPurpose,
+        QRToken,
+        ScanLog,
+        Score,
+        SubmissionRound,
+        Team,
+        TeamMember,
+        User,
+        UserRole,
+        VerificationStatus,
+    )
+
+    rng = np.random.default_rng(rng_seed)
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    window = (now - timedelta(minutes=30), now + timedelta(hours=6))
+    password_hash = _hash_password(PASSWORD)
+
+    with SessionLocal() as db:
+        hackathon = Hackathon(
+            title="Benchmark Hack",
+            description="",
+            registration_deadline=now,
+            round1_deadline=now,
+            final_deadline=now + timedelta(days=1),
+        )
+        db.add(hackathon)
+        db.flush()
+        hackathon_id = hackathon.id
+        problem = ProblemStatement(hackathon_id=hackathon_id, title="Open", description="")
+        db.add(problem)
+        db.flush()
+
+        def people(prefix: str, count: int, role: UserRole) -> list[dict]:
+            return [
+                {
+                    "name": f"{prefix.title()} {i}",
+                    "email": f"{prefix}{i}@bench.test",
+                    "phone": f"{7 + list(UserRole).index(role)}{i:09d}",
+                    "role": role,
+                    "password_hash": password_hash,
+                    "verification_status": VerificationStatus.APPROVED,
+                }
+                for i in range(count)
+            ]
+
+        students = _bulk(db, User, people("student", size.users, UserRole.STUDENT))
+        judges = _bulk(db, User, people("judge", size.judges, UserRole.JUDGE))
+        scanners = _bulk(db, User, people("scanner", size.scanners, UserRole.SCANNER))
+        (admin,) = _bulk(db, User, people("admin", 1, UserRole.ADMIN))
+
+        criteria = _bulk(
+            db,
+            EvaluationCriterion,
+            [
+                {
+                    "hackathon_id": hackathon_id,
+                    "round": SubmissionRound.ROUND1,
+                    "name": f"Criterion {c}",
+                    "weight": float(round(rng.uniform(0.5, 2.0), 2)),
+                }
+                for c in range(size.criteria)
+            ],
+        )
+        # Students are split round-robin so every team has a captain and roughly users/teams members.
+        roster = [students[t :: size.teams] for t in range(min(size.teams, size.users))]
+        teams = _bulk(
+            db,
+            Team,
+            [
+                {
+                    "hackathon_id": hackathon_id,
+                    "name": f"Team {t}",
+                    "captain_id": members[0],
+                    "problem_statement_id": problem.id,
+                }
+                for t, members in enumerate(roster)
+            ],
+        )
+        db.execute(
+            insert(TeamMember),
+            [
+                {"team_id": team_id, "user_id": user_id}
+                for team_id, members in zip(teams, roster)
+                for user_id in members
+            ],
+        )
+        values = rng.integers(0, 11, size=(len(teams), len(judges), len(criteria)))
+        score_rows = [
+            {
+                "team_id": team_id,
+                "round": SubmissionRound.ROUND1,
+                "judge_id": judge_id,
+                "criterion_id": criterion_id,
+                "score": float(values[t, j, c]),
+            }
+            for t, team_id in enumerate(teams)
+            for j, judge_id in enumerate(judges)
+            for c, criterion_id in enumerate(criteria)
+        ]
+        for start in range(0, len(score_rows), 5000):
+            db.execute(insert(Score), score_rows[start : start + 5000])
+        leaderboard_store.rebuild(db, hackathon_id, SubmissionRound.ROUND1)
+
+        # Past scans hang off already-consumed entry tokens; the meal tokens stay ACTIVE for the rush.
+        entry_tokens = [
+            {
+                "token": qr_tokens.issue(student_id, hackathon_id, QRPurpose.ENTRY, *window),
+                "user_id": student_id,
+                "hackathon_id": hackathon_id,
+                "purpose": QRPurpose.ENTRY,
+                "valid_from": window[0],
+                "valid_to": window[1],
+            }
+            for student_id in students
+        ]
+        entry_ids = _bulk(db, QRToken, entry_tokens)
+        scan_token_ids = rng.choice(entry_ids, size=size.scan_logs) if entry_ids and size.scan_logs else []
+        scan_rows = [
+            {
+                "qr_token_id": int(token_id),
+                "scanner_id": scanners[i % len(scanners)],
+                "scanned_at": now - timedelta(seconds=int(rng.integers(0, 6 * 3600))),
+                "success": bool(rng.random() < 0.9),
+                "message": "Scan successful",
+            }
+            for i, token_id in enumerate(scan_token_ids)
+        ]
+        for row in scan_rows:
+            if not row["success"]:
+                row["message"] = "Token already consumed"
+        for start in range(0, len(scan_rows), 5000):
+            db.execute(insert(ScanLog), scan_rows[start : start + 5000])
+        analytics.rebuild_counters(db, hackathon_id)
+
+        meal_holders = [students[i % len(students)] for i in range(size.meal_tokens)]
+        meal_tokens = [
+            qr_tokens.issue(student_id, hackathon_id, QRPurpose.LUNCH, *window) for student_id in meal_holders
+        ]
+        _bulk(
+            db,
+            QRToken,
+            [
+                {
+                    "token": token,
+                    "user_id": student_id,
+                    "hackathon_id": hackathon_id,
+                    "purpose": QRPurpose.LUNCH,
+                    "valid_from": window[0],
+                    "valid_to": window[1],
+                }
+                for token, student_id in zip(meal_tokens, meal_holders)
+            ],
+        )
+
+        sessions = {user_id: secrets.token_urlsafe(24) for user_id in [admin, *judges, *scanners]}
+        db.execute(
+            insert(AuthSession),
+            [
+                {"user_id": user_id, "token": token, "expires_at": now + timedelta(days=1)}
+                for user_id, token in sessions.items()
+            ],
+        )
+        db.commit()
+
+    return {
+        "size": asdict(size),
+        "hackathon_id": hackathon_id,
+        "password": PASSWORD,
+        "student_emails": [f"student{i}@bench.test" for i in range(size.users)],
+        "admin": {"id": admin, "token": sessions[admin]},
+        "judges": [{"id": judge_id, "token": sessions[judge_id]} for judge_id in judges],
+        "scanners": [{"id": scanner_id, "token": sessions[scanner_id]} for scanner_id in scanners],
+        "team_ids": teams,
+        "criterion_ids": criteria,
+        "meal_tokens": meal_tokens,
+    }
+
+
+def add_size_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = DatasetSize()
+    for name, value in asdict(defaults).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=value)
+
+
+def size_from_args(args: argparse.Namespace) -> DatasetSize:
+    return DatasetSize(**{name: getattr(args, name) for name in asdict(DatasetSize())})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--seed", type=int, default=7)
+    add_size_arguments(parser)
+    args = parser.parse_args()
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("QR_SIGNING_KEY", "bench-" + secrets.token_hex(16))
+    plan = seed(size_from_args(args), args.seed)
+    print(json.dumps({key: value for key, value in plan.items() if key not in ("student_emails", "meal_tokens")}))
+
+
+if __name__ == "__main__":
+    main()
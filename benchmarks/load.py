@@ -0,0 +1,238 @@
+"""Hackathon-day load test: python -m benchmarks.load [--concurrency N --requests N] [--out report.json]
+[--baseline old.json].
+
+Seeds a dataset with benchmarks.datagen and serves the app from uvicorn in this process. It then drives
+four scenarios at the given concurrency: login, meal-rush /scan, /judge/scores and /admin/leaderboard.
+Client-side req/s, p50/p99 and server-side SQL statements per request (from app.profiling) are
+printed as JSON. With --baseline, each scenario is compared against an earlier report, and the exit
+code is 1 if p99 slowed by more than --threshold or SQL statements per request grew.
+Pass --database-url postgresql://... to run against a local Postgres instead of a temporary SQLite file.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import secrets
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import httpx
+
+from benchmarks import datagen
+
+SCENARIOS = ["login", "scan", "judge_scores", "leaderboard"]
+ROUTES = {
+    "login": ("POST", "/auth/login"),
+    "scan": ("POST", "/scan"),
+    "judge_scores": ("POST", "/judge/scores"),
+    "leaderboard": ("GET", "/admin/leaderboard"),
+}
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class InProcessServer:
+    def __init__(self, app, port: int):
+        import uvicorn
+
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        deadline = time.monotonic() + 30
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise SystemExit("uvicorn did not start")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+def _requests(plan: dict, scenario: str):
+    # Endless per-scenario request factories; every scan redeems a fresh meal token.
+    if scenario == "login":
+        for email in itertools.cycle(plan["student_emails"]):
+            yield "POST", "/auth/login", {"json": {"email": email, "password": plan["password"]}}
+    elif scenario == "scan":
+        for token, scanner in zip(plan["meal_tokens"], itertools.cycle(plan["scanners"])):
+            body = {"token": token, "scanner_id": scanner["id"], "hackathon_id": plan["hackathon_id"]}
+            yield "POST", "/scan", {"json": body, "headers": {"Authorization": f"Bearer {scanner['token']}"}}
+    elif scenario == "judge_scores":
+        cells = itertools.product(plan["judges"], plan["team_ids"], plan["criterion_ids"])
+        for i, (judge, team_id, criterion_id) in enumerate(itertools.cycle(cells)):
+            body = {
+                "team_id": team_id,
+                "round": "ROUND1",
+                "judge_id": judge["id"],
+                "criterion_id": criterion_id,
+                "score": i % 11,
+            }
+            yield "POST", "/judge/scores", {"json": body, "headers": {"Authorization": f"Bearer {judge['token']}"}}
+    else:
+        params = {"hackathon_id": plan["hackathon_id"], "round_name": "ROUND1", "limit": 50}
+        headers = {"Authorization": f"Bearer {plan['admin']['token']}"}
+        while True:
+            yield "GET", "/admin/leaderboard", {"params": params, "headers": headers}
+
+
+async def _drive(base_url: str, requests, concurrency: int) -> tuple[list[float], int, float]:
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+
+        async def worker():
+            nonlocal errors
+            for method, url, kwargs in requests:
+                started = time.perf_counter()
+                response = await client.request(method, url, **kwargs)
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code >= 400 or (url == "/scan" and not response.json()["success"]):
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies, errors, time.perf_counter() - started
+
+
+def run_scenario(base_url: str, plan: dict, scenario: str, total: int, concurrency: int) -> dict:
+    from app.profiling import profiler
+
+    # One shared bounded iterator: workers pull until `total` requests have been issued.
+    requests = itertools.islice(_requests(plan, scenario), total)
+    profiler.reset()
+    latencies, errors, elapsed = asyncio.run(_drive(base_url, requests, concurrency))
+    routes = {(entry["method"], entry["route"]): entry for entry in profiler.snapshot()}
+    server = routes.get(ROUTES[scenario])
+    sql_per_request = server["series"]["sql"][1] / server["count"] if server else None
+    return {
+        "scenario": scenario,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "max_ms": round(max(latencies), 2),
+        "sql_per_request": round(sql_per_request, 2) if sql_per_request is not None else None,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[dict]:
+    before = {result["scenario"]: result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        old = before.get(result["scenario"])
+        if old is None:
+            continue
+        p99_change = (result["p99_ms"] - old["p99_ms"]) / old["p99_ms"] if old["p99_ms"] else 0.0
+        rps_change = (result["throughput_rps"] - old["throughput_rps"]) / old["throughput_rps"]
+        sql_change = (result["sql_per_request"] or 0) - (old["sql_per_request"] or 0)
+        rows.append(
+            {
+                "scenario": result["scenario"],
+                "p99_ms": [old["p99_ms"], result["p99_ms"]],
+                "p99_change": round(p99_change, 3),
+                "throughput_change": round(rps_change, 3),
+                "sql_per_request": [old["sql_per_request"], result["sql_per_request"]],
+                # Cold-cache auth lookups add a fraction of a statement; a new round-trip on every request shows as ~1.
+                "regressed": p99_change > threshold or sql_change >= 0.5,
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=1000, help="requests per scenario")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="write the JSON report here as well as to stdout")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative p99 slowdown")
+    datagen.add_size_arguments(parser)
+    args = parser.parse_args()
+
+    size = datagen.size_from_args(args)
+    if "scan" in args.scenarios and size.meal_tokens < args.requests:
+        size.meal_tokens = args.requests
+    workdir = tempfile.mkdtemp(prefix="bench-load-")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{workdir}/bench.db"
+    os.environ["QR_SIGNING_KEY"] = "bench-" + secrets.token_hex(16)
+    os.environ["SWEEP_INTERVAL_SECONDS"] = "0"
+    os.environ["PROFILING"] = "1"
+    os.environ.setdefault("PROFILING_WINDOW", str(args.requests))
+    os.environ.setdefault("PROFILING_SLOW_MS", "1e9")
+
+    seeded = time.perf_counter()
+    plan = datagen.seed(size, args.seed)
+    seed_seconds = time.perf_counter() - seeded
+
+    from app.database import ENGINE_PROFILE, async_engine
+    from app.main import app
+
+    port = _free_port()
+    with InProcessServer(app, port):
+        results = [
+            run_scenario(f"http://127.0.0.1:{port}", plan, scenario, args.requests, args.concurrency)
+            for scenario in args.scenarios
+        ]
+
+    report = {
+        "commit": _git_commit(),
+        "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+        "engine_profile": ENGINE_PROFILE,
+        "async_routes": async_engine is not None,
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "dataset": plan["size"],
+        "seed_seconds": round(seed_seconds, 1),
+        "concurrency": args.concurrency,
+        "requests_per_scenario": args.requests,
+        "results": results,
+    }
+    regressed = False
+    if args.baseline:
+        with open(args.baseline) as handle:
+            report["comparison"] = compare(json.load(handle), report, args.threshold)
+        regressed = any(row["regressed"] for row in report["comparison"])
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as handle:
+            handle.write(output + "\n")
+    print(output)
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == "__main__":
+    main()
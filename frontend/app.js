@@ -12,12 +12,6 @@ function headers() {
 async function api(url, options={}) {
   const res = await fetch(url, {headers: headers(), ...options});
   const data = await res.json().catch(() => ({}));
-const dt = (days) => new Date(Date.now() + days*86400000).toISOString();
-
-async function api(url, options={}) {
-  const res = await fetch(url, {headers:{'Content-Type':'application/json'}, ...options});
-  let data;
-  try { data = await res.json(); } catch { data = {status: res.status}; }
   if (!res.ok) throw data;
   return data;
 }
@@ -56,62 +50,51 @@ function logout(){
 
 async function loadMe(){ try{ out('meOut', await api('/auth/me')); }catch(e){ out('meOut', e);} }
 async function verifyStudent(){ try{ out('vOut', await api(`/admin/verification/${+vUser.value}`,{method:'PATCH',body:JSON.stringify({status:vStatus.value})})); }catch(e){ out('vOut', e);} }
+let queueCursor = null, queuePage = [];
+async function loadQueue(next=false){ try{ const page = await api(`/admin/verification/queue?limit=50${next && queueCursor ? `&cursor=${queueCursor}` : ''}`); queueCursor = page.next_cursor; queuePage = page.items.map(u => u.id); out('vqOut', page); }catch(e){ out('vqOut', e);} }
+async function bulkVerify(status){ try{ out('vqOut', await api('/admin/verification/bulk',{method:'POST',body:JSON.stringify({user_ids:queuePage,status})})); }catch(e){ out('vqOut', e);} }
 async function createHackathon(){ try{ out('hOut', await api('/admin/hackathons',{method:'POST',body:JSON.stringify({title:hTitle.value,description:hDesc.value,registration_deadline:dt(2),round1_deadline:dt(3),final_deadline:dt(4)})})); }catch(e){ out('hOut', e);} }
 async function createPS(){ try{ out('psOut', await api(`/admin/hackathons/${+psH.value}/problem-statements`,{method:'POST',body:JSON.stringify({title:psT.value,description:psD.value})})); }catch(e){ out('psOut', e);} }
 async function addCriterion(){ try{ out('cOut', await api('/admin/evaluation-criteria',{method:'POST',body:JSON.stringify({hackathon_id:+cH.value,round:'ROUND1',name:cN.value,weight:+cW.value})})); }catch(e){ out('cOut', e);} }
 async function generateQr(){ try{ out('qOut', await api('/qr/generate',{method:'POST',body:JSON.stringify({user_id:+qU.value,hackathon_id:+qH.value,purpose:qP.value,valid_from:new Date(Date.now()-60000).toISOString(),valid_to:new Date(Date.now()+3600000).toISOString()})})); }catch(e){ out('qOut', e);} }
 async function scanAnalytics(){ try{ out('aOut', await api(`/admin/scan-analytics?hackathon_id=${+aH.value}`)); }catch(e){ out('aOut', e);} }
 
+async function loadLeaderboard(){ try{ out('lbOut', await api(`/admin/leaderboard?hackathon_id=${+lbH.value}&round_name=ROUND1`)); }catch(e){ out('lbOut', e);} }
+
+let liveAbort = null;
+async function toggleLiveLeaderboard(){
+  if (liveAbort) { liveAbort.abort(); return; }
+  liveAbort = new AbortController();
+  lbLive.textContent = 'Stop Live';
+  let board = {};
+  try {
+    const res = await fetch(`/admin/leaderboard/stream?hackathon_id=${+lbH.value}&round_name=ROUND1`, {headers: headers(), signal: liveAbort.signal});
+    if (!res.ok) throw await res.json().catch(() => ({status: res.status}));
+    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+    for (;;) {
+      const {value, done} = await reader.read();
+      if (done) break;
+      buffer += value;
+      let end;
+      while ((end = buffer.indexOf('\n\n')) >= 0) {
+        const frame = buffer.slice(0, end);
+        buffer = buffer.slice(end + 2);
+        const event = /^event: (.*)$/m.exec(frame), data = /^data: (.*)$/m.exec(frame);
+        if (!event || !data) continue;
+        if (event[1] === 'snapshot') board = {};
+        JSON.parse(data[1]).forEach(row => board[row.team_id] = row);
+        out('lbOut', Object.values(board).sort((a, b) => a.rank - b.rank));
+      }
+    }
+  } catch(e){ if (e.name !== 'AbortError') out('lbOut', e); }
+  liveAbort = null;
+  lbLive.textContent = 'Go Live';
+}
+
 async function uploadDocs(){ try{ out('docOut', await api('/verification/upload-documents',{method:'POST',body:JSON.stringify({college_id_path:docId.value,aadhaar_masked:docAa.value,selfie_path:docSf.value})})); }catch(e){ out('docOut', e);} }
 async function faceMatch(){ try{ out('fmOut', await api('/verification/face-match',{method:'POST'})); }catch(e){ out('fmOut', e);} }
 async function createTeam(){ try{ out('tOut', await api('/teams',{method:'POST',body:JSON.stringify({hackathon_id:+tH.value,name:tN.value,captain_id:+tC.value,member_ids:[],problem_statement_id:+tP.value})})); }catch(e){ out('tOut', e);} }
 async function submitPpt(){ try{ out('sOut', await api('/submissions',{method:'POST',body:JSON.stringify({team_id:+sT.value,round:'ROUND1',ppt_link:sL.value})})); }catch(e){ out('sOut', e);} }
 
 renderPanels();
-async function checkHealth(){ try{ out('healthOut', await api('/health')); }catch(e){ out('healthOut', e);} }
-async function registerUser(){
-  try {
-    const body = {name:uName.value,email:uEmail.value,phone:uPhone.value,role:uRole.value};
-    out('registerOut', await api('/auth/register',{method:'POST',body:JSON.stringify(body)}));
-  } catch(e){ out('registerOut', e); }
-}
-async function verifyOtp(){ try{ out('verifyOut', await api('/auth/verify-otp',{method:'POST',body:JSON.stringify({user_id:+otpUserId.value,otp:'123456'})})); }catch(e){ out('verifyOut', e);} }
-async function approveStudent(){ try{ out('verifyOut', await api(`/admin/verification/${+otpUserId.value}`,{method:'PATCH',body:JSON.stringify({status:'APPROVED'})})); }catch(e){ out('verifyOut', e);} }
-async function createHackathon(){
-  try {
-    const body={title:hTitle.value,description:hDesc.value,registration_deadline:dt(2),round1_deadline:dt(3),final_deadline:dt(4)};
-    out('hackOut', await api('/admin/hackathons',{method:'POST',body:JSON.stringify(body)}));
-  } catch(e){ out('hackOut', e); }
-}
-async function createPS(){
-  try { out('psOut', await api(`/admin/hackathons/${+psHackId.value}/problem-statements`,{method:'POST',body:JSON.stringify({title:psTitle.value,description:psDesc.value})})); }
-  catch(e){ out('psOut', e); }
-}
-async function createTeam(){
-  try {
-    const body={hackathon_id:+tHackId.value,name:tName.value,captain_id:+tCaptain.value,member_ids:[],problem_statement_id:+tPS.value};
-    out('teamOut', await api('/teams',{method:'POST',body:JSON.stringify(body)}));
-  } catch(e){ out('teamOut', e); }
-}
-async function submitRound1(){
-  try { out('subOut', await api('/submissions',{method:'POST',body:JSON.stringify({team_id:+sTeam.value,round:'ROUND1',ppt_link:sPpt.value})})); }
-  catch(e){ out('subOut', e); }
-}
-async function addCriterionAndScore(){
-  try {
-    const c = await api('/admin/evaluation-criteria',{method:'POST',body:JSON.stringify({hackathon_id:+cHack.value,round:'ROUND1',name:cName.value,weight:+cWeight.value})});
-    const s = await api('/judge/scores',{method:'POST',body:JSON.stringify({team_id:+scTeam.value,round:'ROUND1',judge_id:+scJudge.value,criterion_id:c.id,score:+scVal.value})});
-    out('scoreOut', {criterion:c,score:s});
-  } catch(e){ out('scoreOut', e); }
-}
-async function loadLeaderboard(){
-  try { out('leaderOut', await api(`/admin/leaderboard?hackathon_id=${+lHack.value}&round_name=ROUND1`)); }
-  catch(e){ out('leaderOut', e); }
-}
-async function genAndScan(){
-  try {
-    const q = await api('/qr/generate',{method:'POST',body:JSON.stringify({user_id:+qUser.value,hackathon_id:+qHack.value,purpose:'LUNCH',valid_from:new Date(Date.now()-60000).toISOString(),valid_to:new Date(Date.now()+3600000).toISOString()})});
-    const s = await api('/scan',{method:'POST',body:JSON.stringify({token:q.token,scanner_id:+qScanner.value})});
-    out('qrOut',{qr:q,scan:s});
-  } catch(e){ out('qrOut',e); }
-}
@@ -0,0 +1,40 @@
+from contextlib import contextmanager
+import os
+
+import pytest
+from sqlalchemy import event
+
+# QR signing fails closed without a key; set one before the app modules load.
+os.environ.setdefault("QR_SIGNING_KEY", "test-signing-key")
+
+from app.database import async_engine, async_read_engine, engine, read_engine
+
+
+@contextmanager
+def recorded_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = {engine, read_engine, *(target.sync_engine for target in (async_engine, async_read_engine) if target)}
+    for target in engines:
+        event.listen(target, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        for target in engines:
+            event.remove(target, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def query_budget():
+    # Runs one TestClient call and fails if it needed more SQL round-trips than budgeted.
+    def check(call, budget: int):
+        with recorded_statements() as statements:
+            response = call()
+        assert response.status_code < 400, response.text
+        assert len(statements) <= budget, f"{len(statements)} statements, budget {budget}:\n" + "\n".join(statements)
+        return response, statements
+
+    return check
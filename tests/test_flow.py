@@ -1,18 +1,45 @@
-from datetime import datetime, timedelta
+import asyncio
+from datetime import datetime, timedelta, timezone
+import csv
+import gzip
+import io
+import json
 import os
 
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from app.database import Base, engine
-from app.main import app
+from app import exports, metadata_cache, roster
+from app.auth_cache import session_cache
+from app.database import Base, SessionLocal, async_engine, engine
+from app.leaderboard import weighted_totals
+from app.main import app, async_routes, sync_routes
+from app.models import (
+    EvaluationCriterion,
+    LeaderboardEntry,
+    QRPurpose,
+    QRToken,
+    ScanLog,
+    Score,
+    SubmissionRound,
+    Team,
+    TeamMember,
+)
+from conftest import recorded_statements
 
 
 client = TestClient(app)
 
 
 def setup_module():
-    if os.path.exists("hackathon.db"):
-        os.remove("hackathon.db")
+    engine.dispose()
+    if async_engine is not None:
+        asyncio.run(async_engine.dispose())
+    for path in ("hackathon.db", "hackathon.db-wal", "hackathon.db-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+    # Ids restart with the fresh file, so rows cached by earlier modules no longer describe them.
+    metadata_cache.cache.clear()
     Base.metadata.create_all(bind=engine)
 
 
@@ -47,37 +74,6 @@ def test_end_to_end_flow():
         json={
             "title": "Campus Hack",
             "description": "demo",
-def _register_user(name, email, phone, role="STUDENT"):
-    user = client.post(
-        "/auth/register",
-        json={"name": name, "email": email, "phone": phone, "role": role},
-    ).json()
-    client.post("/auth/verify-otp", json={"user_id": user["id"], "otp": "123456"})
-    if role == "STUDENT":
-        client.post(
-            "/verification/upload-documents",
-            params={"user_id": user["id"]},
-            json={
-                "college_id_path": "docs/id.png",
-                "aadhaar_masked": "XXXX-XXXX-1234",
-                "selfie_path": "docs/selfie.png",
-            },
-        )
-        client.patch(f"/admin/verification/{user['id']}", json={"status": "APPROVED"})
-    return user
-
-
-def test_end_to_end_flow():
-    student = _register_user("Alice", "alice@example.com", "9000000001")
-    judge = _register_user("Judge", "judge@example.com", "9000000002", role="JUDGE")
-    scanner = _register_user("Scan", "scanner@example.com", "9000000003", role="SCANNER")
-
-    now = datetime.utcnow()
-    hackathon = client.post(
-        "/admin/hackathons",
-        json={
-            "title": "Campus Hack 2026",
-            "description": "Demo",
             "registration_deadline": (now + timedelta(days=2)).isoformat(),
             "round1_deadline": (now + timedelta(days=3)).isoformat(),
             "final_deadline": (now + timedelta(days=4)).isoformat(),
@@ -88,8 +84,6 @@ def test_end_to_end_flow():
         f"/admin/hackathons/{hack['id']}/problem-statements",
         headers=admin_h,
         json={"title": "Smart Campus", "description": "desc"},
-        f"/admin/hackathons/{hackathon['id']}/problem-statements",
-        json={"title": "Smart Campus", "description": "Digitize operations"},
     ).json()
 
     team = client.post(
@@ -97,8 +91,6 @@ def test_end_to_end_flow():
         headers=student_h,
         json={
             "hackathon_id": hack["id"],
-        json={
-            "hackathon_id": hackathon["id"],
             "name": "Team One",
             "captain_id": student["id"],
             "member_ids": [],
@@ -124,28 +116,6 @@ def test_end_to_end_flow():
     s = client.post(
         "/judge/scores",
         headers=judge_h,
-    submission = client.post(
-        "/submissions",
-        json={
-            "team_id": team_id,
-            "round": "ROUND1",
-            "ppt_link": "https://example.com/ppt",
-        },
-    )
-    assert submission.status_code == 200
-
-    criterion = client.post(
-        "/admin/evaluation-criteria",
-        json={
-            "hackathon_id": hackathon["id"],
-            "round": "ROUND1",
-            "name": "Innovation",
-            "weight": 0.4,
-        },
-    ).json()
-
-    score = client.post(
-        "/judge/scores",
         json={
             "team_id": team_id,
             "round": "ROUND1",
@@ -162,6 +132,7 @@ def test_end_to_end_flow():
         params={"hackathon_id": hack["id"], "round_name": "ROUND1"},
     )
     assert lb.status_code == 200
+    assert lb.json()[0]["team_id"] == team_id
 
     qr = client.post(
         "/qr/generate",
@@ -169,44 +140,852 @@ def test_end_to_end_flow():
         json={
             "user_id": student["id"],
             "hackathon_id": hack["id"],
-            "criterion_id": criterion["id"],
+            "purpose": "LUNCH",
+            "valid_from": (now - timedelta(minutes=5)).isoformat(),
+            "valid_to": (now + timedelta(minutes=30)).isoformat(),
+        },
+    ).json()
+
+    scan = client.post(
+        "/scan",
+        headers=admin_h,
+        json={"token": qr["token"], "scanner_id": scanner["id"]},
+    )
+    assert scan.status_code == 200
+    assert scan.json()["success"] is True
+
+    duplicate_scan = client.post("/scan", headers=admin_h, json={"token": qr["token"], "scanner_id": scanner["id"]})
+    assert duplicate_scan.status_code == 200
+    assert duplicate_scan.json()["success"] is False
+
+    analytics = client.get("/admin/scan-analytics", headers=admin_h, params={"hackathon_id": hack["id"]})
+    assert analytics.status_code == 200
+    assert analytics.json()["successful_scans"] == 1
+    assert analytics.json()["failed_scans"] == 1
+
+
+def _create_hackathon(admin_h, title):
+    now = datetime.utcnow()
+    hack = client.post(
+        "/admin/hackathons",
+        headers=admin_h,
+        json={
+            "title": title,
+            "description": "demo",
+            "registration_deadline": (now + timedelta(days=2)).isoformat(),
+            "round1_deadline": (now + timedelta(days=3)).isoformat(),
+            "final_deadline": (now + timedelta(days=4)).isoformat(),
+        },
+    ).json()
+    ps = client.post(
+        f"/admin/hackathons/{hack['id']}/problem-statements",
+        headers=admin_h,
+        json={"title": "Open", "description": "desc"},
+    ).json()
+    return hack, ps
+
+
+def _approved_captain(admin_h, name, phone):
+    # Nobody can be on two teams in one hackathon, so every extra team needs its own captain.
+    captain, _ = _signup_and_login(name, f"{name.lower().replace(' ', '-')}@example.com", phone)
+    client.patch(f"/admin/verification/{captain['id']}", headers=admin_h, json={"status": "APPROVED"})
+    return captain
+
+
+def _create_team(admin_h, hack, ps, captain, name):
+    team = client.post(
+        "/teams",
+        headers=admin_h,
+        json={
+            "hackathon_id": hack["id"],
+            "name": name,
+            "captain_id": captain["id"],
+            "member_ids": [],
+            "problem_statement_id": ps["id"],
+        },
+    )
+    assert team.status_code == 200
+    return team.json()
+
+
+def test_leaderboard_is_scoped_ranked_and_paged():
+    admin, admin_h = _signup_and_login("LB Admin", "lb-admin@example.com", "9100000000", role="ADMIN")
+    judge, judge_h = _signup_and_login("LB Judge", "lb-judge@example.com", "9100000001", role="JUDGE")
+    captain, _ = _signup_and_login("LB Cap", "lb-cap@example.com", "9100000002")
+    client.patch(f"/admin/verification/{captain['id']}", headers=admin_h, json={"status": "APPROVED"})
+
+    hack, ps = _create_hackathon(admin_h, "Board Hack")
+    other_hack, other_ps = _create_hackathon(admin_h, "Other Hack")
+    criterion = client.post(
+        "/admin/evaluation-criteria",
+        headers=admin_h,
+        json={"hackathon_id": hack["id"], "round": "ROUND1", "name": "Innovation", "weight": 2.0},
+    ).json()
+    other_criterion = client.post(
+        "/admin/evaluation-criteria",
+        headers=admin_h,
+        json={"hackathon_id": other_hack["id"], "round": "ROUND1", "name": "Innovation", "weight": 10.0},
+    ).json()
+
+    captains = [captain] + [_approved_captain(admin_h, f"LB Cap {i}", f"910000010{i}") for i in range(1, 3)]
+    teams = [_create_team(admin_h, hack, ps, cap, f"Board Team {i}") for i, cap in enumerate(captains)]
+    outsider = _create_team(admin_h, other_hack, other_ps, captain, "Outsider Team")
+    for team, value in zip(teams, [5, 8, 3]):
+        client.post(
+            "/judge/scores",
+            headers=judge_h,
+            json={
+                "team_id": team["id"],
+                "round": "ROUND1",
+                "judge_id": judge["id"],
+                "criterion_id": criterion["id"],
+                "score": value,
+            },
+        )
+    client.post(
+        "/judge/scores",
+        headers=judge_h,
+        json={
+            "team_id": outsider["id"],
+            "round": "ROUND1",
+            "judge_id": judge["id"],
+            "criterion_id": other_criterion["id"],
             "score": 9,
         },
     )
-    assert score.status_code == 200
 
-    leaderboard = client.get(
-        "/admin/leaderboard",
-        params={"hackathon_id": hackathon["id"], "round_name": "ROUND1"},
+    params = {"hackathon_id": hack["id"], "round_name": "ROUND1"}
+    board = client.get("/admin/leaderboard", headers=admin_h, params=params).json()
+    assert [row["team_id"] for row in board] == [teams[1]["id"], teams[0]["id"], teams[2]["id"]]
+    assert [row["total_score"] for row in board] == [16.0, 10.0, 6.0]
+    assert [row["rank"] for row in board] == [1, 2, 3]
+
+    page = client.get("/admin/leaderboard", headers=admin_h, params={**params, "limit": 1, "offset": 1}).json()
+    assert [row["team_id"] for row in page] == [teams[0]["id"]]
+
+    mine = client.get("/admin/leaderboard", headers=admin_h, params={**params, "team_id": teams[2]["id"]}).json()
+    assert mine == [{"team_id": teams[2]["id"], "team_name": "Board Team 2", "total_score": 6.0, "rank": 3}]
+
+
+def test_materialized_leaderboard_matches_full_recompute():
+    admin, admin_h = _signup_and_login("MV Admin", "mv-admin@example.com", "9200000000", role="ADMIN")
+    judge, judge_h = _signup_and_login("MV Judge", "mv-judge@example.com", "9200000001", role="JUDGE")
+    captain, _ = _signup_and_login("MV Cap", "mv-cap@example.com", "9200000002")
+    client.patch(f"/admin/verification/{captain['id']}", headers=admin_h, json={"status": "APPROVED"})
+
+    hack, ps = _create_hackathon(admin_h, "Materialized Hack")
+    criteria = [
+        client.post(
+            "/admin/evaluation-criteria",
+            headers=admin_h,
+            json={"hackathon_id": hack["id"], "round": "ROUND1", "name": name, "weight": weight},
+        ).json()
+        for name, weight in [("Innovation", 0.4), ("Feasibility", 0.6)]
+    ]
+    captains = [captain] + [_approved_captain(admin_h, f"MV Cap {i}", f"920000010{i}") for i in range(1, 4)]
+    teams = [_create_team(admin_h, hack, ps, cap, f"MV Team {i}") for i, cap in enumerate(captains)]
+    for i, team in enumerate(teams):
+        for j, criterion in enumerate(criteria):
+            client.post(
+                "/judge/scores",
+                headers=judge_h,
+                json={
+                    "team_id": team["id"],
+                    "round": "ROUND1",
+                    "judge_id": judge["id"],
+                    "criterion_id": criterion["id"],
+                    "score": (i * 3 + j * 7) % 10 + 0.5,
+                },
+            )
+
+    def assert_matches_recompute():
+        with SessionLocal() as db:
+            expected = dict(db.execute(weighted_totals(hack["id"], SubmissionRound.ROUND1)).all())
+            actual = dict(
+                db.query(LeaderboardEntry.team_id, LeaderboardEntry.total_score)
+                .filter(LeaderboardEntry.hackathon_id == hack["id"], LeaderboardEntry.round == SubmissionRound.ROUND1)
+                .all()
+            )
+        assert actual.keys() == expected.keys()
+        for team_id, total in expected.items():
+            assert abs(actual[team_id] - total) < 1e-9
+
+    params = {"hackathon_id": hack["id"], "round_name": "ROUND1"}
+    assert_matches_recompute()
+    assert client.get("/admin/leaderboard/consistency", headers=admin_h, params=params).json()["consistent"]
+
+    updated = client.patch(f"/admin/evaluation-criteria/{criteria[0]['id']}", headers=admin_h, json={"weight": 2.5})
+    assert updated.status_code == 200
+    assert_matches_recompute()
+    for body in ({"weight": None}, {"name": None}):
+        rejected = client.patch(f"/admin/evaluation-criteria/{criteria[0]['id']}", headers=admin_h, json=body)
+        assert rejected.status_code == 422
+    with SessionLocal() as db:
+        assert db.get(EvaluationCriterion, criteria[0]["id"]).weight == 2.5
+
+    with SessionLocal() as db:
+        db.query(LeaderboardEntry).filter(LeaderboardEntry.team_id == teams[0]["id"]).update({"total_score": -1.0})
+        db.commit()
+    report = client.get("/admin/leaderboard/consistency", headers=admin_h, params=params).json()
+    assert not report["consistent"]
+    assert [row["team_id"] for row in report["drift"]] == [teams[0]["id"]]
+
+    rebuilt = client.post("/admin/leaderboard/rebuild", headers=admin_h, params=params).json()
+    assert rebuilt == {"rebuilt_rows": 4, "drift_repaired": 1}
+    assert_matches_recompute()
+
+
+def test_final_ranking_breaks_total_ties_on_technical_depth():
+    admin, admin_h = _signup_and_login("RK Admin", "rk-admin@example.com", "9300000000", role="ADMIN")
+    judge, judge_h = _signup_and_login("RK Judge", "rk-judge@example.com", "9300000001", role="JUDGE")
+    captain, _ = _signup_and_login("RK Cap", "rk-cap@example.com", "9300000002")
+    client.patch(f"/admin/verification/{captain['id']}", headers=admin_h, json={"status": "APPROVED"})
+
+    hack, ps = _create_hackathon(admin_h, "Ranking Hack")
+    tech, feas = [
+        client.post(
+            "/admin/evaluation-criteria",
+            headers=admin_h,
+            json={"hackathon_id": hack["id"], "round": "ROUND1", "name": name, "weight": 1.0},
+        ).json()
+        for name in ("Technical depth", "Feasibility")
+    ]
+    captains = [captain] + [_approved_captain(admin_h, f"RK Cap {i}", f"930000010{i}") for i in range(1, 2)]
+    first, second = [_create_team(admin_h, hack, ps, cap, f"RK Team {i}") for i, cap in enumerate(captains)]
+    for team, tech_score, feas_score in [(first, 4, 8), (second, 7, 5)]:
+        for criterion, value in [(tech, tech_score), (feas, feas_score)]:
+            client.post(
+                "/judge/scores",
+                headers=judge_h,
+                json={
+                    "team_id": team["id"],
+                    "round": "ROUND1",
+                    "judge_id": judge["id"],
+                    "criterion_id": criterion["id"],
+                    "score": value,
+                },
+            )
+
+    ranked = client.get(
+        "/admin/leaderboard/ranking", headers=judge_h, params={"hackathon_id": hack["id"], "round_name": "ROUND1"}
     )
-    assert leaderboard.status_code == 200
-    assert leaderboard.json()[0]["team_id"] == team_id
+    assert ranked.status_code == 200
+    assert [row["team_id"] for row in ranked.json()] == [second["id"], first["id"]]
+    assert ranked.json()[0]["criterion_scores"] == {"Technical depth": 7.0, "Feasibility": 5.0}
+
+
+def test_bad_scans_are_rejected_before_any_qr_lookup():
+    admin, admin_h = _signup_and_login("QR Admin", "qr-admin@example.com", "9400000000", role="ADMIN")
+    scanner, scanner_h = _signup_and_login("QR Scan", "qr-scan@example.com", "9400000001", role="SCANNER")
+    student, _ = _signup_and_login("QR Stu", "qr-stu@example.com", "9400000002")
+    client.patch(f"/admin/verification/{student['id']}", headers=admin_h, json={"status": "APPROVED"})
+    hack, _ = _create_hackathon(admin_h, "QR Hack")
 
+    now = datetime.utcnow()
     qr = client.post(
         "/qr/generate",
+        headers=admin_h,
         json={
             "user_id": student["id"],
-            "hackathon_id": hackathon["id"],
-            "purpose": "LUNCH",
+            "hackathon_id": hack["id"],
+            "purpose": "DINNER",
             "valid_from": (now - timedelta(minutes=5)).isoformat(),
             "valid_to": (now + timedelta(minutes=30)).isoformat(),
         },
     ).json()
+    payload, signature = qr["token"].split(".")
+    forged = f"{payload}.{'A' if signature[0] != 'A' else 'B'}{signature[1:]}"
+
+    with recorded_statements() as statements:
+        bad_signature = client.post("/scan", headers=scanner_h, json={"token": forged, "scanner_id": scanner["id"]})
+        wrong_hackathon = client.post(
+            "/scan",
+            headers=scanner_h,
+            json={"token": qr["token"], "scanner_id": scanner["id"], "hackathon_id": hack["id"] + 1},
+        )
+        wrong_purpose = client.post(
+            "/scan",
+            headers=scanner_h,
+            json={"token": qr["token"], "scanner_id": scanner["id"], "purpose": "LUNCH"},
+        )
+
+    assert bad_signature.status_code == 400
+    assert wrong_hackathon.json()["success"] is False
+    assert wrong_purpose.json()["success"] is False
+    assert not [statement for statement in statements if "qr_tokens" in statement or "scan_logs" in statement]
 
     scan = client.post(
         "/scan",
-        headers=admin_h,
-        json={"token": qr["token"], "scanner_id": scanner["id"]},
+        headers=scanner_h,
+        json={"token": qr["token"], "scanner_id": scanner["id"], "hackathon_id": hack["id"], "purpose": "DINNER"},
     )
-    assert scan.status_code == 200
-    scan = client.post("/scan", json={"token": qr["token"], "scanner_id": scanner["id"]})
-    assert scan.status_code == 200
     assert scan.json()["success"] is True
 
-    duplicate_scan = client.post("/scan", json={"token": qr["token"], "scanner_id": scanner["id"]})
-    assert duplicate_scan.status_code == 200
-    assert duplicate_scan.json()["success"] is False
 
-    analytics = client.get("/admin/scan-analytics", params={"hackathon_id": hackathon["id"]})
-    assert analytics.status_code == 200
-    assert analytics.json()["successful_scans"] == 1
+def test_scan_analytics_reads_counters_and_rebuilds_them_from_the_log():
+    admin, admin_h = _signup_and_login("Stats Admin", "stats-admin@example.com", "9840000000", role="ADMIN")
+    gate_a, _ = _signup_and_login("Gate A", "gate-a@example.com", "9840000001", role="SCANNER")
+    gate_b, _ = _signup_and_login("Gate B", "gate-b@example.com", "9840000002", role="SCANNER")
+    student, _ = _signup_and_login("Stats Stu", "stats-stu@example.com", "9840000003")
+    hack, _ = _create_hackathon(admin_h, "Stats Hack")
+    other, _ = _create_hackathon(admin_h, "Other Stats Hack")
+
+    start = datetime(2026, 3, 1, 9, 0)
+    with SessionLocal() as db:
+        tokens = {}
+        for key, hackathon_id, purpose in [
+            ("entry", hack["id"], QRPurpose.ENTRY),
+            ("lunch", hack["id"], QRPurpose.LUNCH),
+            ("elsewhere", other["id"], QRPurpose.ENTRY),
+        ]:
+            tokens[key] = QRToken(
+                token=f"stats-{key}",
+                user_id=student["id"],
+                hackathon_id=hackathon_id,
+                purpose=purpose,
+                valid_from=start,
+                valid_to=start + timedelta(days=1),
+            )
+        db.add_all(tokens.values())
+        db.flush()
+        db.add_all(
+            [
+                ScanLog(
+                    qr_token_id=tokens["entry"].id, scanner_id=gate_a["id"], scanned_at=start, success=True, message="Valid"
+                ),
+                ScanLog(
+                    qr_token_id=tokens["entry"].id,
+                    scanner_id=gate_a["id"],
+                    scanned_at=start + timedelta(seconds=20),
+                    success=False,
+                    message="Token already used",
+                ),
+                ScanLog(
+                    qr_token_id=tokens["entry"].id,
+                    scanner_id=gate_b["id"],
+                    scanned_at=start + timedelta(minutes=1),
+                    success=False,
+                    message="Token already used",
+                ),
+                ScanLog(
+                    qr_token_id=tokens["lunch"].id,
+                    scanner_id=gate_b["id"],
+                    scanned_at=start + timedelta(hours=3),
+                    success=True,
+                    message="Valid",
+                ),
+                ScanLog(
+                    qr_token_id=tokens["lunch"].id,
+                    scanner_id=gate_b["id"],
+                    scanned_at=start + timedelta(hours=3, minutes=5),
+                    success=False,
+                    message="Token expired",
+                ),
+                ScanLog(
+                    qr_token_id=tokens["elsewhere"].id,
+                    scanner_id=gate_a["id"],
+                    scanned_at=start,
+                    success=True,
+                    message="Valid",
+                ),
+            ]
+        )
+        db.commit()
+
+    params = {"hackathon_id": hack["id"]}
+    assert client.get("/admin/scan-analytics", headers=admin_h, params=params).json()["total_scans"] == 0
+    rebuilt = client.post("/admin/scan-analytics/rebuild", headers=admin_h, params=params)
+    assert rebuilt.json() == {"rebuilt_rows": 5}
+
+    with recorded_statements() as statements:
+        hourly = client.get("/admin/scan-analytics", headers=admin_h, params=params)
+    assert hourly.status_code == 200
+    assert not [statement for statement in statements if "scan_logs" in statement]
+    body = hourly.json()
+    assert (body["total_scans"], body["successful_scans"], body["failed_scans"]) == (5, 2, 3)
+    assert body["by_purpose"] == {
+        "ENTRY": {"total": 3, "success": 1, "failure": 2},
+        "LUNCH": {"total": 2, "success": 1, "failure": 1},
+    }
+    assert body["timeline"] == [
+        {"bucket": "2026-03-01T09:00", "total": 3, "success": 1, "failure": 2},
+        {"bucket": "2026-03-01T12:00", "total": 2, "success": 1, "failure": 1},
+    ]
+
+    with recorded_statements() as statements:
+        detailed = client.get("/admin/scan-analytics", headers=admin_h, params={**params, "detail": True})
+    assert len([statement for statement in statements if "scan_logs" in statement]) == 1
+    detail = detailed.json()
+    assert {key: detail[key] for key in body} == body
+    assert detail["by_scanner"] == [
+        {"scanner_id": gate_a["id"], "total": 2, "success": 1, "failure": 1},
+        {"scanner_id": gate_b["id"], "total": 3, "success": 1, "failure": 2},
+    ]
+    assert detail["failure_reasons"] == {"Token already used": 2, "Token expired": 1}
+
+    for source in ({}, {"detail": True}):
+        by_minute = client.get(
+            "/admin/scan-analytics",
+            headers=admin_h,
+            params={**params, **source, "bucket": "minute", "until": (start + timedelta(hours=1)).isoformat()},
+        ).json()
+        assert [point["bucket"] for point in by_minute["timeline"]] == ["2026-03-01T09:00", "2026-03-01T09:01"]
+        assert by_minute["total_scans"] == 3
+
+
+def test_bulk_qr_issuance_is_idempotent_and_streams_a_manifest():
+    admin, admin_h = _signup_and_login("BQ Admin", "bq-admin@example.com", "9500000000", role="ADMIN")
+    members = [_signup_and_login(f"BQ {i}", f"bq-{i}@example.com", f"950000000{i + 1}")[0] for i in range(3)]
+    for member in members:
+        client.patch(f"/admin/verification/{member['id']}", headers=admin_h, json={"status": "APPROVED"})
+    hack, ps = _create_hackathon(admin_h, "Bulk QR Hack")
+    team = client.post(
+        "/teams",
+        headers=admin_h,
+        json={
+            "hackathon_id": hack["id"],
+            "name": "BQ Team",
+            "captain_id": members[0]["id"],
+            "member_ids": [members[1]["id"]],
+            "problem_statement_id": ps["id"],
+        },
+    )
+    assert team.status_code == 200
+
+    now = datetime.utcnow()
+    body = {
+        "hackathon_id": hack["id"],
+        "windows": [
+            {
+                "purpose": purpose,
+                "valid_from": (now - timedelta(minutes=5)).isoformat(),
+                "valid_to": (now + timedelta(hours=2)).isoformat(),
+            }
+            for purpose in ("ENTRY", "LUNCH")
+        ],
+    }
+    first = client.post("/qr/generate/bulk", headers=admin_h, json=body)
+    assert first.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in first.text.splitlines()]
+    assert {(row["user_id"], row["purpose"]) for row in rows} == {
+        (members[i]["id"], purpose) for i in (0, 1) for purpose in ("ENTRY", "LUNCH")
+    }
+    assert all(row["issued"] for row in rows)
+
+    rerun = client.post("/qr/generate/bulk", headers=admin_h, params={"format": "csv"}, json=body)
+    assert rerun.headers["content-type"].startswith("text/csv")
+    csv_rows = list(csv.DictReader(io.StringIO(rerun.text)))
+    assert len(csv_rows) == 4
+    assert {row["token"] for row in csv_rows} == {row["token"] for row in rows}
+    assert {row["issued"] for row in csv_rows} == {"False"}
+
+    # The same instants spelled with a +05:30 offset are the same windows, stored as naive UTC.
+    ist = timezone(timedelta(hours=5, minutes=30))
+    for window in body["windows"]:
+        for field in ("valid_from", "valid_to"):
+            window[field] = datetime.fromisoformat(window[field]).replace(tzinfo=timezone.utc).astimezone(ist).isoformat()
+    shifted = client.post("/qr/generate/bulk", headers=admin_h, json=body)
+    shifted_rows = [json.loads(line) for line in shifted.text.splitlines()]
+    assert {row["token"] for row in shifted_rows} == {row["token"] for row in rows}
+    assert not any(row["issued"] for row in shifted_rows)
+    with SessionLocal() as db:
+        stored = db.query(QRToken).filter(QRToken.token.in_([row["token"] for row in rows])).all()
+    assert {token.valid_from for token in stored} == {now - timedelta(minutes=5)}
+
+
+def test_session_cache_skips_auth_queries_and_is_invalidated():
+    admin, admin_h = _signup_and_login("AC Admin", "ac-admin@example.com", "9600000000", role="ADMIN")
+    student, student_h = _signup_and_login("AC Stu", "ac-stu@example.com", "9600000001")
+
+    assert client.get("/auth/me", headers=student_h).json()["verification_status"] == "PENDING"
+    hits = session_cache.hits
+    with recorded_statements() as statements:
+        me = client.get("/auth/me", headers=student_h)
+    assert me.status_code == 200
+    assert session_cache.hits == hits + 1
+    assert not [statement for statement in statements if "auth_sessions" in statement]
+
+    client.patch(f"/admin/verification/{student['id']}", headers=admin_h, json={"status": "APPROVED"})
+    assert session_cache.get(student_h["Authorization"].split(" ", 1)[1]) is None
+    assert client.get("/auth/me", headers=student_h).json()["verification_status"] == "APPROVED"
+
+    assert client.post("/auth/logout", headers=student_h).json() == {"revoked": True}
+    assert client.get("/auth/me", headers=student_h).status_code == 401
+    assert client.get("/health").json()["auth_cache"]["hits"] >= 1
+
+
+def test_metadata_cache_serves_repeat_lookups_and_admin_writes_invalidate_it():
+    admin, admin_h = _signup_and_login("MC Admin", "mc-admin@example.com", "9650000000", role="ADMIN")
+    judge, judge_h = _signup_and_login("MC Judge", "mc-judge@example.com", "9650000001", role="JUDGE")
+    captain, _ = _signup_and_login("MC Cap", "mc-cap@example.com", "9650000002")
+    client.patch(f"/admin/verification/{captain['id']}", headers=admin_h, json={"status": "APPROVED"})
+    hack, ps = _create_hackathon(admin_h, "Cache Hack")
+    team = _create_team(admin_h, hack, ps, captain, "Cache Team")
+
+    criterion = client.post(
+        "/admin/evaluation-criteria",
+        headers=admin_h,
+        json={"hackathon_id": hack["id"], "round": "ROUND1", "name": "Design", "weight": 1.0},
+    ).json()
+
+    def score(value):
+        body = {
+            "team_id": team["id"],
+            "round": "ROUND1",
+            "judge_id": judge["id"],
+            "criterion_id": criterion["id"],
+            "score": value,
+        }
+        assert client.post("/judge/scores", headers=judge_h, json=body).status_code == 200
+
+    score(4)
+    with recorded_statements() as statements:
+        score(5)
+    assert not [statement for statement in statements if "FROM evaluation_criteria" in statement]
+
+    client.patch(f"/admin/evaluation-criteria/{criterion['id']}", headers=admin_h, json={"weight": 3.0})
+    score(6)
+    params = {"hackathon_id": hack["id"], "round_name": "ROUND1"}
+    assert client.get("/admin/leaderboard", headers=admin_h, params=params).json()[0]["total_score"] == 18.0
+    assert client.get("/admin/leaderboard/consistency", headers=admin_h, params=params).json()["consistent"] is True
+
+    # An edit this process has not seen yet (another worker's, within the TTL): scoring uses the stored weight.
+    with SessionLocal() as db:
+        db.query(EvaluationCriterion).filter(EvaluationCriterion.id == criterion["id"]).update({"weight": 2.0})
+        db.commit()
+        assert metadata_cache.criteria(db, [criterion["id"]])[criterion["id"]].weight == 3.0
+    score(7)
+    assert client.get("/admin/leaderboard", headers=admin_h, params=params).json()[0]["total_score"] == 14.0
+    assert client.get("/admin/leaderboard/consistency", headers=admin_h, params=params).json()["consistent"] is True
+
+    stats = client.get("/health").json()["metadata_cache"]
+    assert stats["by_kind"]["criterion"]["hits"] >= 1
+    assert stats["by_kind"]["hackathon"]["misses"] >= 1
+    assert 0 < stats["hit_rate"] < 1
+
+
+def test_team_import_validates_in_bulk_and_is_all_or_nothing():
+    admin, admin_h = _signup_and_login("TI Admin", "ti-admin@example.com", "9700000000", role="ADMIN")
+    students = [_signup_and_login(f"TI {i}", f"ti-{i}@example.com", f"970000001{i}")[0] for i in range(7)]
+    for student in students[:6]:
+        client.patch(f"/admin/verification/{student['id']}", headers=admin_h, json={"status": "APPROVED"})
+    hack, ps = _create_hackathon(admin_h, "Import Hack")
+
+    def team(name, captain, *members):
+        return {
+            "hackathon_id": hack["id"],
+            "name": name,
+            "captain_id": students[captain]["id"],
+            "member_ids": [students[m]["id"] for m in members],
+            "problem_statement_id": ps["id"],
+        }
+
+    rejected = client.post(
+        "/admin/teams/import",
+        headers=admin_h,
+        json={"teams": [team("Good", 0, 1), team("Unverified", 2, 6), team("Overlap", 3, 1)]},
+    )
+    assert rejected.status_code == 400
+    assert [(p["row"], p["error"]) for p in rejected.json()["detail"]] == [
+        (1, f"Member {students[6]['id']} not verified"),
+        (2, f"Member {students[1]['id']} is also in row 0"),
+    ]
+    with SessionLocal() as db:
+        assert db.query(Team).filter(Team.hackathon_id == hack["id"]).count() == 0
+
+    with recorded_statements() as statements:
+        imported = client.post(
+            "/admin/teams/import", headers=admin_h, json={"teams": [team("Good", 0, 1), team("Pair", 2, 3)]}
+        )
+    assert imported.status_code == 200
+    assert imported.json()["created"] == 2
+    with SessionLocal() as db:
+        members = db.query(TeamMember).filter(TeamMember.team_id.in_(imported.json()["team_ids"])).count()
+    assert members == 4
+    assert sum(s.lstrip().upper().startswith("INSERT INTO TEAM_MEMBERS") for s in statements) == 1
+
+    upload = "hackathon_id,name,captain_id,member_ids,problem_statement_id\n" + (
+        f"{hack['id']},Solo,{students[4]['id']},{students[5]['id']},{ps['id']}\n"
+    )
+    from_csv = client.post(
+        "/admin/teams/import/csv", headers=admin_h, files={"file": ("teams.csv", upload, "text/csv")}
+    )
+    assert from_csv.status_code == 200
+    assert from_csv.json()["created"] == 1
+
+    clashes = client.post(
+        "/admin/teams/import",
+        headers=admin_h,
+        json={"teams": [team("Good", 6), team("Fresh", 6), team("Fresh", 6), team("Again", 0)]},
+    )
+    assert clashes.status_code == 400
+    assert [(p["row"], p["error"]) for p in clashes.json()["detail"]] == [
+        (0, "Team name Good already taken"),
+        (1, "Captain must be verified"),
+        (2, "Team name Fresh already taken by row 1"),
+        (3, f"Member {students[0]['id']} is already on a team in this hackathon"),
+    ]
+    second = client.post("/teams", headers=admin_h, json=team("Second", 0))
+    assert second.status_code == 400
+    assert second.json()["detail"] == f"Member {students[0]['id']} is already on a team in this hackathon"
+
+    bad_csv = client.post(
+        "/admin/teams/import/csv",
+        headers=admin_h,
+        files={"file": ("teams.csv", "hackathon_id,name\n1,x\n", "text/csv")},
+    )
+    assert bad_csv.status_code == 422
+
+
+def test_student_roster_import_dedupes_in_chunks_and_reports_rows():
+    admin, admin_h = _signup_and_login("RI Admin", "ri-admin@example.com", "9800000000", role="ADMIN")
+    upload = "\n".join(
+        [
+            "name,email,phone",
+            "Asha,ri-1@example.com,9800000001",
+            "Dup Email,ri-admin@example.com,9800000002",
+            "Bram,ri-2@example.com,9800000003",
+            "Again,ri-1@example.com,9800000004",
+            "No Phone,ri-3@example.com,",
+        ]
+    )
+    imported = client.post(
+        "/admin/users/import", headers=admin_h, files={"file": ("roster.csv", upload, "text/csv")}
+    ).json()
+    assert (imported["rows"], imported["created"], imported["duplicates"], imported["failed"]) == (5, 2, 2, 1)
+    assert [error["line"] for error in imported["errors"]] == [6, 3, 5]
+
+    ndjson = "\n".join(
+        [
+            json.dumps({"name": "Cyd", "email": "ri-4@example.com", "phone": "9800000005"}),
+            "not json",
+            json.dumps({"name": "Dee", "email": "ri-5@example.com", "phone": "9800000006"}),
+            json.dumps({"name": "Cyd 2", "email": "ri-6@example.com", "phone": "9800000005"}),
+        ]
+    )
+    with recorded_statements() as statements, SessionLocal() as db:
+        report = roster.import_students(db, roster.read_ndjson(io.BytesIO(ndjson.encode())), chunk_size=2)
+    assert (report["created"], report["duplicates"], report["failed"]) == (2, 1, 1)
+    assert report["errors"] == [
+        {"line": 2, "error": "Invalid JSON"},
+        {"line": 4, "error": "Phone 9800000005 already registered"},
+    ]
+    assert sum(s.lstrip().upper().startswith("INSERT INTO USERS") for s in statements) == 2
+
+    missing = client.post(
+        "/admin/users/import",
+        headers=admin_h,
+        params={"format": "csv"},
+        files={"file": ("roster.csv", "name,email\n", "text/csv")},
+    )
+    assert missing.status_code == 422
+
+
+def test_verification_queue_pages_by_keyset_and_bulk_updates_in_one_statement():
+    admin, admin_h = _signup_and_login("VQ Admin", "vq-admin@example.com", "9810000000", role="ADMIN")
+    students = [_signup_and_login(f"VQ {i}", f"vq-{i}@example.com", f"981000001{i}")[0] for i in range(5)]
+    ours = {student["id"] for student in students}
+
+    seen, cursor, pages = [], None, 0
+    with recorded_statements() as statements:
+        while True:
+            pages += 1
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            page = client.get("/admin/verification/queue", headers=admin_h, params=params).json()
+            seen.extend(item["id"] for item in page["items"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+    assert len(seen) == len(set(seen))
+    assert [user_id for user_id in seen if user_id in ours] == [student["id"] for student in students]
+    assert sum("(users.created_at, users.id) >" in statement for statement in statements) == pages - 1
+
+    with recorded_statements() as statements:
+        result = client.post(
+            "/admin/verification/bulk",
+            headers=admin_h,
+            json={"user_ids": [students[0]["id"], students[2]["id"], 10**9], "status": "APPROVED"},
+        ).json()
+    assert result == {"updated": sorted([students[0]["id"], students[2]["id"]]), "not_found": [10**9]}
+    assert sum(statement.lstrip().upper().startswith("UPDATE USERS") for statement in statements) == 1
+
+    pending = client.get("/admin/verification/queue", headers=admin_h, params={"limit": 500}).json()["items"]
+    approved = client.get(
+        "/admin/verification/queue", headers=admin_h, params={"status": "APPROVED", "limit": 500}
+    ).json()["items"]
+    assert ours & {item["id"] for item in pending} == {students[i]["id"] for i in (1, 3, 4)}
+    assert {students[0]["id"], students[2]["id"]} <= {item["id"] for item in approved}
+
+    bad = client.get("/admin/verification/queue", headers=admin_h, params={"cursor": "nope"})
+    assert bad.status_code == 400
+
+
+def test_score_sheet_upserts_matrix_in_one_statement_and_keeps_board_consistent():
+    admin, admin_h = _signup_and_login("SS Admin", "ss-admin@example.com", "9820000000", role="ADMIN")
+    judge, judge_h = _signup_and_login("SS Judge", "ss-judge@example.com", "9820000001", role="JUDGE")
+    captain, _ = _signup_and_login("SS Cap", "ss-cap@example.com", "9820000002")
+    client.patch(f"/admin/verification/{captain['id']}", headers=admin_h, json={"status": "APPROVED"})
+    hack, ps = _create_hackathon(admin_h, "Sheet Hack")
+    criteria = [
+        client.post(
+            "/admin/evaluation-criteria",
+            headers=admin_h,
+            json={"hackathon_id": hack["id"], "round": "ROUND1", "name": name, "weight": weight},
+        ).json()
+        for name, weight in [("Design", 1.5), ("Impact", 0.5)]
+    ]
+    captains = [captain] + [_approved_captain(admin_h, f"SS Cap {i}", f"982000010{i}") for i in range(1, 3)]
+    teams = [_create_team(admin_h, hack, ps, cap, f"SS Team {i}") for i, cap in enumerate(captains)]
+
+    def sheet(offset):
+        return {
+            "judge_id": judge["id"],
+            "round": "ROUND1",
+            "scores": [
+                {"team_id": team["id"], "criterion_id": criterion["id"], "score": i + j + offset}
+                for i, team in enumerate(teams)
+                for j, criterion in enumerate(criteria)
+            ],
+        }
+
+    with recorded_statements() as statements:
+        first = client.post("/judge/score-sheets", headers=judge_h, json=sheet(1))
+    assert first.json() == {"hackathon_id": hack["id"], "round": "ROUND1", "written": 6, "teams": 3}
+    assert sum(s.lstrip().upper().startswith("INSERT INTO SCORES") for s in statements) == 1
+
+    assert client.post("/judge/score-sheets", headers=judge_h, json=sheet(4)).status_code == 200
+    bad = sheet(0)
+    bad["scores"][0]["criterion_id"] = 10**9
+    assert client.post("/judge/score-sheets", headers=judge_h, json=bad).status_code == 400
+
+    with SessionLocal() as db:
+        scores = db.query(Score.score).filter(Score.team_id.in_([team["id"] for team in teams])).all()
+        expected = dict(db.execute(weighted_totals(hack["id"], SubmissionRound.ROUND1)).all())
+    assert sorted(score for score, in scores) == [4, 5, 5, 6, 6, 7]
+    board = client.get(
+        "/admin/leaderboard", headers=admin_h, params={"hackathon_id": hack["id"], "round_name": "ROUND1"}
+    ).json()
+    assert {row["team_id"]: row["total_score"] for row in board} == {
+        team_id: round(total, 2) for team_id, total in expected.items()
+    }
+    assert expected[teams[2]["id"]] == 6 * 1.5 + 7 * 0.5
+
+
+def test_hot_paths_run_async_with_the_sync_routes_kept_as_fallback():
+    admin, admin_h = _signup_and_login("AS Admin", "as-admin@example.com", "9830000000", role="ADMIN")
+    hack, ps = _create_hackathon(admin_h, "Async Hack")
+    captain, _ = _signup_and_login("AS Cap", "as-cap@example.com", "9830000001")
+    client.patch(f"/admin/verification/{captain['id']}", headers=admin_h, json={"status": "APPROVED"})
+    team = _create_team(admin_h, hack, ps, captain, "Async Team")
+
+    hot = {("POST", "/auth/login"), ("POST", "/scan"), ("POST", "/judge/scores"), ("GET", "/admin/leaderboard")}
+    paths = app.openapi()["paths"]
+    mounted = {(method, path): paths[path][method.lower()]["operationId"] for method, path in hot}
+    assert all(("_async_" in op_id) == (async_engine is not None) for op_id in mounted.values())
+    assert {(m, r.path) for r in async_routes.routes for m in r.methods} == hot
+    assert {(m, r.path) for r in sync_routes.routes for m in r.methods} == hot
+
+    fallback = FastAPI()
+    fallback.include_router(sync_routes)
+    sync_client = TestClient(fallback)
+    login = sync_client.post("/auth/login", json={"email": "as-admin@example.com", "password": "secret123"})
+    assert login.status_code == 200
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    params = {"hackathon_id": hack["id"], "round_name": "ROUND1"}
+    board = sync_client.get("/admin/leaderboard", headers=headers, params=params).json()
+    assert board == client.get("/admin/leaderboard", headers=admin_h, params=params).json()
+    assert [row["team_id"] for row in board] == [team["id"]]
+
+
+def test_exports_stream_results_scores_attendance_and_roster(monkeypatch):
+    admin, admin_h = _signup_and_login("Ex Admin", "ex-admin@example.com", "9850000000", role="ADMIN")
+    judge, judge_h = _signup_and_login("Ex Judge", "ex-judge@example.com", "9850000001", role="JUDGE")
+    scanner, scanner_h = _signup_and_login("Ex Gate", "ex-gate@example.com", "9850000002", role="SCANNER")
+    captain, _ = _signup_and_login("Ex Cap", "ex-cap@example.com", "9850000003")
+    client.patch(f"/admin/verification/{captain['id']}", headers=admin_h, json={"status": "APPROVED"})
+    hack, ps = _create_hackathon(admin_h, "Export Hack")
+    criteria = [
+        client.post(
+            "/admin/evaluation-criteria",
+            headers=admin_h,
+            json={"hackathon_id": hack["id"], "round": "ROUND1", "name": name, "weight": weight},
+        ).json()
+        for name, weight in [("Design", 2.0), ("Impact", 1.0)]
+    ]
+    captains = [captain] + [_approved_captain(admin_h, f"Ex Cap {i}", f"985000010{i}") for i in range(1, 2)]
+    teams = [_create_team(admin_h, hack, ps, cap, f"Ex Team {i}") for i, cap in enumerate(captains)]
+    client.post(
+        "/judge/score-sheets",
+        headers=judge_h,
+        json={
+            "judge_id": judge["id"],
+            "round": "ROUND1",
+            "scores": [
+                {"team_id": team["id"], "criterion_id": criterion["id"], "score": 5 + i + j}
+                for i, team in enumerate(teams)
+                for j, criterion in enumerate(criteria)
+            ],
+        },
+    )
+    now = datetime.utcnow()
+    qr = client.post(
+        "/qr/generate",
+        headers=admin_h,
+        json={
+            "user_id": captain["id"],
+            "hackathon_id": hack["id"],
+            "purpose": "LUNCH",
+            "valid_from": (now - timedelta(minutes=5)).isoformat(),
+            "valid_to": (now + timedelta(minutes=30)).isoformat(),
+        },
+    ).json()
+    for _ in range(2):
+        client.post("/scan", headers=scanner_h, json={"token": qr["token"], "scanner_id": scanner["id"]})
+    board_params = {"hackathon_id": hack["id"], "round_name": "ROUND1"}
+
+    board = client.get("/admin/exports/leaderboard", headers=admin_h, params=board_params)
+    assert board.headers["content-type"].startswith("text/csv")
+    assert "leaderboard-" in board.headers["content-disposition"]
+    assert [(row["rank"], row["team_name"]) for row in csv.DictReader(io.StringIO(board.text))] == [
+        ("1", "Ex Team 1"),
+        ("2", "Ex Team 0"),
+    ]
+
+    matrix = client.get("/admin/exports/scores", headers=admin_h, params={**board_params, "format": "ndjson"})
+    assert [json.loads(line) for line in matrix.text.splitlines()] == [
+        {
+            "judge_id": judge["id"],
+            "judge_name": "Ex Judge",
+            "team_id": team["id"],
+            "team_name": team["name"],
+            "Design": 5 + i,
+            "Impact": 6 + i,
+            "weighted_total": 2.0 * (5 + i) + 6 + i,
+        }
+        for i, team in enumerate(teams)
+    ]
+
+    attendance = client.get(
+        "/admin/exports/attendance", headers=admin_h, params={"hackathon_id": hack["id"], "gzip": True}
+    )
+    assert attendance.headers["content-type"] == "application/gzip"
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(attendance.content).decode())))
+    assert [(row["purpose"], row["success"], row["user_name"]) for row in rows] == [
+        ("LUNCH", "True", "Ex Cap"),
+        ("LUNCH", "False", "Ex Cap"),
+    ]
+
+    roster_rows = client.get(
+        "/admin/exports/roster", headers=admin_h, params={"status": "APPROVED", "format": "ndjson"}
+    ).text.splitlines()
+    approved = [json.loads(line) for line in roster_rows]
+    assert captain["id"] in {row["id"] for row in approved}
+    assert {row["verification_status"] for row in approved} == {"APPROVED"}
+    assert "password_hash" not in approved[0]
+
+    assert client.get("/admin/exports/attendance", headers=admin_h, params={"hackathon_id": 10**9}).status_code == 404
+
+    monkeypatch.setattr(exports, "CHUNK_SIZE", 1)
+    chunks = list(exports.stream(exports.attendance, "ndjson", session_factory=SessionLocal, hackathon_id=hack["id"]))
+    assert len(chunks) == 2 and all(chunk.count("\n") == 1 for chunk in chunks)
+
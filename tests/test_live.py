@@ -0,0 +1,67 @@
+import asyncio
+
+from app.live import LeaderboardBroadcaster
+from app.models import SubmissionRound
+
+
+def test_broadcaster_coalesces_bursts_and_fans_out():
+    totals = {1: 0.0, 2: 5.0}
+    loads = []
+
+    def loader(hackathon_id, round_name):
+        loads.append((hackathon_id, round_name))
+        ranked = sorted(totals.items(), key=lambda item: -item[1])
+        return [
+            {"team_id": team_id, "team_name": f"T{team_id}", "total_score": total, "rank": i + 1}
+            for i, (team_id, total) in enumerate(ranked)
+        ]
+
+    broadcaster = LeaderboardBroadcaster(loader, max_rate=5)
+
+    async def scenario():
+        streams = [broadcaster.subscribe(1, SubmissionRound.ROUND1) for _ in range(3)]
+        snapshots = [await stream.__anext__() for stream in streams]
+        assert broadcaster.subscriber_count(1, SubmissionRound.ROUND1) == 3
+
+        totals[1] = 10.0
+        await asyncio.to_thread(lambda: [broadcaster.notify(1, SubmissionRound.ROUND1) for _ in range(50)])
+        deltas = [await asyncio.wait_for(stream.__anext__(), timeout=1) for stream in streams]
+
+        for stream in streams:
+            await stream.aclose()
+        return snapshots, deltas
+
+    snapshots, deltas = asyncio.run(scenario())
+
+    assert all(event["type"] == "snapshot" and len(event["rows"]) == 2 for event in snapshots)
+    for event in deltas:
+        assert event["type"] == "delta"
+        assert {row["team_id"]: (row["rank"], row["previous_rank"]) for row in event["rows"]} == {1: (1, 2), 2: (2, 1)}
+    assert len(loads) <= 3
+    assert broadcaster.subscriber_count(1, SubmissionRound.ROUND1) == 0
+
+
+def test_a_failed_load_is_retried_without_stopping_the_stream():
+    failures = [RuntimeError("database went away")]
+
+    def loader(hackathon_id, round_name):
+        if failures and loads:
+            raise failures.pop()
+        loads.append(hackathon_id)
+        return [{"team_id": 1, "team_name": "T1", "total_score": float(len(loads)), "rank": 1}]
+
+    loads = []
+    broadcaster = LeaderboardBroadcaster(loader, max_rate=20)
+
+    async def scenario():
+        stream = broadcaster.subscribe(1, SubmissionRound.ROUND1)
+        await stream.__anext__()
+        await asyncio.to_thread(broadcaster.notify, 1, SubmissionRound.ROUND1)
+        event = await asyncio.wait_for(stream.__anext__(), timeout=1)
+        await stream.aclose()
+        return event
+
+    event = asyncio.run(scenario())
+
+    assert not failures
+    assert event["type"] == "delta" and event["rows"][0]["total_score"] == 2.0
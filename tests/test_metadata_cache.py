@@ -0,0 +1,48 @@
+from app.metadata_cache import MetadataCache, SharedGeneration
+
+
+def test_shared_generation_keeps_workers_coherent(tmp_path):
+    path = str(tmp_path / "metadata.gen")
+    worker_a = MetadataCache(max_size=10, ttl=60, shared=SharedGeneration(path))
+    worker_b = MetadataCache(max_size=10, ttl=60, shared=SharedGeneration(path))
+    loads = []
+
+    def loader(value):
+        def load(keys):
+            loads.append(value)
+            return {key: value for key in keys}
+
+        return load
+
+    key = ("criterion", 1)
+    assert worker_a.load([key], loader("old"))[key] == "old"
+    assert worker_b.load([key], loader("old"))[key] == "old"
+    assert worker_b.load([key], loader("unused"))[key] == "old"
+    assert loads == ["old", "old"]
+
+    worker_a.invalidate(key)
+    assert worker_b.load([key], loader("new"))[key] == "new"
+    assert worker_a.load([key], loader("new"))[key] == "new"
+    assert worker_b.stats()["by_kind"]["criterion"] == {"hits": 1, "misses": 2, "hit_rate": 0.3333}
+
+
+def test_values_loaded_across_an_invalidation_are_not_cached():
+    cache = MetadataCache(max_size=10, ttl=60)
+    key = ("hackathon", 7)
+
+    def racing_loader(keys):
+        # An admin write commits and invalidates while this read is still in flight.
+        cache.invalidate(key)
+        return {key: "stale"}
+
+    assert cache.load([key], racing_loader)[key] == "stale"
+    assert cache.load([key], lambda keys: {key: "fresh"})[key] == "fresh"
+    assert cache.load([key], lambda keys: {key: "unused"})[key] == "fresh"
+
+
+def test_zero_ttl_disables_caching_but_still_loads():
+    cache = MetadataCache(max_size=10, ttl=0)
+    key = ("hackathon", 1)
+    assert cache.load([key], lambda keys: {key: 1})[key] == 1
+    assert cache.load([key], lambda keys: {key: 2})[key] == 2
+    assert cache.stats()["size"] == 0
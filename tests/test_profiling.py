@@ -0,0 +1,46 @@
+import logging
+import uuid
+
+from fastapi.testclient import TestClient
+
+from app.database import Base, engine
+from app.main import app
+from app.profiling import profiler
+
+client = TestClient(app)
+
+
+def test_profiler_reports_route_quantiles_sql_counts_and_slow_requests(monkeypatch, caplog):
+    Base.metadata.create_all(bind=engine)
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(profiler, "enabled", True)
+    monkeypatch.setattr(profiler, "slow_ms", 10**9)
+    profiler.reset()
+    run = uuid.uuid4().hex[:8]
+    signup = {"name": "Prof", "email": f"prof-{run}@example.com", "phone": f"96{run}", "password": "secret123"}
+    assert client.post("/auth/signup", json=signup).status_code == 200
+    login = client.post("/auth/login", json={"email": signup["email"], "password": "secret123"}).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    for _ in range(3):
+        client.get("/auth/me", headers=headers)
+    client.get("/no-such-route")
+
+    monkeypatch.setattr(profiler, "slow_ms", 0)
+    with caplog.at_level(logging.WARNING, logger="app.profiling"):
+        client.post("/auth/signup", json=signup)
+    assert "Slow request POST /auth/signup" in caplog.text
+    assert "SELECT" in caplog.text
+
+    body = client.get("/metrics")
+    assert body.headers["content-type"].startswith("text/plain")
+    lines = body.text.splitlines()
+    assert "# TYPE http_request_duration_seconds summary" in lines
+    assert 'http_request_duration_seconds_count{method="POST",route="/auth/signup"} 2' in lines
+    assert 'http_request_duration_seconds_count{method="GET",route="/auth/me"} 3' in lines
+    assert 'http_request_duration_seconds_count{method="POST",route="/auth/login"} 1' in lines
+    assert 'http_request_duration_seconds_count{method="GET",route="unmatched"} 1' in lines
+    samples = {line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1]) for line in lines if not line.startswith("#")}
+    assert 'http_request_duration_seconds{method="GET",route="/auth/me",quantile="0.99"}' in samples
+    assert samples['http_request_sql_statements_sum{method="POST",route="/auth/signup"}'] >= 3
+    assert samples['http_request_db_seconds_sum{method="POST",route="/auth/signup"}'] > 0
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import qr_tokens
+from app.models import QRPurpose
+
+KEY = b"test-signing-key"
+VALID_FROM = datetime(2026, 3, 1, 12, 0)
+VALID_TO = datetime(2026, 3, 1, 14, 0)
+
+
+def _issue(**overrides):
+    fields = {"user_id": 7, "hackathon_id": 3, "purpose": QRPurpose.LUNCH, "valid_from": VALID_FROM, "valid_to": VALID_TO}
+    return qr_tokens.issue(**{**fields, **overrides}, key=KEY)
+
+
+def test_round_trip_carries_signed_claims():
+    token = _issue()
+    claims = qr_tokens.verify(token, key=KEY)
+
+    assert len(token) < 128
+    assert (claims.user_id, claims.hackathon_id, claims.purpose) == (7, 3, QRPurpose.LUNCH)
+    assert (claims.valid_from, claims.valid_to) == (VALID_FROM, VALID_TO)
+    assert claims.is_active(VALID_FROM + timedelta(minutes=5))
+    assert not claims.is_active(VALID_TO + timedelta(seconds=1))
+    assert _issue() != token
+
+
+@pytest.mark.parametrize(
+    "mangle",
+    [
+        lambda token: token[:5] + ("A" if token[5] != "A" else "B") + token[6:],
+        lambda token: token.split(".")[0] + "." + _issue(user_id=8).split(".")[1],
+        lambda token: token + "x",
+        lambda token: "LUNCH-legacytoken",
+        lambda token: "ÿ.ÿ",
+    ],
+)
+def test_tampered_or_malformed_tokens_are_rejected(mangle):
+    with pytest.raises(qr_tokens.InvalidQRToken):
+        qr_tokens.verify(mangle(_issue()), key=KEY)
+
+
+def test_token_signed_with_another_key_is_rejected():
+    with pytest.raises(qr_tokens.InvalidQRToken):
+        qr_tokens.verify(_issue(), key=b"other-key")
+
+
+def test_missing_signing_key_fails_closed(monkeypatch):
+    token = _issue()
+    monkeypatch.setattr(qr_tokens, "SIGNING_KEY", None)
+    with pytest.raises(qr_tokens.MissingSigningKey):
+        qr_tokens.issue(7, 3, QRPurpose.LUNCH, VALID_FROM, VALID_TO)
+    with pytest.raises(qr_tokens.MissingSigningKey):
+        qr_tokens.verify(token)
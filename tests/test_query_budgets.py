@@ -0,0 +1,259 @@
+from datetime import datetime, timedelta
+import secrets
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+from app import leaderboard as leaderboard_store
+from app import analytics, metadata_cache, qr_tokens
+from app.auth_cache import session_cache
+from app.database import Base, SessionLocal, engine
+from app.main import app
+from app.models import (
+    AuthSession,
+    EvaluationCriterion,
+    Hackathon,
+    ProblemStatement,
+    QRPurpose,
+    QRToken,
+    ScanLog,
+    Score,
+    SubmissionRound,
+    Team,
+    User,
+    UserRole,
+    VerificationStatus,
+)
+
+client = TestClient(app)
+SIZES = [5, 200]
+
+
+def _bulk(db, model, rows):
+    return list(db.scalars(insert(model).returning(model.id), rows))
+
+
+def _seed(size: int) -> dict:
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    run = uuid.uuid4().hex[:8]
+    window = (now - timedelta(minutes=5), now + timedelta(hours=1))
+    with SessionLocal() as db:
+        hackathon = Hackathon(
+            title=f"Budget {run}", description="", registration_deadline=now, round1_deadline=now, final_deadline=now
+        )
+        db.add(hackathon)
+        db.flush()
+        problem = ProblemStatement(hackathon_id=hackathon.id, title="Open", description="")
+        db.add(problem)
+        db.flush()
+        staff = {
+            role: User(
+                name=role.value, email=f"{role.value.lower()}-{run}@budget.test", phone=f"93{role.value[:2]}{run}", role=role
+            )
+            for role in (UserRole.ADMIN, UserRole.JUDGE, UserRole.SCANNER)
+        }
+        db.add_all(staff.values())
+        db.flush()
+        students = _bulk(
+            db,
+            User,
+            [
+                {
+                    "name": f"Student {i}",
+                    "email": f"student{i}-{run}@budget.test",
+                    "phone": f"92{i:04d}{run}",
+                    "verification_status": VerificationStatus.APPROVED,
+                }
+                for i in range(size + 3)
+            ],
+        )
+        criteria = _bulk(
+            db,
+            EvaluationCriterion,
+            [
+                {"hackathon_id": hackathon.id, "round": SubmissionRound.ROUND1, "name": name, "weight": weight}
+                for name, weight in [("Design", 1.5), ("Impact", 0.5)]
+            ],
+        )
+        teams = _bulk(
+            db,
+            Team,
+            [
+                {
+                    "hackathon_id": hackathon.id,
+                    "name": f"Team {i} {run}",
+                    "captain_id": students[i],
+                    "problem_statement_id": problem.id,
+                }
+                for i in range(size)
+            ],
+        )
+        db.execute(
+            insert(Score),
+            [
+                {
+                    "team_id": team_id,
+                    "round": SubmissionRound.ROUND1,
+                    "judge_id": staff[UserRole.JUDGE].id,
+                    "criterion_id": criterion_id,
+                    "score": (i * 7 + j) % 10,
+                }
+                for i, team_id in enumerate(teams)
+                for j, criterion_id in enumerate(criteria)
+            ],
+        )
+        leaderboard_store.rebuild(db, hackathon.id, SubmissionRound.ROUND1)
+
+        tokens = [
+            qr_tokens.issue(student_id, hackathon.id, QRPurpose.LUNCH, *window) for student_id in students[: size + 2]
+        ]
+        token_ids = _bulk(
+            db,
+            QRToken,
+            [
+                {
+                    "token": token,
+                    "user_id": student_id,
+                    "hackathon_id": hackathon.id,
+                    "purpose": QRPurpose.LUNCH,
+                    "valid_from": window[0],
+                    "valid_to": window[1],
+                }
+                for token, student_id in zip(tokens, students)
+            ],
+        )
+        db.execute(
+            insert(ScanLog),
+            [
+                {
+                    "qr_token_id": token_id,
+                    "scanner_id": staff[UserRole.SCANNER].id,
+                    "scanned_at": now - timedelta(minutes=i % 60),
+                    "success": False,
+                    "message": "Token expired or not yet active",
+                }
+                for i, token_id in enumerate(token_ids[:size])
+            ],
+        )
+        analytics.rebuild_counters(db, hackathon.id)
+
+        headers = {}
+        for role, user in staff.items():
+            token = secrets.token_urlsafe(24)
+            db.add(AuthSession(user_id=user.id, token=token, expires_at=now + timedelta(days=1)))
+            headers[role] = {"Authorization": f"Bearer {token}"}
+        db.commit()
+        return {
+            "hackathon_id": hackathon.id,
+            "problem_statement_id": problem.id,
+            "criteria": criteria,
+            "teams": teams,
+            "free_students": students[size:],
+            "scan_token": tokens[size],
+            "batch_token": tokens[size + 1],
+            "staff": {role: user.id for role, user in staff.items()},
+            "headers": headers,
+        }
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"{size}-teams")
+def dataset(request):
+    data = _seed(request.param)
+    # Authenticate every role once and load the event metadata so the budgets measure the endpoint,
+    # not a cold session or metadata cache.
+    for role_headers in data["headers"].values():
+        assert client.get("/auth/me", headers=role_headers).status_code == 200
+    with SessionLocal() as db:
+        metadata_cache.hackathon(db, data["hackathon_id"])
+        metadata_cache.criteria(db, data["criteria"])
+    return data
+
+
+def test_auth_me_budget_when_the_session_cache_is_cold(dataset, query_budget):
+    session_cache.invalidate_user(dataset["staff"][UserRole.ADMIN])
+    # The bearer-token lookup, then /auth/me's own read of the user row.
+    _, statements = query_budget(lambda: client.get("/auth/me", headers=dataset["headers"][UserRole.ADMIN]), 2)
+    assert sum("auth_sessions" in statement for statement in statements) == 1
+
+
+def test_scan_budgets(dataset, query_budget):
+    scanner = dataset["headers"][UserRole.SCANNER]
+    body = {"token": dataset["scan_token"], "scanner_id": dataset["staff"][UserRole.SCANNER]}
+    response, _ = query_budget(lambda: client.post("/scan", headers=scanner, json=body), 3)
+    assert response.json()["success"] is True
+    # A rejected scan adds one lookup to explain why the conditional UPDATE matched nothing.
+    response, _ = query_budget(lambda: client.post("/scan", headers=scanner, json=body), 4)
+    assert response.json()["success"] is False
+
+
+def test_scan_batch_budget(dataset, query_budget):
+    scanner_id = dataset["staff"][UserRole.SCANNER]
+    records = [
+        {
+            "token": dataset["batch_token"],
+            "scanner_id": scanner_id,
+            "client_scanned_at": datetime.utcnow().isoformat(),
+            "idempotency_key": uuid.uuid4().hex,
+        }
+        for _ in range(3)
+    ]
+    response, _ = query_budget(
+        lambda: client.post("/scan/batch", headers=dataset["headers"][UserRole.SCANNER], json={"records": records}), 6
+    )
+    assert [result["success"] for result in response.json()] == [True, False, False]
+
+
+def test_leaderboard_and_ranking_budgets(dataset, query_budget):
+    admin = dataset["headers"][UserRole.ADMIN]
+    params = {"hackathon_id": dataset["hackathon_id"], "round_name": "ROUND1"}
+    response, _ = query_budget(lambda: client.get("/admin/leaderboard", headers=admin, params=params), 1)
+    assert len(response.json()) == len(dataset["teams"])
+    # Teams, round criteria, then the score columns (a binary COPY on Postgres).
+    query_budget(lambda: client.get("/admin/leaderboard/ranking", headers=admin, params=params), 3)
+
+
+def test_scan_analytics_budget(dataset, query_budget):
+    admin = dataset["headers"][UserRole.ADMIN]
+    params = {"hackathon_id": dataset["hackathon_id"], "bucket": "minute"}
+    counters, _ = query_budget(lambda: client.get("/admin/scan-analytics", headers=admin, params=params), 1)
+    detail, _ = query_budget(
+        lambda: client.get("/admin/scan-analytics", headers=admin, params={**params, "detail": True}), 1
+    )
+    assert counters.json()["failed_scans"] >= len(dataset["teams"])
+    assert counters.json()["timeline"] == detail.json()["timeline"]
+
+
+def test_team_creation_budget(dataset, query_budget):
+    captain, *members = dataset["free_students"][:3]
+    body = {
+        "hackathon_id": dataset["hackathon_id"],
+        "name": f"Budget team {uuid.uuid4().hex[:8]}",
+        "captain_id": captain,
+        "member_ids": members,
+        "problem_statement_id": dataset["problem_statement_id"],
+    }
+    # Verified users, existing placements, taken names, then the team and member inserts.
+    query_budget(lambda: client.post("/teams", headers=dataset["headers"][UserRole.ADMIN], json=body), 6)
+
+
+def test_score_sheet_budget(dataset, query_budget):
+    body = {
+        "judge_id": dataset["staff"][UserRole.JUDGE],
+        "round": "ROUND1",
+        "scores": [
+            {"team_id": team_id, "criterion_id": criterion_id, "score": 8}
+            for team_id in dataset["teams"]
+            for criterion_id in dataset["criteria"]
+        ],
+    }
+    query_budget(lambda: client.post("/judge/score-sheets", headers=dataset["headers"][UserRole.JUDGE], json=body), 5)
+
+
+def test_verification_queue_budget(dataset, query_budget):
+    admin = dataset["headers"][UserRole.ADMIN]
+    query_budget(
+        lambda: client.get("/admin/verification/queue", headers=admin, params={"status": "APPROVED", "limit": 50}), 1
+    )
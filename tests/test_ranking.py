@@ -0,0 +1,67 @@
+from datetime import datetime
+import struct
+
+import numpy as np
+
+from app.ranking import build_matrix, decode_copy, rank
+
+TECH, FEAS = (10, "Technical depth", 1.0), (11, "Feasibility", 1.0)
+EARLY, LATE = datetime(2026, 1, 1, 9), datetime(2026, 1, 1, 18)
+
+
+def _scores(team_id, sheet):
+    # sheet: {judge_id: (technical depth, feasibility)}
+    return [
+        (team_id, judge_id, criterion_id, value)
+        for judge_id, values in sheet.items()
+        for (criterion_id, _, _), value in zip((TECH, FEAS), values)
+    ]
+
+
+def _matrix(submitted, scores):
+    teams = [(team_id, f"Team {team_id}", at) for team_id, at in submitted.items()]
+    return build_matrix(teams, [TECH, FEAS], tuple(np.array(column) for column in zip(*scores)))
+
+
+def test_tie_breaks_follow_criteria_then_consensus_then_submission_time():
+    scores = (
+        _scores(1, {1: (5, 5), 2: (5, 5)})
+        + _scores(2, {1: (6, 4), 2: (6, 4)})
+        + _scores(3, {1: (5, 3), 2: (5, 7)})
+        + _scores(4, {1: (5, 5), 2: (5, 5)})
+        + _scores(5, {1: (6, 5), 2: (5, 5)})
+    )
+
+    ranked = rank(_matrix({1: LATE, 2: LATE, 3: LATE, 4: EARLY, 5: LATE, 6: None}, scores))
+
+    assert [row["team_id"] for row in ranked] == [5, 2, 4, 1, 3, 6]
+    assert [row["rank"] for row in ranked] == [1, 2, 3, 4, 5, 6]
+    by_team = {row["team_id"]: row for row in ranked}
+    assert by_team[2]["total_score"] == by_team[1]["total_score"] == 20.0
+    assert by_team[1]["judge_std"] == 0.0
+    assert by_team[3]["judge_std"] == 2.0
+    assert by_team[2]["criterion_scores"] == {"Technical depth": 6.0, "Feasibility": 4.0}
+    assert by_team[6]["judge_count"] == 0 and by_team[6]["submitted_at"] is None
+
+
+def test_judge_normalization_ignores_a_judges_constant_bias():
+    fair = _scores(1, {1: (8, 6)}) + _scores(2, {1: (4, 2)})
+    biased = [(team_id, 2, criterion_id, value - 3) for team_id, _, criterion_id, value in fair]
+    submitted = {1: LATE, 2: LATE}
+
+    alone = {row["team_id"]: row["normalized_score"] for row in rank(_matrix(submitted, fair))}
+    both = {row["team_id"]: row["normalized_score"] for row in rank(_matrix(submitted, fair + biased))}
+
+    assert alone == both
+
+
+def test_binary_copy_stream_decodes_into_score_columns():
+    rows = [(3, 7, 10, 8.5), (4, 7, 11, 6.0)]
+    payload = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+    for row in rows:
+        payload += struct.pack(">hiiiiiiid", 4, 4, row[0], 4, row[1], 4, row[2], 8, row[3])
+    payload += struct.pack(">h", -1)
+
+    columns = decode_copy(payload)
+
+    assert [column.tolist() for column in columns] == [[3, 4], [7, 7], [10, 11], [8.5, 6.0]]
@@ -0,0 +1,150 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import threading
+import uuid
+
+from sqlalchemy import func
+
+from app import analytics, qr_tokens, scanning
+from app.database import Base, SessionLocal, engine
+from app.models import Hackathon, QRPurpose, QRStatus, QRToken, ScanCounter, ScanLog, User, UserRole
+from app.schemas import BatchScanRecord
+
+COUNTERS = 12
+TOKENS = 5
+
+
+def _seed():
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    run = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        scanners = [
+            User(
+                name=f"Counter {i}", email=f"counter{i}-{run}@stress.test", phone=f"95{i:02d}{run}", role=UserRole.SCANNER
+            )
+            for i in range(COUNTERS)
+        ]
+        student = User(name="Hungry", email=f"hungry-{run}@stress.test", phone=f"9599{run}")
+        hackathon = Hackathon(
+            title="Stress Hack",
+            description="",
+            registration_deadline=now,
+            round1_deadline=now,
+            final_deadline=now,
+        )
+        db.add_all([*scanners, student, hackathon])
+        db.flush()
+        tokens = []
+        for _ in range(TOKENS):
+            window = (now - timedelta(minutes=5), now + timedelta(minutes=30))
+            token = qr_tokens.issue(student.id, hackathon.id, QRPurpose.LUNCH, *window)
+            db.add(
+                QRToken(
+                    token=token,
+                    user_id=student.id,
+                    hackathon_id=hackathon.id,
+                    purpose=QRPurpose.LUNCH,
+                    valid_from=window[0],
+                    valid_to=window[1],
+                )
+            )
+            tokens.append(token)
+        db.commit()
+        return [scanner.id for scanner in scanners], tokens, hackathon.id
+
+
+def _counted(db, hackathon_id):
+    return dict(
+        db.query(ScanCounter.success, func.sum(ScanCounter.scans))
+        .filter(ScanCounter.hackathon_id == hackathon_id)
+        .group_by(ScanCounter.success)
+        .all()
+    )
+
+
+def test_concurrent_counters_redeem_each_meal_qr_exactly_once():
+    scanner_ids, tokens, hackathon_id = _seed()
+
+    for token in tokens:
+        start = threading.Barrier(COUNTERS)
+
+        def scan(scanner_id, token=token, start=start):
+            with SessionLocal() as db:
+                start.wait()
+                outcome = scanning.consume(db, token, scanner_id, datetime.utcnow())
+                db.commit()
+                return outcome.success
+
+        with ThreadPoolExecutor(max_workers=COUNTERS) as pool:
+            results = list(pool.map(scan, scanner_ids))
+        assert results.count(True) == 1
+
+    with SessionLocal() as db:
+        rows = (
+            db.query(QRToken.status, ScanLog.success)
+            .join(ScanLog, ScanLog.qr_token_id == QRToken.id)
+            .filter(QRToken.token.in_(tokens))
+            .all()
+        )
+    assert len(rows) == TOKENS * COUNTERS
+    assert sum(success for _, success in rows) == TOKENS
+    assert {status for status, _ in rows} == {QRStatus.CONSUMED}
+    with SessionLocal() as db:
+        assert _counted(db, hackathon_id) == {True: TOKENS, False: TOKENS * (COUNTERS - 1)}
+
+
+def test_offline_batch_applies_first_scan_wins_and_is_idempotent():
+    scanner_ids, tokens, hackathon_id = _seed()
+    now = datetime.utcnow()
+    key = (uuid.uuid4().hex[:8] + ":{}").format
+    payload, signature = tokens[2].split(".")
+    forged = f"{payload}.{'A' if signature[0] != 'A' else 'B'}{signature[1:]}"
+
+    def record(token, scanner_id, offset, name):
+        return BatchScanRecord(
+            token=token, scanner_id=scanner_id, client_scanned_at=now + offset, idempotency_key=key(name)
+        )
+
+    records = [
+        record(tokens[0], scanner_ids[1], -timedelta(minutes=1), "b-1"),
+        record(tokens[0], scanner_ids[0], -timedelta(minutes=3), "a-1"),
+        record(tokens[1], scanner_ids[0], timedelta(0), "a-2"),
+        record(forged, scanner_ids[0], timedelta(0), "a-3"),
+        record(tokens[2], scanner_ids[0], timedelta(hours=1), "a-4"),
+    ]
+
+    with SessionLocal() as db:
+        results = scanning.ingest_batch(db, records)
+        db.commit()
+
+    assert [(r["idempotency_key"], r["success"]) for r in results] == [
+        (key("b-1"), False),
+        (key("a-1"), True),
+        (key("a-2"), True),
+        (key("a-3"), False),
+        (key("a-4"), False),
+    ]
+    assert results[0]["message"] == "Token already consumed"
+    assert results[3]["message"] == "Invalid QR signature"
+    assert results[4]["message"] == "Token expired or not yet active"
+
+    with SessionLocal() as db:
+        replay = scanning.ingest_batch(db, records[:3])
+        db.commit()
+        logs = db.query(ScanLog).filter(ScanLog.idempotency_key.in_([r.idempotency_key for r in records])).all()
+    assert [(r["success"], r["duplicate"]) for r in replay] == [(False, True), (True, True), (True, True)]
+    assert sorted(log.idempotency_key for log in logs) == [key("a-1"), key("a-2"), key("a-4"), key("b-1")]
+    assert {log.idempotency_key: log.scanned_at for log in logs}[key("a-1")] == now - timedelta(minutes=3)
+
+    # Keys are per scanner: another gate that happens to reuse "a-2" is a new scan, not a replay.
+    with SessionLocal() as db:
+        [reused] = scanning.ingest_batch(db, [record(tokens[3], scanner_ids[1], timedelta(0), "a-2")])
+        db.commit()
+    assert (reused["success"], reused["duplicate"]) == (True, False)
+
+    with SessionLocal() as db:
+        assert _counted(db, hackathon_id) == {True: 3, False: 2}
+        analytics.rebuild_counters(db, hackathon_id)
+        db.commit()
+        assert _counted(db, hackathon_id) == {True: 3, False: 2}
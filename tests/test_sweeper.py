@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+import uuid
+
+from app import sweeper
+from app.database import Base, SessionLocal, engine
+from app.models import AuthSession, Hackathon, QRPurpose, QRStatus, QRToken, User
+
+
+def test_sweep_removes_expired_sessions_and_expires_stale_qr_in_batches():
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    run = uuid.uuid4().hex[:8]
+    with SessionLocal() as db:
+        user = User(name="Sleepy", email=f"sleepy-{run}@sweep.test", phone=f"97{run}")
+        hackathon = Hackathon(
+            title="Sweep Hack", description="", registration_deadline=now, round1_deadline=now, final_deadline=now
+        )
+        db.add_all([user, hackathon])
+        db.flush()
+        sessions = [
+            AuthSession(user_id=user.id, token=f"{run}-s{i}", expires_at=now + timedelta(hours=i - 5))
+            for i in range(7)
+        ]
+        tokens = [
+            QRToken(
+                token=f"{run}-q{i}",
+                user_id=user.id,
+                hackathon_id=hackathon.id,
+                purpose=QRPurpose.DINNER,
+                valid_from=now - timedelta(hours=6),
+                valid_to=now + timedelta(hours=i - 4),
+                status=QRStatus.CONSUMED if i == 0 else QRStatus.ACTIVE,
+            )
+            for i in range(6)
+        ]
+        db.add_all([*sessions, *tokens])
+        db.commit()
+
+    report = sweeper.run_sweep(now=now, batch_size=2)
+
+    assert report["sessions_deleted"] >= 5
+    assert report["qr_tokens_expired"] >= 3
+    assert report["batches"] >= 5
+    with SessionLocal() as db:
+        remaining = db.query(AuthSession.token).filter(AuthSession.token.like(f"{run}-%")).order_by(AuthSession.id)
+        statuses = dict(db.query(QRToken.token, QRToken.status).filter(QRToken.token.like(f"{run}-%")))
+    assert [token for token, in remaining] == [f"{run}-s5", f"{run}-s6"]
+    assert [statuses[f"{run}-q{i}"] for i in range(6)] == [
+        QRStatus.CONSUMED,
+        QRStatus.EXPIRED,
+        QRStatus.EXPIRED,
+        QRStatus.EXPIRED,
+        QRStatus.ACTIVE,
+        QRStatus.ACTIVE,
+    ]
+
+    assert sweeper.run_sweep(now=now, batch_size=2)["sessions_deleted"] == 0